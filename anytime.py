@@ -0,0 +1,140 @@
+"""
+Anytime building: a time budget, an always-valid best-so-far portfolio, and checkpoints.
+
+A generator that normally stops at n lineups or an attempt cap can instead run until a deadline
+(lock time) or for a time budget, offering every valid lineup it finds to a Portfolio that keeps
+the best n (unique by key). Every `every` seconds the portfolio, the RNG state and the counters
+are pickled to a checkpoint (written to a temp file, then renamed, so a kill never leaves a torn
+file); a rerun with the same checkpoint path picks up where the last one stopped.
+
+    budget = Budget(deadline="2025-09-07 12:55", time_budget=600)
+    ckpt = Checkpoint("out/week01/generate_150.ckpt", fingerprint(players, n, sorted(cfg.items()), frame_hash(schedule)), every=30)
+    state = ckpt.load()            # None when missing, unreadable or for other inputs
+"""
+
+import os, time, pickle, hashlib
+import pandas as pd
+
+class Budget:
+    """Deadline (wall clock, 'YYYY-MM-DD HH:MM' or Timestamp) and/or time budget in seconds; no limit if neither"""
+
+    def __init__(self, deadline=None, time_budget=None):
+        self.start = time.monotonic()
+        ends = []
+        if time_budget is not None:
+            ends.append(self.start + float(time_budget))
+        if deadline is not None:
+            left = (pd.Timestamp(deadline) - pd.Timestamp.now(tz=pd.Timestamp(deadline).tz)).total_seconds()
+            ends.append(self.start + left)
+        self.end = min(ends) if ends else None
+
+    @property
+    def limited(self):
+        return self.end is not None
+
+    def remaining(self):
+        return float("inf") if self.end is None else self.end - time.monotonic()
+
+    def expired(self):
+        return self.end is not None and time.monotonic() >= self.end
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+class Portfolio:
+    """
+    Best n (score, lineup) pairs seen so far, unique by key(lineup) (no uniqueness when key is None).
+    Below n every unique lineup is taken; after that one replaces the worst only if it scores higher.
+    """
+
+    def __init__(self, n, key=None):
+        self.n, self.key = n, key
+        self.lineups, self.keys = [], set()
+        self.replaced = 0
+
+    def __len__(self):
+        return len(self.lineups)
+
+    def full(self):
+        return len(self.lineups) >= self.n
+
+    def offer(self, score, lineup):
+        k = self.key(lineup) if self.key else None
+        if k is not None and k in self.keys:
+            return False
+        if self.full():
+            worst = min(range(len(self.lineups)), key=lambda i: self.lineups[i][0])
+            if score <= self.lineups[worst][0]:
+                return False
+            _, out = self.lineups.pop(worst)
+            self.keys.discard(self.key(out) if self.key else None)
+            self.replaced += 1
+        self.lineups.append((score, lineup))
+        if k is not None:
+            self.keys.add(k)
+        return True
+
+    def best(self):
+        return sorted(self.lineups, key=lambda x: x[0], reverse=True)
+
+    def to_names(self):
+        return [(score, [p["name"] for p in lu]) for score, lu in self.lineups]
+
+    def restore(self, rows, by_name, valid=None):
+        """
+        Re-add (score, names) rows saved by to_names; rows naming unknown players, or failing
+        `valid(lineup)` against the current rules, are dropped. Returns the number dropped.
+        """
+        dropped = 0
+        for score, names in rows:
+            lu = [by_name[n] for n in names if n in by_name]
+            if len(lu) != len(names) or (valid is not None and not valid(lu)):
+                dropped += 1
+                continue
+            self.offer(score, lu)
+        return dropped
+
+def frame_hash(df):
+    """Content hash of a DataFrame (e.g. the schedule), for fingerprints"""
+    return hashlib.sha1(df.to_csv(index=False).encode()).hexdigest()[:16] if df is not None else None
+
+def fingerprint(players, *extra):
+    """Hash of the player pool (names, salaries, projections, ownership) plus any settings that shape the run"""
+    parts = [(p["name"], p["salary"], round(p.get("proj", 0.0), 4), round(p.get("own", 0.0), 4)) for p in players]
+    return hashlib.sha1(repr((sorted(parts), extra)).encode()).hexdigest()[:16]
+
+class Checkpoint:
+    """Periodic pickled state at `path` (every `every` seconds), tagged with the run's input fingerprint"""
+
+    def __init__(self, path, tag, every=30.0):
+        self.path, self.tag, self.every = path, tag, float(every)
+        self.last = time.monotonic()
+        self.saves = 0
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            print(f"[anytime] {self.path} unreadable; starting fresh")
+            return None
+        if state.get("tag") != self.tag:
+            print(f"[anytime] {self.path} is for other inputs; starting fresh")
+            return None
+        return state
+
+    def due(self):
+        return bool(self.path) and time.monotonic() - self.last >= self.every
+
+    def save(self, state):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(dict(state, tag=self.tag, saved_at=time.time()), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.last = time.monotonic()
+        self.saves += 1
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Backtest weights.yaml variants over historical weeks.
+
+Each week directory holds the usual inputs plus what actually happened:
+
+    <hist>/<week>/weekly_inputs.csv roles.csv DKSalaries.csv projections.csv ownership.csv
+                  actuals.csv    name, points (DK fantasy points; "FPTS" also accepted)
+                  payouts.csv    rank_lo, rank_hi, payout [, min_points = score of the last entry in the band]
+                  contest.json   {"entry_fee": 20, "entries": 50000}
+                  standings.csv  optional field scores ("Points"/"points" column) for exact ranks
+
+Weeks run in a process pool; per week the pipeline (edge scores -> stacks -> lineups) is re-run for
+every variant and the lineups are scored against actual points. Each lineup is placed against the
+field on its own (our other entries are ignored), by standings when present, else by the
+min_points of the payout bands. Stage outputs are cached under <out>/cache keyed by a hash of
+their inputs and the config keys they read, so sweeping e.g. only pct_3v1 re-runs just the
+lineup stage.
+
+    python backtest.py --hist data/history --weights config/weights.yaml config/alt.yaml --out out/backtest
+
+Writes backtest_weeks.csv (variant x week), backtest_summary.csv (per variant) and backtest_lineups.csv.
+"""
+
+import argparse, os, json, math, hashlib, pickle, random, contextlib, time
+import pandas as pd, numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from utils import read_weights, load_dk, load_optional, load_roles, load_weekly_inputs
+from input_cache import file_hash
+
+STAGES = ("edge", "stacks", "lineups")
+EDGE_KEYS = ("w_ou", "w_spread", "w_proe_pace", "w_venue_weather", "w_concentration", "w_ownership_penalty")
+TOP_PCT = 0.01
+
+def _key(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def _hashes(week_dir, names):
+    return {n: file_hash(os.path.join(week_dir, n)) if os.path.exists(os.path.join(week_dir, n)) else None for n in names}
+
+class StageCache:
+    """Pickled stage outputs under <root>/<week>/<stage>-<key>.pkl"""
+
+    def __init__(self, root, week):
+        self.dir = os.path.join(root, week) if root else None
+        self.hits = 0
+
+    def get(self, stage, key, compute):
+        if not self.dir:
+            return compute()
+        path = os.path.join(self.dir, f"{stage}-{key}.pkl")
+        if os.path.exists(path):
+            self.hits += 1
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        value = compute()
+        os.makedirs(self.dir, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        return value
+
+def load_week(week_dir):
+    """Inputs, actuals and contest info for one historical week"""
+    d = Path(week_dir)
+    actuals = pd.read_csv(d/"actuals.csv").rename(columns={"FPTS": "points", "fpts": "points", "Name": "name"})
+    contest = json.loads((d/"contest.json").read_text()) if (d/"contest.json").exists() else {}
+    field = None
+    if (d/"standings.csv").exists():
+        st = pd.read_csv(d/"standings.csv")
+        col = "Points" if "Points" in st.columns else "points"
+        field = np.sort(pd.to_numeric(st[col], errors="coerce").dropna().to_numpy())[::-1]
+    return {
+        "weekly": load_weekly_inputs(str(d/"weekly_inputs.csv")),
+        "roles": load_roles(str(d/"roles.csv")),
+        "dk": load_dk(str(d/"DKSalaries.csv")),
+        "proj": load_optional(str(d/"projections.csv")),
+        "own": load_optional(str(d/"ownership.csv")),
+        "points": dict(zip(actuals["name"], actuals["points"].astype(float))),
+        "payouts": pd.read_csv(d/"payouts.csv").sort_values("rank_lo").reset_index(drop=True),
+        "entry_fee": float(contest.get("entry_fee", 1.0)),
+        "entries": int(contest.get("entries", len(field) if field is not None else 0)),
+        "field": field,
+    }
+
+def run_pipeline(wk, cfg, cache, hashes):
+    """edge -> stacks -> lineups for one config, each stage cached by its own inputs"""
+    from edge_scores import calc_edge_scores
+    from stacks import pick_games, build_core_stacks
+    from optimize import build_player_rows, build_lineups_150
+    k_edge = _key("edge", hashes["weekly_inputs.csv"], {k: cfg.get(k) for k in EDGE_KEYS})
+    edge = cache.get("edge", k_edge, lambda: calc_edge_scores(wk["weekly"], cfg))
+    k_stacks = _key("stacks", k_edge, hashes["roles.csv"])
+    stacks = cache.get("stacks", k_stacks, lambda: build_core_stacks(pick_games(edge, {}), wk["roles"], wk["weekly"], {}))
+    k_lu = _key("lineups", k_stacks, hashes["DKSalaries.csv"], hashes["projections.csv"], hashes["ownership.csv"], cfg)
+    def lineups():
+        random.seed(0)
+        proj = wk["proj"][["name", "team", "pos", "proj", "p90"]]
+        players = build_player_rows(wk["dk"], proj, wk["own"])
+        return build_lineups_150(wk["dk"], edge, stacks, players, cfg)
+    return cache.get("lineups", k_lu, lineups)
+
+def place(points, wk):
+    """(rank, payout) of a lineup scoring `points` against this week's field"""
+    pay = wk["payouts"]
+    if wk["field"] is not None:
+        rank = int(np.searchsorted(-wk["field"], -points, side="left")) + 1  # entries strictly ahead + 1
+    elif "min_points" in pay.columns:
+        ok = pay[pay["min_points"] <= points]
+        rank = int(ok["rank_hi"].iloc[0]) if len(ok) else max(wk["entries"], int(pay["rank_hi"].max()) + 1)
+    else:
+        raise ValueError("payouts.csv needs min_points when there is no standings.csv")
+    band = pay[(pay["rank_lo"] <= rank) & (pay["rank_hi"] >= rank)]
+    return rank, float(band["payout"].iloc[0]) if len(band) else 0.0
+
+def score_lineups(lineups, wk):
+    """Per-lineup actual points, rank, payout and top-1% flag"""
+    top_rank = max(1, math.ceil(wk["entries"]*TOP_PCT)) if wk["entries"] else 0
+    rows = []
+    for i, (proj_score, lu) in enumerate(lineups, start=1):
+        missing = [p["name"] for p in lu if p["name"] not in wk["points"]]
+        pts = sum(wk["points"].get(p["name"], 0.0) for p in lu)
+        rank, payout = place(pts, wk)
+        rows.append({"lineup": i, "proj_score": round(proj_score, 3), "points": round(pts, 2), "rank": rank,
+                     "payout": payout, "cashed": payout > 0, "top1": bool(top_rank) and rank <= top_rank,
+                     "missing_actuals": len(missing), "players": "|".join(p["name"] for p in lu)})
+    return rows
+
+def summarize_week(rows, entry_fee):
+    n = len(rows)
+    cost = n*entry_fee
+    won = sum(r["payout"] for r in rows)
+    return {"n_lineups": n, "cost": cost, "winnings": round(won, 2),
+            "roi": round((won - cost)/cost, 4) if cost else np.nan,
+            "cash_rate": round(sum(r["cashed"] for r in rows)/n, 4) if n else np.nan,
+            "top1_hits": sum(r["top1"] for r in rows),
+            "best_points": max((r["points"] for r in rows), default=np.nan),
+            "best_rank": min((r["rank"] for r in rows), default=np.nan)}
+
+def backtest_week(week_dir, variants, cache_root=None, quiet=True):
+    """All variants on one week; returns (week rows, lineup rows)"""
+    week = os.path.basename(os.path.normpath(week_dir))
+    hashes = _hashes(week_dir, ["weekly_inputs.csv", "roles.csv", "DKSalaries.csv", "projections.csv", "ownership.csv"])
+    cache = StageCache(cache_root, week)
+    week_rows, lu_rows = [], []
+    with open(os.devnull, "w") as sink, (contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext()):
+        wk = load_week(week_dir)
+        for name, cfg in variants.items():
+            t0 = time.perf_counter()
+            hits = cache.hits
+            try:
+                lineups = run_pipeline(wk, cfg, cache, hashes)
+                rows = score_lineups(lineups, wk)
+                status = "ok"
+            except Exception as e:
+                rows, status = [], f"error: {type(e).__name__}: {e}"
+            week_rows.append(dict(variant=name, week=week, status=status, **summarize_week(rows, wk["entry_fee"]),
+                                  stages_cached=cache.hits - hits, run_s=round(time.perf_counter() - t0, 3)))
+            lu_rows.extend(dict(r, variant=name, week=week) for r in rows)
+    return week_rows, lu_rows
+
+def summarize(weeks_df):
+    """Per-variant totals over all weeks that ran"""
+    ok = weeks_df[weeks_df["status"] == "ok"]
+    g = ok.groupby("variant")
+    out = pd.DataFrame({
+        "weeks": g.size(),
+        "entries": g["n_lineups"].sum(),
+        "cost": g["cost"].sum(),
+        "winnings": g["winnings"].sum(),
+        "cash_rate": g.apply(lambda d: (d["cash_rate"]*d["n_lineups"]).sum()/max(d["n_lineups"].sum(), 1)),
+        "top1_hits": g["top1_hits"].sum(),
+        "weeks_profitable": g["roi"].apply(lambda r: int((r > 0).sum())),
+    }).reset_index()
+    out["roi"] = ((out["winnings"] - out["cost"])/out["cost"].where(out["cost"] > 0)).round(4)
+    out["cash_rate"] = out["cash_rate"].round(4)
+    return out.sort_values("roi", ascending=False)
+
+def main(hist, weights, out_dir, jobs=None, weeks=None, use_cache=True):
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+    variants = {Path(w).stem: read_weights(w) for w in weights}
+    week_dirs = sorted(str(p) for p in Path(hist).iterdir() if p.is_dir() and (p/"actuals.csv").exists())
+    if weeks:
+        week_dirs = [d for d in week_dirs if os.path.basename(d) in set(weeks)]
+    if not week_dirs:
+        raise SystemExit(f"No week directories with actuals.csv under {hist}")
+    cache_root = str(out/"cache") if use_cache else None
+    jobs = jobs or min(len(week_dirs), os.cpu_count() or 1)
+    print(f"[backtest] {len(week_dirs)} weeks x {len(variants)} variants, {jobs} worker(s)")
+
+    week_rows, lu_rows = [], []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for d, (wr, lr) in zip(week_dirs, pool.map(backtest_week, week_dirs, [variants]*len(week_dirs), [cache_root]*len(week_dirs))):
+            week_rows.extend(wr); lu_rows.extend(lr)
+            for r in wr:
+                print(f"[backtest] {r['week']:<12} {r['variant']:<16} {r['status']:<6} n={r['n_lineups']:>3} "
+                      f"roi={r['roi']} cash={r['cash_rate']} top1={r['top1_hits']} cached={r['stages_cached']}/{len(STAGES)}")
+
+    weeks_df = pd.DataFrame(week_rows)
+    summary = summarize(weeks_df)
+    weeks_df.to_csv(out/"backtest_weeks.csv", index=False)
+    summary.to_csv(out/"backtest_summary.csv", index=False)
+    pd.DataFrame(lu_rows).to_csv(out/"backtest_lineups.csv", index=False)
+    print(summary.to_string(index=False))
+    print(f"Wrote {out/'backtest_weeks.csv'}, {out/'backtest_summary.csv'} and {out/'backtest_lineups.csv'}")
+    return summary
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hist", required=True, help="Directory of week directories")
+    ap.add_argument("--weights", nargs="+", default=["config/weights.yaml"], help="One or more config variants")
+    ap.add_argument("--out", default="out/backtest")
+    ap.add_argument("--jobs", type=int, default=None, help="Worker processes (default: one per week, up to CPU count)")
+    ap.add_argument("--weeks", nargs="+", default=None, help="Only these week directory names")
+    ap.add_argument("--no_cache", action="store_true", help="Recompute every stage")
+    args = ap.parse_args()
+    main(args.hist, args.weights, args.out, args.jobs, args.weeks, not args.no_cache)
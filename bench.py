@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Lineup generation benchmark.
+
+Runs every registered engine on synthetic slates at several sizes and reports
+lineups/sec, time-to-N, peak RSS and result quality. Each (engine, slate) run happens
+in a fresh process so peak RSS is per-run and a hung engine can be killed.
+
+    python bench.py --games 2 6 13 16 --n 150 --out out/bench
+"""
+
+import argparse, os, sys, time, random, resource, contextlib, multiprocessing as mp
+import pandas as pd, numpy as np
+from datetime import datetime
+from pathlib import Path
+from utils import read_weights, load_dk, load_optional, load_roles, load_weekly_inputs
+import synth_slate
+
+def load_context(slate_dir, weights_path="config/weights.yaml"):
+    """Load everything an engine needs from a slate directory"""
+    d = Path(slate_dir)
+    return {
+        "cfg": read_weights(weights_path),
+        "dk": load_dk(str(d/"DKSalaries.csv")),
+        "proj": load_optional(str(d/"projections.csv")),
+        "own": load_optional(str(d/"ownership.csv")),
+        "roles": load_roles(str(d/"roles.csv")),
+        "weekly": load_weekly_inputs(str(d/"weekly_inputs.csv")),
+    }
+
+# ---- engine adapters: (ctx, n, seed) -> [(score, lineup), ...] ----
+
+def run_optimize(ctx, n, seed):
+    # the seed reaches build_lineups_150's rng; its greedy stack fills draw nothing today, so on a
+    # given slate the output only varies with the slate (the --seed also picks the synthetic slate)
+    from edge_scores import calc_edge_scores
+    from stacks import pick_games, build_core_stacks
+    from optimize import build_player_rows, build_lineups_150
+    edge = calc_edge_scores(ctx["weekly"], ctx["cfg"])
+    stacks = build_core_stacks(pick_games(edge, {}), ctx["roles"], ctx["weekly"], {})
+    proj = ctx["proj"][["name", "team", "pos", "proj", "p90"]]
+    players = build_player_rows(ctx["dk"], proj, ctx["own"])
+    return build_lineups_150(ctx["dk"], edge, stacks, players, ctx["cfg"], rng=random.Random(seed))[:n]
+
+def run_generate_150(ctx, n, seed):
+    import generate_150_lineups as g
+    cfg = dict(ctx["cfg"], min_salary=49600)
+    players = g.load_players(ctx["dk"], ctx["proj"], ctx["own"])
+    return g.generate_lineups(players, ctx["weekly"], cfg, n=n, rng=random.Random(seed))
+
+def run_generate_enhanced(ctx, n, seed):
+    import generate_150_enhanced as g
+    tiers = g.calculate_dynamic_salary_tiers(ctx["dk"])
+    players = g.load_players(ctx["dk"], ctx["proj"], ctx["own"])
+    return g.generate_lineups(players, ctx["weekly"], tiers, n=n, rng=random.Random(seed))
+
+# name -> adapter; new engines register here so bench.py and quality.py pick them up
+ENGINES = {
+    "optimize": run_optimize,
+    "generate_150_lineups": run_generate_150,
+    "generate_150_enhanced": run_generate_enhanced,
+}
+
+def lineup_quality(lineups, cfg):
+    """Summary quality numbers for a list of (score, lineup) tuples"""
+    from optimize import finalize_positions
+    if not lineups:
+        return {"mean_score": np.nan, "top_score": np.nan, "mean_proj": np.nan, "valid_rate": 0.0, "unique_rate": 0.0}
+    scores = [s for s, _ in lineups]
+    valid = 0
+    keys = set()
+    for _, lu in lineups:
+        sal = sum(p["salary"] for p in lu)
+        if len(lu) == 9 and finalize_positions(lu) and sal <= cfg["max_salary"] and len({p["name"] for p in lu}) == 9:
+            valid += 1
+        keys.add(frozenset(p["name"] for p in lu))
+    return {
+        "mean_score": round(float(np.mean(scores)), 3),
+        "top_score": round(float(np.max(scores)), 3),
+        "mean_proj": round(float(np.mean([sum(p.get("proj", 0) for p in lu) for _, lu in lineups])), 2),
+        "valid_rate": round(valid/len(lineups), 4),
+        "unique_rate": round(len(keys)/len(lineups), 4),
+    }
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss/1024/1024 if sys.platform == "darwin" else rss/1024  # bytes on macOS, KB on Linux
+
+def bench_one(engine, slate_dir, n, seed, weights_path="config/weights.yaml", quiet=True):
+    """Run one engine on one slate in this process and return its metrics row"""
+    sink = open(os.devnull, "w") if quiet else None
+    with (contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext()):
+        t0 = time.perf_counter()
+        ctx = load_context(slate_dir, weights_path)
+        t1 = time.perf_counter()
+        lineups = ENGINES[engine](ctx, n, seed)
+        t2 = time.perf_counter()
+    if sink: sink.close()
+    gen_s = t2 - t1
+    row = {
+        "engine": engine, "status": "ok", "n_lineups": len(lineups),
+        "prep_s": round(t1 - t0, 3), "gen_s": round(gen_s, 3),
+        "lineups_per_s": round(len(lineups)/gen_s, 2) if gen_s > 0 else np.nan,
+        "time_to_n_s": round(gen_s, 3) if len(lineups) >= n else np.nan,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+    row.update(lineup_quality(lineups, ctx["cfg"]))
+    return row
+
+def _child(q, fn, args):
+    try:
+        q.put(("ok", fn(*args)))
+    except Exception as e:
+        q.put(("error", f"{type(e).__name__}: {e}"))
+
+def run_isolated(fn, args, timeout=300):
+    """Call top-level fn(*args) in a fresh process; returns (status, result) and kills it after timeout seconds"""
+    ctx = mp.get_context("spawn")
+    q = ctx.Queue()
+    p = ctx.Process(target=_child, args=(q, fn, args))
+    p.start()
+    try:
+        status, result = q.get(timeout=timeout)
+    except Exception:
+        p.terminate()
+        status, result = f"timeout>{timeout}s", None
+    p.join()
+    return status, result
+
+def bench_isolated(engine, slate_dir, n, seed, weights_path="config/weights.yaml", timeout=300):
+    """Run bench_one in a fresh process so peak RSS is per-run"""
+    status, row = run_isolated(bench_one, (engine, str(slate_dir), n, seed, weights_path), timeout)
+    if status == "ok":
+        return row
+    return {"engine": engine, "status": status if status.startswith("timeout") else f"error: {row}"}
+
+def main(games, engines, n, seed, out_dir, weights_path="config/weights.yaml", timeout=300, isolate=True):
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+    rows = []
+    stamp = datetime.now().isoformat(timespec="seconds")
+    for g in games:
+        slate_dir = out/"slates"/f"g{g:02d}_s{seed}"
+        slate = synth_slate.make_slate(n_games=g, seed=seed)
+        synth_slate.write_slate(slate, slate_dir)
+        for e in engines:
+            print(f"[bench] {g:>2} games  {e:<24}", end="", flush=True)
+            if isolate:
+                row = bench_isolated(e, slate_dir, n, seed, weights_path, timeout)
+            else:
+                row = bench_one(e, slate_dir, n, seed, weights_path)
+            row.update({"games": g, "players": len(slate["DKSalaries"]), "n_target": n, "seed": seed, "run_at": stamp})
+            rows.append(row)
+            if row["status"] == "ok":
+                print(f" {row['n_lineups']:>4} lu  {row['gen_s']:8.2f}s  {row['lineups_per_s']:8.1f} lu/s  "
+                      f"rss {row['peak_rss_mb']:7.1f}MB  mean {row['mean_score']}")
+            else:
+                print(f" {row['status']}")
+    df = pd.DataFrame(rows)
+    lead = ["run_at", "games", "players", "engine", "status", "n_target", "n_lineups"]
+    df = df[lead + [c for c in df.columns if c not in lead]]
+    df.to_csv(out/"bench_results.csv", index=False)
+    hist = out/"bench_history.csv"
+    df.to_csv(hist, mode="a", header=not hist.exists(), index=False)
+    print(f"Wrote {out/'bench_results.csv'} (history appended to {hist})")
+    return df
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--games", type=int, nargs="+", default=[2, 6, 13, 16])
+    ap.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    ap.add_argument("--n", type=int, default=150, help="Lineups to ask each engine for")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--weights", default="config/weights.yaml")
+    ap.add_argument("--out", default="out/bench")
+    ap.add_argument("--timeout", type=float, default=300, help="Seconds before a run is killed")
+    ap.add_argument("--inproc", action="store_true", help="Run engines in this process (no RSS isolation or timeout)")
+    args = ap.parse_args()
+    main(args.games, args.engines, args.n, args.seed, args.out, args.weights, args.timeout, not args.inproc)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Blend N projection sources into projections.csv / ownership.csv.
+
+Sources are listed in config/projection_sources.yaml (CSV or Parquet, with a column map per source).
+Each source is resolved to DK player IDs once with vectorized joins (normalised name + team, then
+unique name, then first initial + last name + team; DST by team) and the resolved frame is cached by
+the content hash of the source and the DK file. Missing quantiles are filled per row from the ones a
+source does have (normal z-scale interpolation around the median/mean). mean, p90 and own are then
+averaged with per-position source weights over the sources that have a value for the player.
+
+    python blend_projections.py --config config/projection_sources.yaml --dk DKSalaries.csv \
+        --out projections.csv --own_out ownership.csv
+"""
+
+import argparse, os, json
+import pandas as pd, numpy as np, yaml
+from input_cache import read_dk_salaries, cached_parse, file_hash
+from utils import NICK_TO_ABBR
+
+here = os.path.dirname(os.path.abspath(__file__))
+FIELDS = ["name", "team", "pos", "mean", "p10", "p25", "p50", "p75", "p90", "p95", "p99", "own"]
+Z = {"p10": -1.2816, "p25": -0.6745, "p50": 0.0, "p75": 0.6745, "p90": 1.2816, "p95": 1.6449, "p99": 2.3263}
+POS_ALIASES = {"D/ST": "DST", "DEF": "DST", "D": "DST", "DST": "DST"}
+P90_MULT = 1.6  # p90 when a source has no quantiles at all (same default as projection_proxy)
+DEFAULT_OWN = 5.0
+
+def _team_aliases():
+    with open(os.path.join(here, "config", "team_map.json")) as f:
+        m = json.load(f)
+    m.update({"LA": "LAR", "WSH": "WAS", "OAK": "LV", "SD": "LAC", "STL": "LAR"})
+    m.update(NICK_TO_ABBR)
+    return m
+
+_TEAMS = _team_aliases()
+
+def name_key(names):
+    """lowercase, punctuation and Jr/Sr/II/III suffixes stripped"""
+    s = pd.Series(names, dtype=object).fillna("").astype(str).str.lower()
+    s = s.str.replace(r"[^a-z0-9 ]", "", regex=True).str.replace(r"\b(jr|sr|ii|iii|iv|v)\b", "", regex=True)
+    return s.str.split().str.join(" ")
+
+def short_key(keys):
+    """first initial + last name ("jmarcus ... smith" -> "j smith")"""
+    parts = keys.str.split()
+    return parts.str[0].str[:1] + " " + parts.str[-1]
+
+def read_source(path, columns):
+    """Source file with columns renamed to FIELDS via the `columns` map (field -> source column)"""
+    colmap = {src: field for field, src in (columns or {}).items()}
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df = df.rename(columns=colmap)
+    df = df[[c for c in FIELDS if c in df.columns]].copy()
+    if "name" not in df.columns or not {"mean", "p50"} & set(df.columns):
+        raise ValueError(f"{path}: needs name and mean (or p50) columns after mapping {columns}")
+    if "pos" in df.columns:
+        df["pos"] = df["pos"].astype(str).str.upper().replace(POS_ALIASES)
+    if "team" in df.columns:
+        teams = df["team"].astype(str).str.strip()
+        df["team"] = teams.map({t: _TEAMS.get(t, _TEAMS.get(t.split()[-1], t)) if t else t for t in teams.unique()})
+    return df
+
+def resolve_ids(src, dk):
+    """Add DK id to src rows; vectorized joins in decreasing strictness, each row matched at most once"""
+    src = src.reset_index(drop=True)
+    src["_key"] = name_key(src["name"])
+    dk = dk[["id", "name", "team", "pos"]].copy()
+    dk["team"] = dk["team"].astype(object)
+    dk["pos"] = dk["pos"].astype(object)
+    dk["_key"] = name_key(dk["name"])
+    dk["_short"] = short_key(dk["_key"])
+    src["id"] = np.nan
+
+    def fill(left_on, right, right_on):
+        todo = src["id"].isna()
+        if not todo.any() or not all(c in src.columns for c in left_on):
+            return
+        right = right.drop_duplicates(right_on, keep=False)  # ambiguous keys never match
+        m = src.loc[todo, left_on].merge(right[right_on + ["id"]], left_on=left_on, right_on=right_on, how="left")
+        src.loc[todo, "id"] = m["id"].to_numpy()
+
+    dst = dk[dk["pos"] == "DST"]
+    if "pos" in src.columns and "team" in src.columns:
+        is_dst = src["pos"] == "DST"
+        m = src.loc[is_dst, ["team"]].merge(dst[["team", "id"]].drop_duplicates("team"), on="team", how="left")
+        src.loc[is_dst, "id"] = m["id"].to_numpy()
+    fill(["_key", "team"], dk, ["_key", "team"])
+    fill(["_key"], dk, ["_key"])
+    src["_short"] = short_key(src["_key"])
+    fill(["_short", "team"], dk, ["_short", "team"])
+    return src.drop(columns=["_key", "_short"])
+
+def _resolve(path, dk_path, columns, dk_hash):
+    src = read_source(path, dict(columns))
+    return resolve_ids(src, read_dk_salaries(dk_path))
+
+def load_resolved(path, dk_path, columns=None):
+    """Source rows with DK ids, cached by (source hash, DK hash, column map)"""
+    cols = tuple(sorted((columns or {}).items()))
+    return cached_parse(path, "blend_src", _resolve, dk_path=dk_path, columns=cols, dk_hash=file_hash(dk_path)).copy()
+
+def fill_quantiles(df, targets=("p90",)):
+    """Fill missing quantile columns from the available ones via a per-row normal sigma around p50 (or mean)"""
+    nan = pd.Series(np.nan, index=df.index)
+    med = df.get("p50", nan).fillna(df.get("mean", nan))
+    known = [q for q in Z if q in df.columns and q != "p50"]
+    sigma = nan
+    if known:
+        sig = np.column_stack([((df[q] - med)/Z[q]).to_numpy(float) for q in known])
+        with np.errstate(all="ignore"):
+            sigma = pd.Series(np.nanmean(sig, axis=1), index=df.index)  # all-NaN rows stay NaN
+    for q in targets:
+        est = med + sigma*Z[q]
+        if q == "p90":
+            est = est.fillna(med*P90_MULT)
+        df[q] = df[q].fillna(est) if q in df.columns else est
+    return df
+
+def blend(sources, dk):
+    """
+    sources: {name: (resolved frame, weight, {pos: weight})}. Returns one row per DK player with at least
+    one source: id, name, team, pos, salary, proj, p90, own, n_sources
+    """
+    dk = dk.copy()
+    dk["pos"] = dk["pos"].astype(object)
+    pos = dk.set_index("id")["pos"]
+    ids = pd.Index(sorted(set().union(*[set(f["id"].dropna().astype("int64")) for f, _, _ in sources.values()])), name="id")
+    stacks = {k: [] for k in ("proj", "p90", "own", "w")}
+    for name, (f, weight, pos_w) in sources.items():
+        f = fill_quantiles(f[f["id"].notna()].copy())
+        f["id"] = f["id"].astype("int64")
+        f = f.drop_duplicates("id").set_index("id").reindex(ids)
+        p = pos.reindex(ids)
+        w = p.map(pos_w or {}).fillna(weight).astype(float).to_numpy()
+        stacks["proj"].append(f["mean"].to_numpy(float) if "mean" in f.columns else f["p50"].to_numpy(float))
+        stacks["p90"].append(f["p90"].to_numpy(float))
+        stacks["own"].append(f["own"].where(f["own"] > 0).to_numpy(float) if "own" in f.columns else np.full(len(ids), np.nan))
+        stacks["w"].append(w)
+    W = np.column_stack(stacks["w"])
+    out = pd.DataFrame(index=ids)
+    for k in ("proj", "p90", "own"):
+        V = np.column_stack(stacks[k])
+        ww = np.where(np.isnan(V), 0.0, W)
+        tot = ww.sum(axis=1)
+        out[k] = np.where(tot > 0, np.nansum(V*ww, axis=1)/np.where(tot > 0, tot, 1), np.nan)
+    out["n_sources"] = (~np.isnan(np.column_stack(stacks["proj"]))).sum(axis=1)
+    out = out.join(dk.set_index("id")[["name", "team", "pos", "salary"]]).reset_index()
+    out["p90"] = out[["p90", "proj"]].max(axis=1)
+    out["own"] = out["own"].fillna(DEFAULT_OWN)
+    return out[["id", "name", "team", "pos", "salary", "proj", "p90", "own", "n_sources"]].round(3)
+
+def read_config(path):
+    with open(path) as f:
+        cfg = yaml.safe_load(f) or {}
+    return cfg.get("sources", {})
+
+def main(config_path, dk_path, out, own_out=None):
+    dk = read_dk_salaries(dk_path)
+    sources = {}
+    for name, s in read_config(config_path).items():
+        if not os.path.exists(s["path"]):
+            print(f"[blend] skipping {name}: {s['path']} not found")
+            continue
+        f = load_resolved(s["path"], dk_path, s.get("columns"))
+        print(f"[blend] {name:<12} {len(f):>5} rows, {f['id'].notna().sum():>5} matched to DK IDs")
+        sources[name] = (f, float(s.get("weight", 1.0)), s.get("pos_weights"))
+    if not sources:
+        raise SystemExit(f"No projection sources found from {config_path}")
+    res = blend(sources, dk)
+    res.to_csv(out, index=False)
+    print(f"Wrote {len(res)} blended projections from {len(sources)} source(s) to {out}")
+    if own_out:
+        res[["name", "own"]].to_csv(own_out, index=False)
+        print(f"Wrote ownership to {own_out}")
+    return res
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="config/projection_sources.yaml")
+    ap.add_argument("--dk", default="DKSalaries.csv")
+    ap.add_argument("--out", default="projections.csv")
+    ap.add_argument("--own_out", default=None, help="Also write name,own here")
+    args = ap.parse_args()
+    main(args.config, args.dk, args.out, args.own_out)
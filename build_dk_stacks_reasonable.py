@@ -4,47 +4,36 @@ Build reasonable number of stacks for games available in DraftKings file
 """
 
 import pandas as pd
+from input_cache import read_dk_salaries
 import itertools
 import random
 
 def extract_games_from_dk(dk_df):
-    """Extract games from DraftKings file"""
+    """Extract games from DraftKings salaries (read_dk_salaries: Game Info already parsed)"""
     games = {}
     
-    for _, row in dk_df.iterrows():
-        game_info = row['Game Info']
-        if pd.isna(game_info) or game_info == 'Game Info':
-            continue
-            
-        # Parse game info like "CIN@CLE 09/07/2025 01:00PM ET"
-        parts = game_info.split()
-        if len(parts) >= 1:
-            teams = parts[0].split('@')
-            if len(teams) == 2:
-                away_team = teams[0]
-                home_team = teams[1]
-                game_key = f"{away_team}@{home_team}"
-                
-                if game_key not in games:
-                    games[game_key] = {
-                        'away_team': away_team,
-                        'home_team': home_team,
-                        'away_players': [],
-                        'home_players': []
-                    }
-                
-                # Add player to appropriate team
-                player = {
-                    'name': row['Name'],
-                    'pos': row['Position'],
-                    'salary': row['Salary'],
-                    'team': row['TeamAbbrev']
-                }
-                
-                if row['TeamAbbrev'] == away_team:
-                    games[game_key]['away_players'].append(player)
-                elif row['TeamAbbrev'] == home_team:
-                    games[game_key]['home_players'].append(player)
+    for row in dk_df[dk_df['game'].notna()].itertuples(index=False):
+        game_key = row.game
+        if game_key not in games:
+            games[game_key] = {
+                'away_team': row.away_team,
+                'home_team': row.home_team,
+                'away_players': [],
+                'home_players': []
+            }
+        
+        # Add player to appropriate team
+        player = {
+            'name': row.name,
+            'pos': row.pos,
+            'salary': int(row.salary),
+            'team': row.team
+        }
+        
+        if row.team == row.away_team:
+            games[game_key]['away_players'].append(player)
+        elif row.team == row.home_team:
+            games[game_key]['home_players'].append(player)
     
     return games
 
@@ -108,7 +97,7 @@ def build_reasonable_stacks_for_game(game_data, game_id, max_stacks_per_team=20)
 
 def main():
     # Load DraftKings data
-    dk_df = pd.read_csv('DKSalaries.csv')
+    dk_df = read_dk_salaries('DKSalaries.csv')
     
     # Extract games
     games = extract_games_from_dk(dk_df)
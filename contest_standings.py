@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Streaming parser for DraftKings contest standings exports.
+
+The export has one entry per row (Rank, EntryId, EntryName, Points, Lineup, ...) with the lineup packed
+into one string ("QB Josh Allen RB ... DST Bills"). Chunks are read with only the needed columns, lineups
+are split with one vectorized regex per chunk, and only running counters are kept, so memory stays
+bounded by the number of distinct players/lineups rather than the number of entries.
+
+    python contest_standings.py --standings contest-standings-123.csv --dk DKSalaries.csv --out out/contest
+
+Writes ownership.csv (name, own: % of entries, drop-in for the optimizer), stack_types.csv
+(3v1, 4v1, 2v0, naked ...), salary_usage.csv, dupes.csv and field_summary.json.
+"""
+
+import argparse, os, json
+import pandas as pd, numpy as np
+from collections import Counter
+from input_cache import read_dk_salaries
+
+SLOTS = "QB|RB|WR|TE|FLEX|DST"
+LINEUP_RE = rf"(?:^| )(?P<slot>{SLOTS}) (?P<name>.+?)(?= (?:{SLOTS}) |$)"
+SAL_BIN = 100
+
+def player_map(dk_path):
+    """name -> team/pos/salary/opp from DKSalaries (names stripped, first row wins on duplicates)"""
+    dk = read_dk_salaries(dk_path)
+    dk["name"] = dk["name"].str.strip()
+    cols = [c for c in ("team", "pos", "salary", "opp") if c in dk.columns]
+    return dk.drop_duplicates("name").set_index("name")[cols].astype(object)
+
+def split_lineups(lineups):
+    """Long frame (entry row, slot, name) from a Series of packed lineup strings"""
+    ext = lineups.dropna().str.extractall(LINEUP_RE)
+    ext["name"] = ext["name"].str.strip()
+    ext = ext.reset_index(level="match", drop=True)
+    ext.index.name = "entry"
+    return ext.reset_index()
+
+def entry_features(long, players):
+    """Per-entry salary, stack type and order-independent lineup hash"""
+    long = long.join(players, on="name")
+    long["pos"] = long["pos"].fillna(long["slot"].where(long["slot"] != "FLEX"))
+    qb = long[long["pos"] == "QB"].drop_duplicates("entry").set_index("entry")
+    long["qb_team"] = long["entry"].map(qb["team"])
+    long["qb_opp"] = long["entry"].map(qb["opp"]) if "opp" in qb.columns else np.nan
+    long["mate"] = (long["team"] == long["qb_team"]) & long["pos"].isin(["WR", "TE"])
+    long["back"] = (long["team"] == long["qb_opp"]) & long["pos"].isin(["RB", "WR", "TE"])
+    long["is_qb"] = long["pos"] == "QB"
+
+    starts = np.flatnonzero(np.r_[True, long["entry"].to_numpy()[1:] != long["entry"].to_numpy()[:-1]])
+    entries = long["entry"].to_numpy()[starts]
+    g = long.groupby("entry", sort=False)
+    feats = pd.DataFrame({
+        "salary": g["salary"].sum(min_count=1).to_numpy(),
+        "mates": g["mate"].sum().to_numpy(),
+        "backs": g["back"].sum().to_numpy(),
+        "has_qb": g["is_qb"].any().to_numpy(),
+        "key": np.add.reduceat(pd.util.hash_array(long["name"].to_numpy(dtype=object)), starts),
+    }, index=entries)
+    feats["stack_type"] = np.where(~feats["has_qb"], "no_qb",
+                          np.where(feats["mates"] == 0, np.where(feats["backs"] == 0, "naked", "naked_bb"),
+                                   (feats["mates"] + 1).astype(str) + "v" + feats["backs"].astype(str)))
+    return feats
+
+def parse_standings(path, dk_path, chunksize=100_000):
+    """Stream a standings CSV; returns dict of ownership, stack_types, salary_usage, dupes DataFrames and summary"""
+    players = player_map(dk_path)
+    usecols = lambda c: c in ("EntryId", "Points", "Lineup")
+    own, stacks, sal, keys = Counter(), Counter(), Counter(), Counter()
+    n_entries = unmatched = 0
+    points = []
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, dtype={"Lineup": "string"}):
+        chunk = chunk[chunk["Lineup"].notna() & (chunk["Lineup"].str.len() > 0)].reset_index(drop=True)
+        if chunk.empty:
+            continue
+        long = split_lineups(chunk["Lineup"].astype(object))
+        feats = entry_features(long, players)
+        n_entries += len(feats)
+        own.update(long["name"].value_counts().to_dict())
+        stacks.update(feats["stack_type"].value_counts().to_dict())
+        sal.update((feats["salary"].dropna()//SAL_BIN*SAL_BIN).astype(int).value_counts().to_dict())
+        keys.update(feats["key"].value_counts().to_dict())
+        unmatched += int((~long["name"].isin(players.index)).sum())
+        if "Points" in chunk.columns:
+            points.append(pd.to_numeric(chunk["Points"], errors="coerce").to_numpy(dtype="float32"))
+
+    own_df = pd.DataFrame(sorted(own.items(), key=lambda kv: -kv[1]), columns=["name", "count"])
+    own_df["own"] = (100.0*own_df["count"]/max(n_entries, 1)).round(3)
+    own_df = own_df.join(players, on="name")[["name", "own", "count"] + list(players.columns)]
+    stack_df = pd.DataFrame(sorted(stacks.items(), key=lambda kv: -kv[1]), columns=["stack_type", "entries"])
+    stack_df["pct"] = (100.0*stack_df["entries"]/max(n_entries, 1)).round(3)
+    sal_df = pd.DataFrame(sorted(sal.items()), columns=["salary_bin", "entries"])
+    dup_sizes = Counter(keys.values())  # copies of a lineup -> number of distinct lineups with that many copies
+    dupes = pd.DataFrame(sorted(dup_sizes.items()), columns=["copies", "lineups"])
+    dupes["entries"] = dupes["copies"]*dupes["lineups"]
+
+    pts = np.concatenate(points) if points else np.array([], dtype="float32")
+    sal_mid = sal_df["salary_bin"] + SAL_BIN/2
+    summary = {
+        "entries": n_entries,
+        "unique_lineups": len(keys),
+        "dup_entry_rate": round(1 - dupes.loc[dupes["copies"] == 1, "entries"].sum()/max(n_entries, 1), 4),
+        "max_copies": int(dupes["copies"].max()) if len(dupes) else 0,
+        "mean_salary": round(float((sal_mid*sal_df["entries"]).sum()/max(sal_df["entries"].sum(), 1)), 1),
+        "unmatched_player_slots": unmatched,
+        "points_p50": round(float(np.nanmedian(pts)), 2) if len(pts) else None,
+        "points_p99": round(float(np.nanquantile(pts, 0.99)), 2) if len(pts) else None,
+    }
+    return {"ownership": own_df, "stack_types": stack_df, "salary_usage": sal_df, "dupes": dupes, "summary": summary}
+
+def write_outputs(res, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for name in ("ownership", "stack_types", "salary_usage", "dupes"):
+        res[name].to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+    with open(os.path.join(out_dir, "field_summary.json"), "w") as f:
+        json.dump(res["summary"], f, indent=2)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--standings", required=True, help="DK contest standings export (csv or csv.gz)")
+    ap.add_argument("--dk", required=True, help="DKSalaries.csv for the same slate")
+    ap.add_argument("--out", default="out/contest")
+    ap.add_argument("--chunksize", type=int, default=100_000)
+    args = ap.parse_args()
+    res = parse_standings(args.standings, args.dk, args.chunksize)
+    write_outputs(res, args.out)
+    s = res["summary"]
+    print(f"Parsed {s['entries']} entries ({s['unique_lineups']} unique lineups, dup rate {s['dup_entry_rate']:.1%})")
+    print(res["stack_types"].head(8).to_string(index=False))
+    if s["unmatched_player_slots"]:
+        print(f"WARNING: {s['unmatched_player_slots']} player slots not found in {args.dk}")
+    print(f"Wrote ownership/stack_types/salary_usage/dupes/field_summary to {args.out}")
@@ -5,6 +5,10 @@ Convert Markov chain projections to our required format
 
 import pandas as pd
 import numpy as np
+from input_cache import read_dk_salaries
+from blend_projections import load_resolved, blend
+
+MARKOV_COLUMNS = {"mean": "mean", "p95": "p95", "own": "ownership"}
 
 def convert_markov_projections():
     """
@@ -18,44 +22,16 @@ def convert_markov_projections():
     print(f"Loaded {len(markov_df)} Markov projections")
     print(f"Columns: {list(markov_df.columns)}")
     
-    # Load our DK salaries to match players
-    dk_df = pd.read_csv("DKSalaries.csv")
+    # Resolve to DK players with the blend stage's vectorized matcher (cached by file hash);
+    # p90 is interpolated from p95 instead of copying it
+    source = load_resolved("markov_projections.csv", "DKSalaries.csv", MARKOV_COLUMNS)
+    dk_df = read_dk_salaries("DKSalaries.csv")
     print(f"Loaded {len(dk_df)} DK players")
-    
-    # Create our projections format
-    projections = []
-    
-    for _, markov_row in markov_df.iterrows():
-        markov_name = markov_row['name']
-        markov_team = markov_row['team']
-        markov_pos = markov_row['pos']
-        
-        # Find matching player in DK salaries
-        matching_dk = dk_df[
-            (dk_df['Name'].str.contains(markov_name, case=False, na=False)) |
-            (dk_df['Name'].str.contains(markov_name.split()[0], case=False, na=False) & 
-             dk_df['Name'].str.contains(markov_name.split()[-1], case=False, na=False))
-        ]
-        
-        if len(matching_dk) > 0:
-            dk_row = matching_dk.iloc[0]
-            
-            # Convert Markov projections to our format
-            projection = {
-                'name': dk_row['Name'],
-                'team': dk_row['TeamAbbrev'],
-                'pos': dk_row['Position'],
-                'proj': float(markov_row['mean']),  # Mean projection
-                'p90': float(markov_row['p95']),    # 95th percentile as p90
-                'own': float(markov_row['ownership']) if markov_row['ownership'] > 0 else 5.0  # Default 5% if 0
-            }
-            
-            projections.append(projection)
-        else:
-            print(f"⚠️  No DK match found for: {markov_name} ({markov_team} {markov_pos})")
+    for _, markov_row in markov_df[source["id"].isna().to_numpy()].iterrows():
+        print(f"⚠️  No DK match found for: {markov_row['name']} ({markov_row['team']} {markov_row['pos']})")
     
     # Create projections DataFrame
-    proj_df = pd.DataFrame(projections)
+    proj_df = blend({"markov": (source, 1.0, None)}, dk_df)[["name", "team", "pos", "proj", "p90", "own"]]
     
     print(f"✅ Converted {len(proj_df)} projections")
     
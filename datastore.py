@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Season/week-partitioned Parquet store for weekly inputs and results.
+
+Layout: <root>/<table>/season=YYYY/week=WW/part-0.parquet, plus <root>/_store.json as a marker.
+Reads go through pyarrow with hive partitioning, so season/week/team filters are pushed down
+(only matching partitions and row groups are read) and files are memory-mapped.
+
+    python datastore.py ingest --dir out/week01 --season 2025 --week 1 --root data/store
+    python datastore.py info --root data/store
+
+utils.load_weekly_inputs / load_dk / load_optional accept a store path (the root, or <root>/<table>)
+together with season=/week=.
+"""
+
+import argparse, os, json, glob
+import pandas as pd
+
+MARKER = "_store.json"
+
+# table -> {column: pyarrow type name}; listed columns are required and cast on write,
+# any extra columns are kept as-is
+SCHEMAS = {
+    "schedule": {"game_id": "string", "away_team": "string", "home_team": "string", "start_time": "string", "venue": "string"},
+    "odds": {"home_team_name": "string", "away_team_name": "string", "ou_consensus": "float64", "spread_home_consensus": "float64"},
+    "weather": {"game_id": "string", "home_team": "string", "away_team": "string", "venue_roof": "string", "wind_mph": "float64"},
+    "proe_pace": {"team": "string", "proe": "float64", "sec_per_play_neutral": "float64"},
+    "concentration": {"team": "string", "top2_tgt_share_avg": "float64", "te_route_share": "float64", "rb_route_share": "float64"},
+    "roles": {"team": "string", "QB1": "string", "RB1": "string", "WR1": "string", "WR2": "string", "TE1": "string"},
+    "weekly_inputs": {"game_id": "string", "home_team": "string", "away_team": "string"},
+    "projections": {"name": "string", "team": "string", "pos": "string", "proj": "float64", "p90": "float64"},
+    "ownership": {"name": "string", "own": "float64"},
+    "dk_salaries": {"Position": "string", "Name": "string", "ID": "int64", "Salary": "int32",
+                    "Game Info": "string", "TeamAbbrev": "string"},
+    "edge_scores": {"game_id": "string"},
+    "core_stacks": {},
+    "lineups": {"rank": "int32", "score": "float64", "salary": "int32"},
+}
+
+# columns a team filter applies to (a row matches if any of them is in the team list)
+TEAM_COLUMNS = {
+    "schedule": ["home_team", "away_team"], "weather": ["home_team", "away_team"],
+    "weekly_inputs": ["home_team", "away_team"], "edge_scores": ["home_team", "away_team"],
+    "odds": ["home_abbr", "away_abbr"], "proe_pace": ["team"], "concentration": ["team"], "roles": ["team"],
+    "projections": ["team"], "dk_salaries": ["TeamAbbrev"],
+}
+
+# loose week-directory files picked up by ingest_week
+WEEK_FILES = {
+    "schedule": "schedule.csv", "odds": "odds.csv", "weather": "weather.csv", "proe_pace": "proe_pace.csv",
+    "concentration": "concentration.csv", "roles": "roles.csv", "weekly_inputs": "weekly_inputs.csv",
+    "projections": "projections.csv", "ownership": "ownership.csv", "dk_salaries": "DKSalaries.csv",
+    "edge_scores": "edge_scores.csv", "core_stacks": "core_stacks.csv", "lineups": "lineups_150.csv",
+}
+
+def is_store(path):
+    return bool(path) and os.path.isfile(os.path.join(path, MARKER))
+
+def resolve(path):
+    """(root, table) if path is a store root (table None) or <root>/<table>; None otherwise"""
+    if not path:
+        return None
+    path = os.path.normpath(path)
+    if is_store(path):
+        return path, None
+    parent, name = os.path.split(path)
+    if is_store(parent) and name in SCHEMAS:
+        return parent, name
+    return None
+
+def init_store(root):
+    os.makedirs(root, exist_ok=True)
+    marker = os.path.join(root, MARKER)
+    if not os.path.exists(marker):
+        with open(marker, "w") as f:
+            json.dump({"layout": "table/season=YYYY/week=WW", "format": "parquet"}, f)
+    return root
+
+def partition_path(root, table, season, week):
+    return os.path.join(root, table, f"season={int(season)}", f"week={int(week):02d}")
+
+def enforce_schema(table, df):
+    """pyarrow Table with the declared columns cast; raises ValueError if a required column is missing"""
+    import pyarrow as pa
+    schema = SCHEMAS[table]
+    missing = [c for c in schema if c not in df.columns]
+    if missing:
+        raise ValueError(f"{table}: missing required columns {missing}")
+    df = df.drop(columns=[c for c in ("season", "week") if c in df.columns])
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    fields = [pa.field(c, getattr(pa, schema[c])()) if c in schema else tbl.schema.field(c) for c in tbl.column_names]
+    return tbl.cast(pa.schema(fields))
+
+def write_table(root, table, df, season, week):
+    """Replace one season/week partition of `table` with df; returns the file path"""
+    import pyarrow.parquet as pq
+    if table not in SCHEMAS:
+        raise ValueError(f"unknown table: {table}")
+    init_store(root)
+    d = partition_path(root, table, season, week)
+    os.makedirs(d, exist_ok=True)
+    path = os.path.join(d, "part-0.parquet")
+    pq.write_table(enforce_schema(table, df), path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+def read_table(root, table, seasons=None, weeks=None, teams=None, columns=None, memory_map=True):
+    """
+    Read `table` as a DataFrame with season/week columns, filtered by season, week and team
+    (pushed down to partitions/row groups). Empty DataFrame if nothing matches.
+    """
+    import pyarrow.parquet as pq
+    base = os.path.join(root, table)
+    if not glob.glob(os.path.join(base, "season=*", "week=*", "*.parquet")):
+        return pd.DataFrame()
+    conj = []
+    if seasons is not None:
+        conj.append(("season", "in", [int(s) for s in _listify(seasons)]))
+    if weeks is not None:
+        conj.append(("week", "in", [int(w) for w in _listify(weeks)]))
+    filters = [conj] if conj else None
+    if teams is not None and table in TEAM_COLUMNS:
+        filters = [conj + [(c, "in", list(_listify(teams)))] for c in TEAM_COLUMNS[table]]
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns) + ["season", "week"]))
+    tbl = pq.read_table(base, columns=columns, filters=filters, memory_map=memory_map, partitioning="hive")
+    df = tbl.to_pandas()
+    for c in ("season", "week"):
+        if c in df.columns:
+            df[c] = df[c].astype("int32")
+    return df.reset_index(drop=True)
+
+def partitions(root, table):
+    """Sorted (season, week) pairs stored for a table"""
+    out = []
+    for d in glob.glob(os.path.join(root, table, "season=*", "week=*")):
+        s = os.path.basename(os.path.dirname(d)).split("=")[1]
+        w = os.path.basename(d).split("=")[1]
+        out.append((int(s), int(w)))
+    return sorted(out)
+
+def ingest_week(week_dir, season, week, root, tables=None):
+    """Copy the loose CSVs of a week directory into the store; returns {table: rows}"""
+    init_store(root)
+    done = {}
+    for table, fname in WEEK_FILES.items():
+        if tables and table not in tables:
+            continue
+        path = os.path.join(week_dir, fname)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            continue
+        try:
+            df = pd.read_csv(path)
+        except pd.errors.EmptyDataError:
+            continue
+        write_table(root, table, df, season, week)
+        done[table] = len(df)
+    return done
+
+def _listify(v):
+    return v if isinstance(v, (list, tuple, set)) else [v]
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest", help="Load a week directory of CSVs into the store")
+    ing.add_argument("--dir", required=True)
+    ing.add_argument("--season", type=int, required=True)
+    ing.add_argument("--week", type=int, required=True)
+    ing.add_argument("--root", default="data/store")
+    ing.add_argument("--tables", nargs="+", default=None, choices=list(SCHEMAS))
+    info = sub.add_parser("info", help="List tables and stored partitions")
+    info.add_argument("--root", default="data/store")
+    args = ap.parse_args()
+
+    if args.cmd == "ingest":
+        done = ingest_week(args.dir, args.season, args.week, args.root, args.tables)
+        for t, n in done.items():
+            print(f"  {t:<15} {n:>6} rows")
+        print(f"Ingested {len(done)} tables for {args.season} week {args.week} into {args.root}")
+    else:
+        for t in SCHEMAS:
+            parts = partitions(args.root, t)
+            if parts:
+                print(f"  {t:<15} {len(parts):>3} partitions  {parts[0]}..{parts[-1]}")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+DraftKings upload export.
+
+Players are placed into the roster template's slots with the earliest games in the dedicated slots
+and the latest-kickoff eligible player in FLEX, so late swap keeps the most options open (salary
+breaks ties, and is the whole order when kickoffs are unknown). Rows are written as lineups arrive,
+rolling to a new file every 500 rows (DK's per-upload limit), so thousands of lineups never sit in
+one frame. With contest entry templates (DKEntries.csv per contest) lineups fill the listed entries
+in order, keeping the Entry ID / Contest columns, one upload series per template.
+
+    python dk_export.py --lineups out/lineups_150.csv --dk DKSalaries.csv --out out/upload
+    python dk_export.py --lineups out/lineups_150.csv --dk DKSalaries.csv --entries DKEntries_a.csv DKEntries_b.csv
+
+Lineups files are read in chunks: p1_name..pN_name columns (optimize.py) or long Lineup/Name rows
+(generate_150_lineups.py).
+"""
+
+import argparse, os, re, csv
+import pandas as pd
+from pathlib import Path
+from input_cache import read_dk_salaries
+from roster import get_roster
+from late_swap import META, read_entries
+
+DK_MAX_ROWS = 500
+INSTRUCTIONS = [
+    "1. Locate the player you want to select in the list below",
+    "2. Copy the ID of your player (you can use the Name + ID column or the ID column)",
+    "3. Paste the ID into the roster position desired",
+    "4. You must include an ID for each player; you cannot use just the player's name",
+    "5. You can create up to 500 lineups per file",
+]
+
+def slate_players(dk_path):
+    """
+    {name, id, team, pos, salary, kickoff} records for the slate, keyed by name (first row wins on
+    duplicate names) and by str(id) (every row)
+    """
+    dk = read_dk_salaries(dk_path)
+    if "kickoff" not in dk.columns:
+        dk["kickoff"] = pd.NaT
+    for c in ("team", "pos"):
+        dk[c] = dk[c].astype(object)
+    recs = dk[["name", "id", "team", "pos", "salary", "kickoff"]].to_dict("records")
+    slate = {str(r["id"]): r for r in recs}
+    for r in recs:
+        slate.setdefault(r["name"], r)
+    return slate
+
+def _missing(v):
+    return v is None or (isinstance(v, str) and not v) or (not isinstance(v, str) and pd.isna(v))
+
+def fill_from_slate(p, slate):
+    """The lineup's own player dict, with a missing id/kickoff filled from the slate (by id if it has one, else by name)"""
+    ref = slate.get(p["name"] if _missing(p.get("id")) else str(p["id"]))
+    if ref is None:
+        return p
+    fill = {k: ref[k] for k in ("id", "kickoff") if _missing(p.get(k)) and not _missing(ref.get(k))}
+    return {**p, **fill} if fill else p
+
+def kickoff_key(p):
+    """Roster.assign order (descending): earliest kickoff first, then salary; unknown kickoffs count as earliest"""
+    k = p.get("kickoff")
+    return (-pd.Timestamp(k).value if k is not None and pd.notna(k) else 0, p.get("salary", 0))
+
+def slot_ids(lineup, roster=None, slate=None):
+    """Player IDs in slot order ('' for unfillable slots); missing ids/kickoffs are filled from `slate`"""
+    roster = roster or get_roster()
+    if slate:
+        lineup = [fill_from_slate(p, slate) for p in lineup]
+    return [p.get("id", "") if p else "" for p in roster.assign(lineup, key=kickoff_key)]
+
+class UploadWriter:
+    """CSV rows written as they come, rolling to <stem>_2.csv, <stem>_3.csv ... every `per_file` rows"""
+
+    def __init__(self, out_dir, stem, header, per_file=DK_MAX_ROWS, preamble=()):
+        self.out_dir, self.stem, self.header, self.per_file = out_dir, stem, header, per_file
+        self.preamble = list(preamble)
+        self.paths, self.rows = [], 0
+        self._f = self._w = None
+        self._in_file = 0
+
+    def _roll(self):
+        self.close()
+        os.makedirs(self.out_dir, exist_ok=True)
+        k = len(self.paths) + 1
+        path = os.path.join(self.out_dir, f"{self.stem}.csv" if k == 1 else f"{self.stem}_{k}.csv")
+        self._f = open(path, "w", newline="")
+        self._w = csv.writer(self._f)
+        self._w.writerow(self.header)
+        self._w.writerows(self.preamble)
+        self.paths.append(path)
+        self._in_file = 0
+
+    def write(self, row):
+        if self._f is None or self._in_file >= self.per_file:
+            self._roll()
+        self._w.writerow(row)
+        self._in_file += 1
+        self.rows += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def export(lineups, out_dir, slate=None, roster=None, entries=(), stem="DKUpload", per_file=DK_MAX_ROWS, template=False):
+    """
+    Stream lineups (lists of player dicts) into DK upload files. Without `entries` every lineup is a
+    row of a plain upload (`template` adds DK's blank + Instructions columns and instruction rows);
+    with entry template paths, lineups fill those entries in order.
+    Returns {"lineups", "files", "unfilled_entries", "left_over"}.
+    """
+    roster = roster or get_roster()
+    slots = list(roster.slots)
+    lineups = iter(lineups)
+    files, n, unfilled = [], 0, 0
+    if not entries:
+        header, preamble, tail = slots, (), []
+        if template:
+            header, tail = slots + ["", "Instructions"], ["", ""]
+            preamble = [[""]*(len(slots) + 1) + [t] for t in INSTRUCTIONS] + [[""]*(len(slots) + 2)]
+        with UploadWriter(out_dir, stem, header, per_file, preamble) as w:
+            for lu in lineups:
+                w.write(slot_ids(lu, roster, slate) + tail)
+            files, n = w.paths, w.rows
+        return {"lineups": n, "files": files, "unfilled_entries": 0, "left_over": 0}
+    for path in entries:
+        ent = read_entries(path)[META]
+        with UploadWriter(out_dir, f"{Path(path).stem}_upload", META + slots, per_file) as w:
+            for row in ent.itertuples(index=False):
+                lu = next(lineups, None)
+                if lu is None:
+                    break
+                w.write(list(row) + slot_ids(lu, roster, slate))
+            files += w.paths
+            n += w.rows
+            unfilled += len(ent) - w.rows
+    return {"lineups": n, "files": files, "unfilled_entries": unfilled, "left_over": sum(1 for _ in lineups)}
+
+def iter_lineup_file(path, slate, chunksize=20000):
+    """
+    Lineups streamed from a lineups CSV (wide p*_name or long Lineup/Name), players looked up by
+    p*_id when the file has those columns, by name otherwise
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    wide = [c for c in header if re.fullmatch(r"p\d+_name", c)]
+    if wide:
+        ids = [c[:-len("name")] + "id" for c in wide]
+        ids = ids if set(ids) <= set(header) else []
+        for chunk in pd.read_csv(path, usecols=wide + ids, chunksize=chunksize, dtype=str):
+            pid = chunk[ids].to_numpy() if ids else [[None]*len(wide)]*len(chunk)
+            for names, row_ids in zip(chunk[wide].to_numpy(), pid):
+                yield [slate.get(i) or slate.get(nm, {"name": nm, "pos": None})
+                       for nm, i in zip(names, row_ids) if isinstance(nm, str)]
+        return
+    if not {"Lineup", "Name"} <= set(header):
+        raise ValueError(f"{path}: need p1_name.. columns or Lineup/Name rows")
+    carry, key = [], None
+    for chunk in pd.read_csv(path, usecols=["Lineup", "Name"], chunksize=chunksize, dtype={"Name": str}):
+        for lid, nm in zip(chunk["Lineup"].to_numpy(), chunk["Name"].to_numpy()):
+            if lid != key and carry:
+                yield carry
+                carry = []
+            key = lid
+            carry.append(slate.get(nm, {"name": nm, "pos": None}))
+    if carry:
+        yield carry
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lineups", required=True, help="Lineups CSV (optimize.py or generate_150_lineups.py output)")
+    ap.add_argument("--dk", required=True, help="DKSalaries.csv for IDs and kickoffs")
+    ap.add_argument("--entries", nargs="+", default=(), help="DK entry templates to fill, in order")
+    ap.add_argument("--roster", default="dk_classic", help="Roster template in config/rosters.yaml")
+    ap.add_argument("--out", default="out/upload")
+    ap.add_argument("--stem", default="DKUpload")
+    ap.add_argument("--per_file", type=int, default=DK_MAX_ROWS)
+    args = ap.parse_args()
+    slate = slate_players(args.dk)
+    res = export(iter_lineup_file(args.lineups, slate), args.out, slate, get_roster(args.roster), args.entries,
+                 args.stem, args.per_file)
+    print(f"Wrote {res['lineups']} lineups to {len(res['files'])} file(s) in {args.out}")
+    if res["unfilled_entries"]:
+        print(f"WARNING: {res['unfilled_entries']} entries left empty (not enough lineups)")
+    if res.get("left_over"):
+        print(f"WARNING: {res['left_over']} lineups not placed (not enough entries)")
@@ -0,0 +1,303 @@
+"""
+Exact lineup fill solver.
+
+Given a partial lineup (e.g. a QB + 2 pass-catchers + bring-back stack core), find the
+best score achievable by filling the remaining DK Classic slots under the salary cap.
+
+Salaries are in $100 units. For each position we build a cardinality knapsack table
+    T[pos][k][s] = best total value of exactly k players of pos costing exactly s units
+then combine the positions a completion needs with a max-plus convolution over salary.
+Everything is a handful of NumPy passes, so one exact optimum costs a few milliseconds.
+"""
+
+import heapq, itertools, collections
+import numpy as np
+from roster import get_roster
+
+SAL_UNIT = 100
+SAL_BUCKET = 5  # fill-cache salary buckets, in SAL_UNITs ($500)
+NEG = -np.inf
+
+# DK Classic: QB, 2-3 RB, 3-4 WR, 1-2 TE (RB+WR+TE = 7 incl. FLEX), DST -- compiled from config/rosters.yaml
+ROSTER = get_roster("dk_classic")
+ROSTER_MIN, ROSTER_MAX = ROSTER.min, ROSTER.max
+FLEX_POS = tuple(p for p in ROSTER.positions if ROSTER.min[p] < ROSTER.max[p])
+ROSTER_SIZE = ROSTER.size
+SALARY_CAP = ROSTER.salary_cap
+
+def player_value(p, proj_weight=0.35, own_weight=0.03):
+    """Per-player term of utils.lineup_score"""
+    return p.get("proj", 0) * proj_weight - p.get("own", 0) * own_weight
+
+def final_counts():
+    """All legal final position-count vectors for the roster (as dicts)"""
+    return ROSTER.final_counts()
+
+def position_table(costs, values, kmax, S):
+    """T[k, s] = best value of exactly k of these players with total cost exactly s units"""
+    T = np.full((kmax + 1, S + 1), NEG)
+    T[0, 0] = 0.0
+    for c, v in zip(costs, values):
+        if c > S:
+            continue
+        # RHS is materialised before assignment, so each player is used at most once
+        T[1:, c:] = np.maximum(T[1:, c:], T[:-1, :S + 1 - c] + v)
+    return T
+
+def maxplus(a, b):
+    """out[s] = max_i a[i] + b[s - i]"""
+    S = len(a)
+    out = np.full(S, NEG)
+    for i in np.flatnonzero(np.isfinite(a)):
+        np.maximum(out[i:], a[i] + b[:S - i], out=out[i:])
+    return out
+
+def best_fill_score(core, players, value_fn=player_value, salary_cap=SALARY_CAP, min_salary=0, exclude_teams=()):
+    """
+    Exact best total value (core included) of a legal lineup containing every player in `core`.
+    `exclude_teams` drops non-DST players of those teams from the fill pool. Returns -inf if
+    no legal completion exists.
+    """
+    core_names = {p["name"] for p in core}
+    counts = {pos: 0 for pos in ROSTER_MIN}
+    for p in core:
+        counts[p["pos"]] = counts.get(p["pos"], 0) + 1
+    core_value = sum(value_fn(p) for p in core)
+    core_salary = sum(p["salary"] for p in core)
+    S = (salary_cap - core_salary) // SAL_UNIT
+    if S < 0:
+        return NEG
+    lo = max(0, -(-(min_salary - core_salary) // SAL_UNIT))  # ceil
+
+    needs_by_pos = {}
+    for c in final_counts():
+        need = {pos: c[pos] - counts.get(pos, 0) for pos in c}
+        if any(v < 0 for v in need.values()):
+            continue
+        for pos, k in need.items():
+            needs_by_pos[pos] = max(needs_by_pos.get(pos, 0), k)
+        needs_by_pos.setdefault("_configs", []).append(need)
+    configs = needs_by_pos.pop("_configs", [])
+    if not configs:
+        return NEG
+
+    tables = {}
+    for pos, kmax in needs_by_pos.items():
+        pool = [p for p in players if p["pos"] == pos and p["name"] not in core_names
+                and not (p["team"] in exclude_teams and pos != "DST")]
+        costs = [int(p["salary"]) // SAL_UNIT for p in pool]
+        tables[pos] = position_table(costs, [value_fn(p) for p in pool], kmax, S)
+
+    best = NEG
+    for need in configs:
+        acc = None
+        for pos, k in need.items():
+            row = tables[pos][k]
+            acc = row if acc is None else maxplus(acc, row)
+        window = acc[lo:S + 1]
+        if window.size:
+            best = max(best, float(window.max()))
+    return core_value + best if np.isfinite(best) else NEG
+
+class FillStream:
+    """A generator's items kept as they are produced, so several readers share one lazy search"""
+
+    def __init__(self, gen):
+        self.items, self.gen = [], gen
+
+    def __iter__(self):
+        i = 0
+        while True:
+            if i == len(self.items):
+                item = next(self.gen, None)
+                if item is None:
+                    return
+                self.items.append(item)
+            yield self.items[i]
+            i += 1
+
+class FillCache:
+    """
+    LRU memo of fill subproblems, shared by every FillSolver (all stack blueprints, all engines).
+    Key: pool version, salary-left bucket (SAL_BUCKET units), position needs, excluded-team mask and the pool
+    players a core holds or bans; value: the FillStream of that problem's fills.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key, make):
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = self._entries[key] = make()
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        n = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                "hit_rate": round(self.hits/n, 4) if n else 0.0}
+
+FILL_CACHE = FillCache()
+
+def suffix_tables(costs, values, kmax, S):
+    """U[i, k, s] = best value of exactly k of players[i:] with total cost at most s units"""
+    n = len(costs)
+    U = np.full((n + 1, kmax + 1, S + 1), NEG)
+    U[:, 0, :] = 0.0
+    for i in range(n - 1, -1, -1):
+        U[i] = U[i + 1]
+        c, v = int(costs[i]), values[i]
+        if c <= S:
+            U[i, 1:, c:] = np.maximum(U[i + 1, 1:, c:], U[i + 1, :-1, :S + 1 - c] + v)
+    return U
+
+class FillSolver:
+    """
+    Exact fills of partial lineups (stack cores) from one player pool, by branch-and-bound.
+
+    Per excluded-team mask, each position's players are sorted by value and turned into suffix
+    knapsack tables (`suffix_tables`); per need configuration (players still needed per position)
+    the positions later in the search are max-plus combined into a "rest" table. A branch's bound is
+        value so far + max over s of  U[pos][i][k][s] + rest[budget - s]
+    which only relaxes the salary floor and banned players, so searching best-bound-first yields fills in exact value
+    order and never expands a branch that cannot reach the next one. Tables are built once per mask
+    and reused by every core that excludes the same teams.
+
+        solver = FillSolver(players)
+        for value, fill in solver.top_fills(core, k=5, exclude_teams={"KC", "BUF"}, min_salary=49000): ...
+        fills = solver.iter_fills(core, exclude_teams={"KC", "BUF"})   # lazy, as deep as needed
+    """
+
+    def __init__(self, players, value_fn=player_value, salary_cap=SALARY_CAP, roster=ROSTER, cache=None):
+        self.players = list(players)
+        self.cache = FILL_CACHE if cache is None else cache
+        self.roster, self.salary_cap, self.value_fn = roster, salary_cap, value_fn
+        self.S = salary_cap // SAL_UNIT
+        self.value = np.array([value_fn(p) for p in self.players], dtype=float)
+        self.cost = np.array([int(p["salary"]) // SAL_UNIT for p in self.players], dtype=int)
+        self.index = {p["name"]: i for i, p in enumerate(self.players)}
+        self.team_bit = {t: 1 << i for i, t in enumerate(sorted({p["team"] for p in self.players}))}
+        self._pools, self._rests = {}, {}
+        # pool fingerprint: solvers over the same players, values and cap share cache entries
+        self.version = hash((roster.name, salary_cap, tuple(p["name"] for p in self.players),
+                             self.cost.tobytes(), self.value.tobytes()))
+
+    def team_mask(self, teams):
+        return sum(self.team_bit.get(t, 0) for t in set(teams))
+
+    def pools(self, mask):
+        """pos -> (player indexes by value desc, suffix tables) with the mask's non-DST players dropped"""
+        if mask not in self._pools:
+            out = {}
+            for pos in self.roster.positions:
+                idx = [i for i, p in enumerate(self.players)
+                       if p["pos"] == pos and (pos == "DST" or not mask & self.team_bit[p["team"]])]
+                idx = np.array(sorted(idx, key=lambda i: -self.value[i]), dtype=int)
+                out[pos] = (idx, suffix_tables(self.cost[idx], self.value[idx], self.roster.max[pos], self.S))
+            self._pools[mask] = out
+        return self._pools[mask]
+
+    def plan(self, mask, need):
+        """Search order (smallest pools first) and rest tables for one need configuration"""
+        key = (mask, need)
+        if key not in self._rests:
+            pools = self.pools(mask)
+            order = sorted((p for p, k in need if k), key=lambda p: len(pools[p][0]))
+            rests = [np.zeros(self.S + 1)]
+            for pos in reversed(order[1:]):
+                rests.append(maxplus(rests[-1], pools[pos][1][0, dict(need)[pos]]))
+            self._rests[key] = (order, dict(need), rests[::-1])
+        return self._rests[key]
+
+    def needs(self, core):
+        """Need configurations (sorted (pos, count) tuples) that complete `core` to a legal roster"""
+        counts = collections.Counter(p["pos"] for p in core)
+        out = []
+        for c in self.roster.final_counts():
+            need = {pos: c[pos] - counts.get(pos, 0) for pos in c}
+            if set(counts) <= set(c) and all(v >= 0 for v in need.values()):
+                out.append(tuple(sorted(need.items())))
+        return out
+
+    def iter_fills(self, core, exclude_teams=(), min_salary=0, banned=()):
+        """
+        Completions of `core` lazily, best first, as (lineup value, fill players). The residual problem
+        (salary left, needs, excluded teams, pool players the core holds or bans) is looked up in the
+        fill cache, so cores leaving the same problem read one shared search. `exclude_teams` drops their
+        non-DST players; `banned` names are never picked.
+        """
+        core_salary = sum(p["salary"] for p in core)
+        budget = (self.salary_cap - core_salary) // SAL_UNIT
+        if budget < 0:
+            return
+        mask = self.team_mask(exclude_teams)
+        needs = tuple(self.needs(core))
+        # core/banned players the mask already drops cannot be picked anyway, so they stay out of the key
+        skip = frozenset(i for i in (self.index.get(n) for n in itertools.chain((p["name"] for p in core), banned))
+                         if i is not None and (self.players[i]["pos"] == "DST" or not mask & self.team_bit[self.players[i]["team"]]))
+        # one search per salary bucket, run at the bucket's top; readers drop fills over their own budget,
+        # which keeps value order, so every reader still gets its exact best-first sequence
+        top = min(self.S, budget - budget % SAL_BUCKET + SAL_BUCKET - 1)
+        key = (self.version, top, needs, mask, skip)
+        stream = self.cache.get(key, lambda: FillStream(self._search(top, needs, mask, skip)))
+        floor_salary, cap = min_salary - core_salary, self.salary_cap - core_salary
+        core_value = sum(self.value_fn(p) for p in core)
+        for v, sal, picks in stream:
+            if floor_salary <= sal <= cap:
+                yield core_value + v, [self.players[x] for x in picks]
+
+    def _search(self, budget, needs, mask, skip):
+        """
+        Best-first search yielding (fill value, fill salary, player indexes) in value order: a node is
+        "pick r more of position j from pool index i on"; popping it pushes the child that takes player i
+        and the sibling that skips it. The bound is exact once a node is complete, so complete fills come
+        off the queue in value order and only the frontier needed so far is ever expanded.
+        """
+        pools = self.pools(mask)
+        plans = [self.plan(mask, need) for need in needs]
+        heap, seq = [], itertools.count()
+
+        def push(plan, j, i, r, b, v, sal, picks):
+            order, need, rests = plans[plan]
+            while r == 0 and j + 1 < len(order):
+                j, i, r = j + 1, 0, need[order[j + 1]]
+            if r == 0:
+                bound = v  # complete
+            else:
+                U = pools[order[j]][1]
+                bound = v + (U[i, r, :b + 1] + rests[j][b::-1]).max()
+            if bound > NEG:
+                heapq.heappush(heap, (-bound, next(seq), plan, j, i, r, b, v, sal, picks))
+
+        for k in range(len(plans)):
+            push(k, -1, 0, 0, budget, 0.0, 0, ())
+        while heap:
+            _, _, plan, j, i, r, b, v, sal, picks = heapq.heappop(heap)
+            if r == 0:
+                yield v, sal, picks
+                continue
+            p = pools[plans[plan][0][j]][0][i]
+            push(plan, j, i + 1, r, b, v, sal, picks)
+            c = self.cost[p]
+            if c <= b and p not in skip:
+                push(plan, j, i + 1, r - 1, b - c, v + self.value[p], sal + self.players[p]["salary"], picks + (p,))
+
+    def top_fills(self, core, k=1, exclude_teams=(), min_salary=0, banned=()):
+        """Up to `k` best distinct completions of `core`, best first, as (lineup value, fill players)"""
+        return list(itertools.islice(self.iter_fills(core, exclude_teams, min_salary, banned), k))
+
+    def best_fill(self, core, exclude_teams=(), min_salary=0, banned=()):
+        """Best completion as (lineup value, fill players), or (-inf, None) when none exists"""
+        top = self.top_fills(core, 1, exclude_teams, min_salary, banned)
+        return top[0] if top else (NEG, None)
@@ -6,8 +6,9 @@ Generate 150 lineups with enhanced salary tier system
 import pandas as pd
 import random
 import collections
-import csv
+from profiling import add_profile_args, maybe_profile
 from utils import load_dk, load_optional, lineup_score
+from dk_export import export, slate_players
 
 def get_opponent_team(qb_team, schedule_df):
     """Get the opponent team for a given QB's team from the schedule"""
@@ -72,10 +73,11 @@ def get_salary_tier(player, tiers):
     else:
         return 'punt'
 
-def build_enhanced_lineup(players, schedule_df, tiers, max_attempts=1000):
+def build_enhanced_lineup(players, schedule_df, tiers, max_attempts=1000, rng=None):
     """
     Build lineup with salary tier awareness
     """
+    rng = rng or random
     for attempt in range(max_attempts):
         lu = []
         
@@ -91,7 +93,7 @@ def build_enhanced_lineup(players, schedule_df, tiers, max_attempts=1000):
             x['salary']
         ), reverse=True)
         
-        qb = random.choice(qb_candidates[:10])  # Top 10 by preference
+        qb = rng.choice(qb_candidates[:10])  # Top 10 by preference
         lu.append(qb)
         qb_team = qb['team']
         
@@ -126,7 +128,7 @@ def build_enhanced_lineup(players, schedule_df, tiers, max_attempts=1000):
         
         # Sort by salary and pick one
         opponent_players.sort(key=lambda x: x['salary'], reverse=True)
-        bring_back = random.choice(opponent_players[:10])  # Top 10 by salary
+        bring_back = rng.choice(opponent_players[:10])  # Top 10 by salary
         lu.append(bring_back)
         
         # 5. Fill remaining positions with tier awareness
@@ -155,7 +157,7 @@ def build_enhanced_lineup(players, schedule_df, tiers, max_attempts=1000):
             
             # Pick from top portion
             top_portion = min(15, len(available))
-            player = random.choice(available[:top_portion])
+            player = rng.choice(available[:top_portion])
             lu.append(player)
         
         # 6. Validate lineup
@@ -172,63 +174,8 @@ def build_enhanced_lineup(players, schedule_df, tiers, max_attempts=1000):
     
     return None
 
-def format_lineup_for_draftkings(lineup, lineup_num):
-    """Format lineup for DraftKings CSV upload"""
-    # Map positions to DraftKings format
-    qb = next(p for p in lineup if p['pos'] == 'QB')
-    rbs = [p for p in lineup if p['pos'] == 'RB']
-    wrs = [p for p in lineup if p['pos'] == 'WR']
-    tes = [p for p in lineup if p['pos'] == 'TE']
-    dst = next(p for p in lineup if p['pos'] == 'DST')
-    
-    # FLEX can be RB, WR, or TE (pick the one not already used)
-    flex_candidates = []
-    if len(rbs) > 2:
-        flex_candidates.append(rbs[2])
-    if len(wrs) > 3:
-        flex_candidates.append(wrs[3])
-    if len(tes) > 1:
-        flex_candidates.append(tes[1])
-    
-    if not flex_candidates:
-        # If no extra players, use the last player of any position
-        used_players = [qb] + rbs[:2] + wrs[:3] + tes[:1] + [dst]
-        flex = [p for p in lineup if p not in used_players][0]
-    else:
-        flex = flex_candidates[0]
-    
-    return {
-        "QB": qb['id'],
-        "RB": rbs[0]['id'],
-        "RB.1": rbs[1]['id'],
-        "WR": wrs[0]['id'],
-        "WR.1": wrs[1]['id'],
-        "WR.2": wrs[2]['id'],
-        "TE": tes[0]['id'],
-        "FLEX": flex['id'],
-        "DST": dst['id'],
-        "": "",
-        "Instructions": f"Lineup {lineup_num}"
-    }
-
-def main():
-    print("🚀 GENERATING 150 ENHANCED LINEUPS")
-    print("=" * 60)
-    
-    # Load data
-    dk_df = load_dk("DKSalaries.csv")
-    proj_df = load_optional("projections.csv")
-    own_df = load_optional("ownership.csv")
-    schedule_df = pd.read_csv("out/week01/weekly_inputs.csv")
-    
-    print(f"DK players: {len(dk_df)}")
-    print(f"Projections: {len(proj_df)}")
-    print(f"Ownership: {len(own_df)}")
-    
-    # Calculate dynamic salary tiers
-    tiers = calculate_dynamic_salary_tiers(dk_df)
-    
-    # Build players list with IDs
+def load_players(dk_df, proj_df, own_df):
+    """Build player dicts for players that have both a projection and an ownership row"""
     players = []
     for _, row in dk_df.iterrows():
         proj_row = proj_df[proj_df["name"] == row["name"]]
@@ -240,23 +187,20 @@ def main():
                 "salary": int(row["salary"]), "id": str(row["id"]),
                 "proj": float(proj_row.iloc[0]["proj"])
             })
-    
-    print(f"Valid players: {len(players)}")
-    
-    # Generate 150 lineups
+    return players
+
+def generate_lineups(players, schedule_df, tiers, n=150, max_attempts=200000, rng=None):
+    """Repeatedly build tier-aware lineups until n are found; returns (score, lineup) tuples"""
     lineups = []
-    max_attempts = 200000
-    
-    print(f"\n🔨 Building 150 enhanced lineups...")
     
     for attempt in range(max_attempts):
-        if len(lineups) >= 150:
+        if len(lineups) >= n:
             break
             
         if attempt % 5000 == 0:
             print(f"Attempt {attempt}, lineups: {len(lineups)}")
         
-        lu = build_enhanced_lineup(players, schedule_df, tiers)
+        lu = build_enhanced_lineup(players, schedule_df, tiers, rng=rng)
         
         if lu is None:
             continue
@@ -267,6 +211,33 @@ def main():
         
         if len(lineups) % 25 == 0:
             print(f"✅ Generated {len(lineups)} lineups...")
+    return lineups
+
+def main():
+    print("🚀 GENERATING 150 ENHANCED LINEUPS")
+    print("=" * 60)
+    
+    # Load data
+    dk_df = load_dk("DKSalaries.csv")
+    proj_df = load_optional("projections.csv")
+    own_df = load_optional("ownership.csv")
+    schedule_df = pd.read_csv("out/week01/weekly_inputs.csv")
+    
+    print(f"DK players: {len(dk_df)}")
+    print(f"Projections: {len(proj_df)}")
+    print(f"Ownership: {len(own_df)}")
+    
+    # Calculate dynamic salary tiers
+    tiers = calculate_dynamic_salary_tiers(dk_df)
+    
+    # Build players list with IDs
+    players = load_players(dk_df, proj_df, own_df)
+    
+    print(f"Valid players: {len(players)}")
+    
+    # Generate 150 lineups
+    print(f"\n🔨 Building 150 enhanced lineups...")
+    lineups = generate_lineups(players, schedule_df, tiers)
     
     print(f"\n🎉 Generated {len(lineups)} lineups!")
     
@@ -297,40 +268,9 @@ def main():
     # Export to CSV
     print(f"\n💾 Exporting to CSV...")
     
-    with open("out/week01/lineups_150_enhanced.csv", "w", newline='') as f:
-        fieldnames = ["QB", "RB", "RB.1", "WR", "WR.1", "WR.2", "TE", "FLEX", "DST", "", "Instructions"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        
-        # Write header row
-        writer.writerow({
-            "QB": "QB", "RB": "RB", "RB.1": "RB", "WR": "WR", "WR.1": "WR", "WR.2": "WR", 
-            "TE": "TE", "FLEX": "FLEX", "DST": "DST", "": "", "Instructions": "Instructions"
-        })
-        
-        # Write instruction rows
-        for i in range(1, 6):
-            row = {field: "" for field in fieldnames}
-            if i == 1:
-                row["Instructions"] = "1. Locate the player you want to select in the list below"
-            elif i == 2:
-                row["Instructions"] = "2. Copy the ID of your player (you can use the Name + ID column or the ID column)"
-            elif i == 3:
-                row["Instructions"] = "3. Paste the ID into the roster position desired"
-            elif i == 4:
-                row["Instructions"] = "4. You must include an ID for each player; you cannot use just the player's name"
-            elif i == 5:
-                row["Instructions"] = "5. You can create up to 500 lineups per file"
-            writer.writerow(row)
-        
-        # Write empty row
-        writer.writerow({field: "" for field in fieldnames})
-        
-        # Write lineup rows
-        for i, (score, lu) in enumerate(lineups, 1):
-            row = format_lineup_for_draftkings(lu, i)
-            writer.writerow(row)
-    
-    print(f"✅ Exported {len(lineups)} lineups to out/week01/lineups_150_enhanced.csv")
+    res = export([lu for _, lu in lineups], "out/week01", slate_players("DKSalaries.csv"),
+                 stem="lineups_150_enhanced", template=True)
+    print(f"✅ Exported {res['lineups']} lineups to {', '.join(res['files'])}")
     
     # Final summary
     print(f"\n📊 FINAL SUMMARY:")
@@ -362,4 +302,9 @@ def main():
         print(f"     {tier}: {count} ({pct:.1f}%)")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    ap = argparse.ArgumentParser()
+    add_profile_args(ap)
+    args = ap.parse_args()
+    with maybe_profile(args, "out/week01", "generate_150_enhanced_profile"):
+        main()
@@ -8,7 +8,11 @@ Generate 150 lineups using proper stacking rules:
 import pandas as pd
 import random
 import collections
+from profiling import add_profile_args, maybe_profile
 from utils import read_weights, load_dk, load_optional, lineup_score
+from roster import get_roster
+from dk_export import export, slate_players
+from anytime import Budget, Portfolio, Checkpoint, fingerprint, frame_hash
 
 def get_opponent_team(qb_team, schedule_df):
     """Get the opponent team for a given QB's team from the schedule"""
@@ -51,67 +55,13 @@ def format_lineup_for_display(lineup):
         "DST": dst
     }
 
-def format_lineup_for_draftkings(lineup, lineup_num):
-    """Format lineup for DraftKings CSV upload - exact format from DKSalaries_upload_format.csv"""
-    # Sort players by position priority
-    qb = [p for p in lineup if p["pos"] == "QB"][0]
-    rbs = sorted([p for p in lineup if p["pos"] == "RB"], key=lambda x: x["salary"], reverse=True)
-    wrs = sorted([p for p in lineup if p["pos"] == "WR"], key=lambda x: x["salary"], reverse=True)
-    tes = sorted([p for p in lineup if p["pos"] == "TE"], key=lambda x: x["salary"], reverse=True)
-    dst = [p for p in lineup if p["pos"] == "DST"][0]
-    
-    # Determine FLEX (highest salary remaining player)
-    remaining = []
-    if len(rbs) > 2:
-        remaining.extend(rbs[2:])
-    if len(wrs) > 3:
-        remaining.extend(wrs[3:])
-    if len(tes) > 1:
-        remaining.extend(tes[1:])
-    
-    flex = max(remaining, key=lambda x: x["salary"]) if remaining else None
-    
-    # Create DraftKings format row - just player IDs in correct positions
-    row = {
-        "QB": qb.get('id', ''),
-        "RB": rbs[0].get('id', '') if len(rbs) > 0 else '',
-        "RB.1": rbs[1].get('id', '') if len(rbs) > 1 else '',
-        "WR": wrs[0].get('id', '') if len(wrs) > 0 else '',
-        "WR.1": wrs[1].get('id', '') if len(wrs) > 1 else '',
-        "WR.2": wrs[2].get('id', '') if len(wrs) > 2 else '',
-        "TE": tes[0].get('id', '') if len(tes) > 0 else '',
-        "FLEX": flex.get('id', '') if flex else '',
-        "DST": dst.get('id', ''),
-        "": "",  # Empty column
-        "Instructions": ""  # Empty column
-    }
-    
-    return row
-
-def pos_ok(lineup, to_add_pos):
-    counts = collections.Counter([p["pos"] for p in lineup])
-    
-    # During building, be very flexible to allow reaching 9 players
-    if len(lineup) < 9:
-        # Allow maximum flexibility during building
-        limits = {"QB":1,"RB":5,"WR":6,"TE":4,"DST":1}
-    else:
-        # Strict limits for final validation
-        limits = {"QB":1,"RB":3,"WR":4,"TE":2,"DST":1}
-    
-    return counts[to_add_pos] < limits.get(to_add_pos, 0)
+def pos_ok(lineup, to_add_pos, roster=None):
+    # Exact: a position is accepted only while the lineup can still be completed to a legal roster
+    return (roster or get_roster()).can_add(lineup, to_add_pos)
 
-def finalize_positions(lineup):
-    # Validate exactly: QB1, RB2, WR3, TE1, DST1, FLEX1 among RB/WR/TE
-    counts = collections.Counter([p["pos"] for p in lineup])
-    if counts["QB"] != 1: return False
-    if counts["DST"] != 1: return False
-    # RB/WR/TE totals: should be 7 with at least RB2/WR3/TE1
-    r = counts["RB"]; w = counts["WR"]; t = counts["TE"]
-    if r + w + t != 7: return False
-    if r < 2 or w < 3 or t < 1: return False
-    # ok
-    return True
+def finalize_positions(lineup, roster=None):
+    # Validate exactly against the roster template (DK Classic: QB1, RB2, WR3, TE1, DST1, FLEX1 among RB/WR/TE)
+    return (roster or get_roster()).is_final(lineup)
 
 def ok_ownership(lineup, cfg):
     own = sum(p["own"] for p in lineup)
@@ -150,41 +100,8 @@ def has_proper_stack(lineup, schedule_df):
     
     return has_double_stack and has_bringback
 
-def main():
-    # Load configuration
-    cfg = read_weights("config/weights.yaml")
-    
-    # Adjust salary constraints for this approach
-    cfg["min_salary"] = 49600  # Minimum salary requirement
-    print(f"Config: {cfg}")
-    
-    # Load data
-    dk_df = load_dk("DKSalaries.csv")
-    
-    # Load real projections and ownership if available
-    proj_df = load_optional("projections.csv")
-    own_df = load_optional("ownership.csv")
-    
-    # Validate that we have real data
-    if proj_df.empty:
-        raise ValueError("REAL PROJECTIONS REQUIRED: Please provide projections.csv with columns: name,team,pos,proj,p90,own")
-    
-    if own_df.empty:
-        raise ValueError("REAL OWNERSHIP REQUIRED: Please provide ownership.csv with columns: name,own")
-    
-    # Load schedule to get correct opponent teams
-    schedule_df = pd.read_csv("out/week01/weekly_inputs.csv")
-    
-    # Load injury report to filter out injured players
-    injury_df = pd.read_csv("nfl-injury-report.csv")
-    injured_players = set()
-    for _, row in injury_df.iterrows():
-        if row['Status'] in ['Out', 'IR', 'IR-R', 'NFI-R', 'PUP-R', 'Reserve-CEL', 'Reserve-Ex', 'Reserve-Ret', 'Reserve-Sus']:
-            injured_players.add(row['Player'])
-    
-    print(f"Filtering out {len(injured_players)} injured players")
-    
-    # Build player rows (filtering out injured players)
+def load_players(dk_df, proj_df, own_df, injured_players=()):
+    """Build player dicts from DK salaries joined to projections and ownership"""
     players = []
     for _, row in dk_df.iterrows():
         # Skip injured players
@@ -201,8 +118,16 @@ def main():
             "p90": float(proj_row["p90"]) if proj_row is not None else 0.0,
             "own": float(own_row["own"]) if own_row is not None else 5.0
         })
-    
-    print(f"Loaded {len(players)} players")
+    return players
+
+def generate_lineups(players, schedule_df, cfg, n=150, max_attempts=20000, rng=None, budget=None, checkpoint=None):
+    """
+    Randomized stack-first generation; returns up to n (score, lineup) tuples sorted by score.
+    With a limited `budget` (anytime.Budget) it keeps going until the budget runs out instead, the
+    best n so far always being a valid portfolio; `checkpoint` (anytime.Checkpoint) saves the
+    portfolio, RNG state and counters periodically and resumes from them.
+    """
+    rng = rng or random
     
     # Apply positional minimum salary filters to avoid low-salary players who might not play much
     original_count = len(players)
@@ -221,16 +146,35 @@ def main():
     
     players.sort(key=lambda x: x["score"], reverse=True)
     
-    # Generate 150 lineups with proper stacking
-    lineups = []
-    seen_five_sets = set()
-    rng = random.Random(42)
+    # Generate lineups with proper stacking
+    portfolio = Portfolio(n, key=lambda lu: tuple(sorted([p["name"] for p in lu[:5]])))
+    lineups, seen_five_sets = portfolio.lineups, portfolio.keys
+    anytime = budget is not None and budget.limited
     
     attempts = 0
-    max_attempts = 20000
+    if checkpoint is not None:
+        state = checkpoint.load()
+        if state:
+            # saved lineups are re-checked against the current rules before they count
+            valid = lambda lu: (len(lu) == 9 and finalize_positions(lu) and has_proper_stack(lu, schedule_df)
+                                and cfg["min_salary"] <= sum(p["salary"] for p in lu) <= cfg["max_salary"]
+                                and ok_ownership(lu, cfg))
+            dropped = portfolio.restore(state["lineups"], {p["name"]: p for p in players}, valid)
+            if dropped:
+                print(f"Dropped {dropped} checkpointed lineups that no longer pass the lineup rules")
+            rng.setstate(state["rng"])
+            attempts = state["attempts"]
+            portfolio.replaced = state.get("replaced", 0)
+            print(f"Resumed from {checkpoint.path}: {len(lineups)} lineups after {attempts} attempts")
+
+    def save():
+        checkpoint.save({"lineups": portfolio.to_names(), "rng": rng.getstate(), "attempts": attempts,
+                         "replaced": portfolio.replaced})
     
-    while len(lineups) < 150 and attempts < max_attempts:
+    while (not budget.expired()) if anytime else (len(lineups) < n and attempts < max_attempts):
         attempts += 1
+        if checkpoint is not None and checkpoint.due():
+            save()
         
         if attempts % 1000 == 0:
             print(f"Attempt {attempts}, lineups: {len(lineups)}")
@@ -243,7 +187,7 @@ def main():
             
             # Sort by salary and pick from top 50%
             qb_pool.sort(key=lambda x: x["salary"], reverse=True)
-            qb = random.choice(qb_pool[:len(qb_pool)//2])
+            qb = rng.choice(qb_pool[:len(qb_pool)//2])
             lu = [qb]
             qb_team = qb["team"]
             
@@ -265,7 +209,7 @@ def main():
             
             # Sort by salary (higher first) and pick top 2
             same_team_pass_catchers.sort(key=lambda x: x["salary"], reverse=True)
-            selected_pass_catchers = random.sample(same_team_pass_catchers[:min(8, len(same_team_pass_catchers))], 2)
+            selected_pass_catchers = rng.sample(same_team_pass_catchers[:min(8, len(same_team_pass_catchers))], 2)
             lu.extend(selected_pass_catchers)
             
             # NO additional players from QB's team - stack is complete with 3 players total
@@ -276,7 +220,7 @@ def main():
                 continue
             
             opponent_players.sort(key=lambda x: x["salary"], reverse=True)
-            lu.append(random.choice(opponent_players[:min(10, len(opponent_players))]))
+            lu.append(rng.choice(opponent_players[:min(10, len(opponent_players))]))
             
             # Now fill remaining positions with players from OTHER teams (not QB's team, not opponent team)
             # This ensures we have: QB + 2 stack players + 1 bring-back + 5 other players
@@ -322,7 +266,7 @@ def main():
                 # Sort by salary (higher first) to allow more salary variation
                 valid_players.sort(key=lambda x: x["salary"], reverse=True)
                 # Pick from top 20 players to allow more variation
-                selected = random.choice(valid_players[:min(20, len(valid_players))])
+                selected = rng.choice(valid_players[:min(20, len(valid_players))])
                 lu.append(selected)
                 available_players.remove(selected)
             
@@ -364,26 +308,72 @@ def main():
             if five in seen_five_sets:
                 print(f"  DUPLICATE: Skipping lineup")
                 continue
-                
-            seen_five_sets.add(five)
             
-            # Add lineup
+            # Add lineup (anytime: once the portfolio is full, only by beating its worst)
             score = lineup_score(lu, 0.35, 0.03)
-            lineups.append((score, lu))
+            if not portfolio.offer(score, lu):
+                continue
             print(f"  SUCCESS: Added lineup {len(lineups)}")
             
-            if len(lineups) % 10 == 0:
+            if len(lineups) % 10 == 0 and not portfolio.replaced:
                 print(f"Generated {len(lineups)} lineups...")
                 
         except Exception as e:
             print(f"Error on attempt {attempts}: {e}")
             continue
     
-    print(f"Generated {len(lineups)} lineups total")
+    if checkpoint is not None:
+        save()
+    print(f"Generated {len(lineups)} lineups total" + (f" ({portfolio.replaced} improved in {attempts} attempts)" if anytime else ""))
     
-    # Sort by score and take top 150
+    # Sort by score and take top n
     lineups.sort(key=lambda x: x[0], reverse=True)
-    lineups = lineups[:150]
+    return lineups[:n]
+
+def main(deadline=None, time_budget=None, checkpoint=None, checkpoint_every=30.0):
+    # Load configuration
+    cfg = read_weights("config/weights.yaml")
+    
+    # Adjust salary constraints for this approach
+    cfg["min_salary"] = 49600  # Minimum salary requirement
+    print(f"Config: {cfg}")
+    
+    # Load data
+    dk_df = load_dk("DKSalaries.csv")
+    
+    # Load real projections and ownership if available
+    proj_df = load_optional("projections.csv")
+    own_df = load_optional("ownership.csv")
+    
+    # Validate that we have real data
+    if proj_df.empty:
+        raise ValueError("REAL PROJECTIONS REQUIRED: Please provide projections.csv with columns: name,team,pos,proj,p90,own")
+    
+    if own_df.empty:
+        raise ValueError("REAL OWNERSHIP REQUIRED: Please provide ownership.csv with columns: name,own")
+    
+    # Load schedule to get correct opponent teams
+    schedule_df = pd.read_csv("out/week01/weekly_inputs.csv")
+    
+    # Load injury report to filter out injured players
+    injury_df = pd.read_csv("nfl-injury-report.csv")
+    injured_players = set()
+    for _, row in injury_df.iterrows():
+        if row['Status'] in ['Out', 'IR', 'IR-R', 'NFI-R', 'PUP-R', 'Reserve-CEL', 'Reserve-Ex', 'Reserve-Ret', 'Reserve-Sus']:
+            injured_players.add(row['Player'])
+    
+    print(f"Filtering out {len(injured_players)} injured players")
+    
+    # Build player rows (filtering out injured players)
+    players = load_players(dk_df, proj_df, own_df, injured_players)
+    print(f"Loaded {len(players)} players")
+    
+    # Anytime mode (--deadline / --time_budget): improve the best 150 until time runs out, checkpointing as we go
+    budget = Budget(deadline, time_budget)
+    if budget.limited and checkpoint is None:
+        checkpoint = "out/week01/generate_150.ckpt"
+    ckpt = Checkpoint(checkpoint, fingerprint(players, 150, sorted(cfg.items()), frame_hash(schedule_df)), checkpoint_every) if checkpoint else None
+    lineups = generate_lineups(players, schedule_df, cfg, budget=budget, checkpoint=ckpt)
     
     # Export lineups in standard format
     rows = []
@@ -405,43 +395,19 @@ def main():
     df.to_csv("out/week01/lineups_150_proper_stacks.csv", index=False)
     print(f"Exported {len(lineups)} lineups to out/week01/lineups_150_proper_stacks.csv")
     
-    # Export lineups in DraftKings upload format - exact format from DKSalaries_upload_format.csv
-    import csv
-    
-    with open("out/week01/lineups_150_draftkings_upload.csv", "w", newline='') as f:
-        fieldnames = ["QB", "RB", "RB.1", "WR", "WR.1", "WR.2", "TE", "FLEX", "DST", "", "Instructions"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        
-        # Write header row
-        writer.writerow({
-            "QB": "QB", "RB": "RB", "RB.1": "RB", "WR": "WR", "WR.1": "WR", "WR.2": "WR", 
-            "TE": "TE", "FLEX": "FLEX", "DST": "DST", "": "", "Instructions": "Instructions"
-        })
-        
-        # Write instruction rows (empty except for Instructions column)
-        for i in range(1, 6):
-            row = {field: "" for field in fieldnames}
-            if i == 1:
-                row["Instructions"] = "1. Locate the player you want to select in the list below"
-            elif i == 2:
-                row["Instructions"] = "2. Copy the ID of your player (you can use the Name + ID column or the ID column)"
-            elif i == 3:
-                row["Instructions"] = "3. Paste the ID into the roster position desired"
-            elif i == 4:
-                row["Instructions"] = "4. You must include an ID for each player; you cannot use just the player's name"
-            elif i == 5:
-                row["Instructions"] = "5. You can create up to 500 lineups per file"
-            writer.writerow(row)
-        
-        # Write empty row
-        writer.writerow({field: "" for field in fieldnames})
-        
-        # Write lineup rows
-        for i, (score, lu) in enumerate(lineups, 1):
-            row = format_lineup_for_draftkings(lu, i)
-            writer.writerow(row)
-    
-    print(f"Exported {len(lineups)} lineups to out/week01/lineups_150_draftkings_upload.csv")
+    # Export lineups in DraftKings upload format (DKSalaries_upload_format.csv layout, FLEX = latest kickoff)
+    res = export([lu for _, lu in lineups], "out/week01", slate_players("DKSalaries.csv"),
+                 stem="lineups_150_draftkings_upload", template=True)
+    print(f"Exported {res['lineups']} lineups to {', '.join(res['files'])}")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--deadline", default=None, help="Keep improving until this local time ('YYYY-MM-DD HH:MM'), e.g. a bit before lock")
+    ap.add_argument("--time_budget", type=float, default=None, help="Keep improving for this many seconds")
+    ap.add_argument("--checkpoint", default=None, help="Checkpoint file to save to and resume from (anytime default: out/week01/generate_150.ckpt)")
+    ap.add_argument("--checkpoint_every", type=float, default=30.0, help="Seconds between checkpoints")
+    add_profile_args(ap)
+    args = ap.parse_args()
+    with maybe_profile(args, "out/week01", "generate_150_lineups_profile"):
+        main(args.deadline, args.time_budget, args.checkpoint, args.checkpoint_every)
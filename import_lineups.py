@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Import lineups from other tools: read, resolve, validate, rescore, merge.
+
+Accepted files (any mix, thousands of rows each, read in chunks):
+  - DK upload / entry files: slot columns QB, RB, RB, ... DST holding IDs, 'Name (ID)' or names
+  - wide files with p1_name..p9_name (or p1_id..p9_id) columns, as optimize.py writes
+  - long files with Lineup plus Name (or ID) rows, as generate_150_lineups.py writes
+Cells resolve against the slate by DK ID first, then by name. Every lineup then goes through the
+batch validator (validate.py) and is rescored on the current projections/ownership and, with
+--sims, on player simulations. Identical lineups across files collapse to one row (`copies`,
+`sources`). The merged pool is written in the wide p*_name/p*_id format, so it feeds straight
+back into validate.py, dk_export.py and portfolio selection.
+
+    python import_lineups.py --lineups theirs.csv DKUpload_teammate.csv --dk DKSalaries.csv \
+        --projections projections.csv --ownership ownership.csv --sims sims.csv --out out/import
+"""
+
+import argparse, os, re
+import pandas as pd, numpy as np
+from pathlib import Path
+from roster import get_roster
+from late_swap import load_players
+from showdown import read_sims
+from utils import read_weights
+import validate as V
+
+ID_RE = r"\((\d+)\)"
+
+def read_cells(path, roster, chunksize=20000):
+    """Frames of raw cells (one row per lineup, one column per roster spot) from any accepted format"""
+    header = pd.read_csv(path, nrows=0).columns
+    for kind in ("name", "id"):
+        wide = sorted((c for c in header if re.fullmatch(rf"p\d+_{kind}", c)), key=lambda c: int(c[1:].split("_")[0]))
+        if wide:
+            for chunk in pd.read_csv(path, usecols=wide, chunksize=chunksize, dtype=str):
+                yield chunk.set_axis(range(len(wide)), axis=1)
+            return
+    if set(roster.columns) <= set(header):
+        for chunk in pd.read_csv(path, usecols=roster.columns, chunksize=chunksize, dtype=str):
+            chunk = chunk[roster.columns]
+            yield chunk[chunk.notna().any(axis=1)].set_axis(range(roster.size), axis=1)
+        return
+    col = next((c for c in ("Name", "ID", "Id", "id") if c in header), None)
+    if "Lineup" not in header or col is None:
+        raise ValueError(f"{path}: need DK slot columns ({'/'.join(roster.slots)}), p1_name.. columns or Lineup/Name rows")
+    carry = pd.DataFrame()
+    for chunk in pd.read_csv(path, usecols=["Lineup", col], chunksize=chunksize, dtype=str):
+        chunk = pd.concat([carry, chunk])
+        last = chunk["Lineup"].iat[-1]
+        carry, done = chunk[chunk["Lineup"] == last], chunk[chunk["Lineup"] != last]
+        if len(done):
+            yield _long_to_wide(done, col)
+    if len(carry):
+        yield _long_to_wide(carry, col)
+
+def _long_to_wide(df, col):
+    df = df.assign(spot=df.groupby("Lineup", sort=False).cumcount())
+    return df.pivot(index="Lineup", columns="spot", values=col).loc[df["Lineup"].unique()].reset_index(drop=True)
+
+def resolve(cells, table, id_index):
+    """Index matrix for a frame of cells: DK ID (bare or 'Name (ID)') first, then name; -1 if unresolved"""
+    M = np.full((len(cells), table.roster.size), -1, dtype=np.int64)
+    for j in range(min(cells.shape[1], table.roster.size)):
+        s = cells.iloc[:, j].fillna("").astype(str).str.strip()
+        ids = s.str.extract(ID_RE, expand=False).fillna(s.where(s.str.isdigit()))
+        by_id = pd.to_numeric(ids, errors="coerce").map(id_index)
+        by_name = s.str.replace(r"\s*\(\d+\).*$", "", regex=True).map(table.index)
+        M[:, j] = by_id.fillna(by_name).fillna(-1).astype(np.int64).to_numpy()
+    return M
+
+def load_files(paths, table, id_index, chunksize=20000):
+    """Stacked index matrix over all files, with the source file and row of each lineup"""
+    mats, src, rows = [], [], []
+    for path in paths:
+        n = 0
+        for cells in read_cells(path, table.roster, chunksize):
+            mats.append(resolve(cells, table, id_index))
+            src += [Path(path).name]*len(cells)
+            rows.append(np.arange(n, n + len(cells)) + 1)
+            n += len(cells)
+        print(f"[import] {path}: {n} lineups")
+    M = np.vstack(mats) if mats else np.zeros((0, table.roster.size), dtype=np.int64)
+    return M, np.array(src, dtype=object), np.concatenate(rows) if rows else np.zeros(0, int)
+
+def dedupe(M, sources):
+    """First occurrence of each player set, with its copy count and the files it came from"""
+    key = np.sort(M, axis=1)
+    _, first, inv, counts = np.unique(key, axis=0, return_index=True, return_inverse=True, return_counts=True)
+    inv = inv.ravel()
+    order = np.sort(first)
+    files = pd.Series(sources).groupby(inv).agg(lambda s: "|".join(dict.fromkeys(s)))
+    return order, counts[inv[order]], files.loc[inv[order]].to_numpy(object)
+
+def score(M, table, proj, p90, S=None, top_pct=0.01, block=5000):
+    """Salary, projection, ceiling, ownership and score per row; sim mean/p90/top rate with S"""
+    X = np.where(M >= 0, M, table.sentinel)
+    own = table.own[X].sum(axis=1)
+    out = {"salary": table.salary[X].sum(axis=1).astype(int), "proj": proj[X].sum(axis=1),
+           "p90": p90[X].sum(axis=1), "own": own}
+    # the per-player objective the generators rank on (optimize.fill_value), summed over the lineup
+    out["score"] = out["proj"] + 0.35*(out["p90"] - out["proj"]) - 0.03*own
+    if S is not None and len(M):
+        pts = np.vstack([S[X[b:b + block]].sum(axis=1) for b in range(0, len(X), block)]).astype(np.float32)
+        cut = np.quantile(pts, 1 - top_pct, axis=0)
+        out.update({"sim_mean": pts.mean(axis=1), "sim_p90": np.quantile(pts, 0.9, axis=1),
+                    "top_rate": (pts >= cut[None, :]).mean(axis=1)})
+    return out
+
+def main(lineups, dk_path, projections=None, ownership=None, sims=None, weights="config/weights.yaml",
+         out_dir="out/import", roster="dk_classic", keep_invalid=False, max_overlap=None, stack_min=2, bringback_min=1):
+    players = load_players(dk_path, projections, ownership)
+    table = V.PlayerTable(list(players.values()), roster=get_roster(roster))
+    id_index = {pid: table.index[p["name"]] for pid, p in players.items()}
+    M, src, row = load_files(lineups, table, id_index)
+    if not len(M):
+        print("[import] no lineups found"); return None
+    cfg = read_weights(weights) if weights else {}
+    flags = V.validate(M, table, cfg, stack_min, bringback_min)
+    keep, copies, files = dedupe(M, src)
+    if not keep_invalid:
+        ok = (flags[keep] & ~V.DUPLICATE_LINEUP) == 0
+        keep, copies, files = keep[ok], copies[ok], files[ok]
+    df = pd.DataFrame(list(players.values())).drop_duplicates("name")  # same rows as the table
+    pad = lambda a, v: np.r_[a, [v]]
+    S = None
+    if sims:
+        S = np.nan_to_num(read_sims(sims, table.names))
+        S = np.vstack([S, np.zeros((1, S.shape[1]))])
+    metrics = score(M[keep], table, pad(df["proj"].to_numpy(float), 0.0), pad(df["p90"].to_numpy(float), 0.0), S)
+    order = np.argsort(-metrics["sim_mean" if S is not None else "score"], kind="stable")
+    keep, copies, files = keep[order], copies[order], files[order]
+    P = M[keep]
+    # overlap is checked in rank order, so a lineup is flagged against better ones
+    pflags = V.validate(P, table, cfg, stack_min, bringback_min, max_overlap) if max_overlap is not None else flags[keep]
+    names, ids = pad(table.names, ""), pad(df["id"].to_numpy(object), "")
+    X = np.where(P >= 0, P, table.sentinel)
+    out = pd.DataFrame({"rank": np.arange(1, len(P) + 1), "source": src[keep], "source_row": row[keep],
+                        "copies": copies, "sources": files})
+    for j in range(P.shape[1]):
+        out[f"p{j+1}_name"], out[f"p{j+1}_id"] = names[X[:, j]], ids[X[:, j]]
+    for k, v in metrics.items():
+        out[k] = v[order] if k == "salary" else np.round(v[order], 4)
+    out["flags"], out["violations"] = pflags, V.describe(pflags)
+    os.makedirs(out_dir, exist_ok=True)
+    out.to_csv(os.path.join(out_dir, "imported_pool.csv"), index=False)
+    report = pd.DataFrame({"source": src, "source_row": row, "flags": flags, "violations": V.describe(flags)})
+    report.to_csv(os.path.join(out_dir, "import_report.csv"), index=False)
+    s = V.summarize(flags)
+    print(f"[import] {s['lineups']} lineups read, {s['valid']} valid, {len(out)} in pool ({out_dir}/imported_pool.csv)")
+    for name in V.FLAG_NAMES.values():
+        if s[name]:
+            print(f"  {name:<18} {s[name]:>6}")
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lineups", nargs="+", required=True, help="Lineup files (DK upload/entries, p*_name wide, Lineup/Name long)")
+    ap.add_argument("--dk", required=True, help="DKSalaries.csv for the slate")
+    ap.add_argument("--projections", default=None)
+    ap.add_argument("--ownership", default=None)
+    ap.add_argument("--sims", default=None, help="Player sims CSV (name + one column per sim)")
+    ap.add_argument("--weights", default="config/weights.yaml")
+    ap.add_argument("--roster", default="dk_classic", help="Roster template in config/rosters.yaml")
+    ap.add_argument("--keep_invalid", action="store_true", help="Keep lineups that fail validation in the pool")
+    ap.add_argument("--max_overlap", type=int, default=None, help="Also flag pool lineups sharing more players with a better one")
+    ap.add_argument("--stack_min", type=int, default=2)
+    ap.add_argument("--bringback_min", type=int, default=1)
+    ap.add_argument("--out", default="out/import")
+    args = ap.parse_args()
+    main(args.lineups, args.dk, args.projections, args.ownership, args.sims, args.weights, args.out, args.roster,
+         args.keep_invalid, args.max_overlap, args.stack_min, args.bringback_min)
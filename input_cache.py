@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Parsed-input cache for DKSalaries and projection/ownership CSVs.
+
+Each file is read once with only the columns we use and compact dtypes (category team/pos,
+int32 salary), and the parsed frame is pickled under out/parse_cache keyed by the file's
+content hash, so identical inputs skip CSV parsing entirely. DK "Game Info"
+("CIN@CLE 09/07/2025 01:00PM ET") is parsed here into game, kickoff, home/away and opp.
+
+    from input_cache import read_dk_salaries
+    dk = read_dk_salaries("DKSalaries.csv")
+
+Set PARSE_CACHE_DIR to move the cache, or PARSE_CACHE_DIR="" to disable it.
+"""
+
+import os, hashlib, pickle
+import pandas as pd
+
+here = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(here, "out", "parse_cache")
+VERSION = 1  # bump when a parser's output changes so old entries are ignored
+
+DK_COLUMNS = {"Name": "name", "ID": "id", "Position": "pos", "Roster Position": "roster_pos",
+              "Salary": "salary", "Game Info": "game_info", "TeamAbbrev": "team", "AvgPointsPerGame": "avg_ppg"}
+DK_DTYPES = {"Name": "string", "ID": "int64", "Position": "category", "Roster Position": "category",
+             "Salary": "int32", "Game Info": "category", "TeamAbbrev": "category", "AvgPointsPerGame": "float32"}
+GAME_INFO = r"^(?P<away_team>[A-Z]+)@(?P<home_team>[A-Z]+)\s+(?P<kickoff>\d{2}/\d{2}/\d{4}\s+\d{1,2}:\d{2}[AP]M)"
+COMPACT = {"team": "category", "pos": "category", "salary": "int32"}
+
+def cache_dir():
+    return os.getenv("PARSE_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+def file_hash(path, block=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for b in iter(lambda: f.read(block), b""):
+            h.update(b)
+    return h.hexdigest()
+
+def cached_parse(path, kind, parse, **opts):
+    """parse(path, **opts) memoised on disk by (kind, opts, content hash of path)"""
+    root = cache_dir()
+    if not root:
+        return parse(path, **opts)
+    tag = hashlib.sha1(repr((kind, VERSION, sorted(opts.items()))).encode()).hexdigest()[:8]
+    entry = os.path.join(root, f"{kind}-{tag}-{file_hash(path)}.pkl")
+    if os.path.exists(entry):
+        try:
+            with open(entry, "rb") as f:
+                return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass  # truncated or from an incompatible pandas; reparse below
+    df = parse(path, **opts)
+    os.makedirs(root, exist_ok=True)
+    tmp = f"{entry}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, entry)
+    return df
+
+def parse_game_info(info):
+    """game / away_team / home_team / kickoff columns from a DK Game Info series (parsed per unique value)"""
+    info = pd.Series(info).astype("category")
+    cats = pd.Series(info.cat.categories.astype(str))
+    parts = cats.str.extract(GAME_INFO)
+    parts["kickoff"] = pd.to_datetime(parts["kickoff"], format="%m/%d/%Y %I:%M%p", errors="coerce")
+    parts["game"] = parts["away_team"] + "@" + parts["home_team"]
+    codes = info.cat.codes.to_numpy()
+    out = parts.reindex(codes).reset_index(drop=True)  # code -1 (missing) -> NaN row
+    out.index = info.index
+    for c in ("game", "away_team", "home_team"):
+        out[c] = out[c].astype("category")
+    return out[["game", "away_team", "home_team", "kickoff"]]
+
+def _parse_dk(path):
+    header = pd.read_csv(path, nrows=0).columns
+    cols = [c for c in DK_COLUMNS if c in header]
+    # read as text so stray repeated header rows can be dropped before the numeric casts
+    df = pd.read_csv(path, usecols=cols, dtype="string")
+    df = df[df["Name"].notna() & (df["Name"] != "Name")]
+    df = df.astype({c: DK_DTYPES[c] for c in cols})
+    df = df.rename(columns=DK_COLUMNS).reset_index(drop=True)
+    df["name"] = df["name"].astype(object)
+    if "game_info" in df.columns:
+        df = pd.concat([df.drop(columns="game_info"), parse_game_info(df["game_info"])], axis=1)
+        opp = df["home_team"].astype(object).where(df["team"].astype(object) == df["away_team"].astype(object),
+                                                   df["away_team"].astype(object))
+        df["opp"] = opp.where(df["game"].notna()).astype("category")
+    order = ["name", "id", "team", "pos", "roster_pos", "salary", "avg_ppg", "game", "away_team", "home_team", "kickoff", "opp"]
+    return df[[c for c in order if c in df.columns]]
+
+def read_dk_salaries(path):
+    """
+    DKSalaries.csv as name, id, team, pos, roster_pos, salary (int32), avg_ppg, plus game, away_team,
+    home_team, kickoff and opp parsed from Game Info. Cached by content hash.
+    """
+    return cached_parse(path, "dk", _parse_dk).copy()
+
+def _parse_table(path, columns=None):
+    try:
+        header = pd.read_csv(path, nrows=0).columns
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+    cols = [c for c in header if columns is None or c in columns]
+    dtypes = {c: t for c, t in COMPACT.items() if c in cols}
+    df = pd.read_csv(path, usecols=cols)
+    for c, t in dtypes.items():
+        if t == "int32" and df[c].isna().any():
+            continue
+        df[c] = df[c].astype(t)
+    return df
+
+def read_table(path, columns=None):
+    """Projection/ownership-style CSV with compact team/pos/salary dtypes; cached by content hash"""
+    return cached_parse(path, "table", _parse_table, columns=tuple(columns) if columns else None).copy()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Late swap: re-optimize the unlocked slots of submitted DK entries.
+
+Reads the DK entries CSV (Entry ID, Contest Name, Contest ID, Entry Fee, QB, RB, RB, WR, WR, WR, TE,
+FLEX, DST), locks every player whose game has kicked off (kickoff from DKSalaries Game Info), and
+re-solves only the open slots under the remaining salary. Each open slot keeps its DK slot, so the
+result can be uploaded as an edit. The lineup's stack shape is kept: the final lineup needs at least
+as many QB-team WR/TE and opponent RB/WR/TE as the submitted one.
+
+Per entry this is a branch-and-bound over the open slots, on pools pruned to the players not dominated
+(cheaper and better, same team and position) by enough others, bounded by a salary/stack-aware DP table
+(fill.py style, $100 units) that ignores only player repeats. Entries that share the same
+locked players share one solve, and entries are split across worker processes.
+
+    python late_swap.py --entries DKEntries.csv --dk DKSalaries.csv --projections projections.csv \
+        --ownership ownership.csv --now "2025-09-07 13:05" --out out/late_swap
+"""
+
+import argparse, os, re, time, collections
+import pandas as pd, numpy as np
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from input_cache import read_dk_salaries
+from utils import load_optional
+from fill import player_value, SALARY_CAP, SAL_UNIT, NEG, ROSTER
+
+SLOTS = list(ROSTER.slots)
+SLOT_POS = {s: set(ROSTER.eligible[s]) for s in ROSTER.slots}
+META = ["Entry ID", "Contest Name", "Contest ID", "Entry Fee"]
+ID_RE = re.compile(r"\((\d+)\)")
+TZ = "America/New_York"  # DK Game Info kickoffs are Eastern
+
+def parse_player_id(cell):
+    """DK entry cell -> player id ('Name (123)', 'Name (123) (LOCKED)' or '123')"""
+    if not isinstance(cell, str) or not cell.strip():
+        return None
+    m = ID_RE.search(cell)
+    if m:
+        return int(m.group(1))
+    return int(cell) if cell.strip().isdigit() else None
+
+def read_entries(path):
+    """Entries frame: META columns plus one id column per slot (slot_0..slot_8)"""
+    raw = pd.read_csv(path, header=None, skiprows=1, usecols=range(len(META) + len(SLOTS)), dtype=str)
+    raw.columns = META + [f"slot_{i}" for i in range(len(SLOTS))]
+    raw = raw[raw["Entry ID"].notna() & raw["Entry ID"].str.strip().str.isdigit()].reset_index(drop=True)
+    for i in range(len(SLOTS)):
+        raw[f"slot_{i}"] = raw[f"slot_{i}"].map(parse_player_id)
+    return raw
+
+def load_players(dk_path, projections_path=None, ownership_path=None):
+    """id -> player dict (name, team, opp, pos, salary, proj, p90, own, kickoff)"""
+    dk = read_dk_salaries(dk_path)
+    for c in ("team", "pos", "opp"):
+        if c in dk.columns:
+            dk[c] = dk[c].astype(object)
+    proj = load_optional(projections_path) if projections_path else pd.DataFrame()
+    if not proj.empty:
+        dk = dk.merge(proj[["name", "proj", "p90"]].drop_duplicates("name"), on="name", how="left")
+    own = load_optional(ownership_path) if ownership_path else pd.DataFrame()
+    if not own.empty:
+        dk = dk.merge(own[["name", "own"]].drop_duplicates("name"), on="name", how="left")
+    for c, default in (("proj", 0.0), ("own", 5.0)):
+        dk[c] = dk[c].fillna(default) if c in dk.columns else default
+    dk["p90"] = dk["p90"].fillna(dk["proj"]*1.6) if "p90" in dk.columns else dk["proj"]*1.6
+    dk["salary"] = dk["salary"].astype(int)
+    if "opp" not in dk.columns:
+        dk["opp"] = None
+    recs = dk[["id", "name", "team", "opp", "pos", "salary", "proj", "p90", "own", "kickoff"]].to_dict("records")
+    return {int(r["id"]): r for r in recs}
+
+def stack_counts(lineup):
+    """(QB-team WR/TE, opponent RB/WR/TE) for the lineup's QB"""
+    qb = next((p for p in lineup if p["pos"] == "QB"), None)
+    if qb is None:
+        return 0, 0
+    mates = sum(1 for p in lineup if p["team"] == qb["team"] and p["pos"] in ("WR", "TE"))
+    backs = sum(1 for p in lineup if p["team"] == qb["opp"] and p["pos"] in ("RB", "WR", "TE"))
+    return mates, backs
+
+def prune(pool, k, value_fn):
+    """Drop players that k others of the same team and position beat on value at no more salary"""
+    out = []
+    by_group = collections.defaultdict(list)
+    for p in pool:
+        by_group[(p["team"], p["pos"])].append(p)
+    for grp in by_group.values():
+        grp = sorted(grp, key=lambda p: (p["salary"], -value_fn(p)))
+        best = []  # values of players seen so far (all cheaper or equal)
+        for p in grp:
+            v = value_fn(p)
+            if sum(1 for b in best if b >= v) < k:
+                out.append(p)
+            best.append(v)
+    return out
+
+def _tag(p, team, opp):
+    """1 = QB teammate pass-catcher, 2 = bring-back from the opponent, 0 = neither"""
+    if p["team"] == team and p["pos"] in ("WR", "TE"):
+        return 1
+    if p["team"] == opp and p["pos"] in ("RB", "WR", "TE"):
+        return 2
+    return 0
+
+def bound_tables(slots, pools, values, costs, tags, S, A, B):
+    """
+    U[i][a, b, s] = best value of filling slots[i:] with at most s salary units while still adding
+    a teammates and b bring-backs; players may repeat across slots (a relaxation, used as the B&B bound)
+    """
+    U = [None]*(len(slots) + 1)
+    U[-1] = np.full((A + 1, B + 1, S + 1), NEG)
+    U[-1][0, 0, :] = 0.0
+    for i in range(len(slots) - 1, -1, -1):
+        nxt, cur = U[i + 1], np.full((A + 1, B + 1, S + 1), NEG)
+        lab = slots[i][1]
+        for v, c, t in zip(values[lab], costs[lab], tags[lab]):
+            if c > S:
+                continue
+            for a in range(A + 1):
+                for b in range(B + 1):
+                    a2, b2 = (max(a - 1, 0), b) if t == 1 else (a, max(b - 1, 0)) if t == 2 else (a, b)
+                    np.maximum(cur[a, b, c:], nxt[a2, b2, :S + 1 - c] + v, out=cur[a, b, c:])
+        U[i] = cur
+    return U
+
+def solve_with_qb(fixed, slots, candidates, budget, need, value_fn):
+    """Branch-and-bound over slots (QB already in fixed); returns (value, [players in slot order])"""
+    qb = next(p for p in fixed if p["pos"] == "QB")
+    m0, b0 = stack_counts(fixed)
+    A, B = max(0, need[0] - m0), max(0, need[1] - b0)
+    S = budget // SAL_UNIT
+    if S < 0:
+        return NEG, None
+    fixed_names = {p["name"] for p in fixed}
+    labels = [lab for _, lab in slots]
+    pools, values, costs, tags = {}, {}, {}, {}
+    for lab in set(labels):
+        pool = [p for p in candidates if p["pos"] in SLOT_POS[lab] and p["name"] not in fixed_names]
+        k = sum(1 for l in labels if SLOT_POS[l] & SLOT_POS[lab])
+        pools[lab] = sorted(prune(pool, k, value_fn), key=value_fn, reverse=True)
+        values[lab] = [value_fn(p) for p in pools[lab]]
+        costs[lab] = [int(p["salary"]) // SAL_UNIT for p in pools[lab]]
+        tags[lab] = [_tag(p, qb["team"], qb["opp"]) for p in pools[lab]]
+    slots = sorted(slots, key=lambda sl: (len(pools[sl[1]]), sl[1]))
+    U = bound_tables(slots, pools, values, costs, tags, S, A, B)
+    if not np.isfinite(U[0][A, B, S]):
+        return NEG, None
+
+    best = [NEG, None]
+    chosen, used = [], set()
+
+    def rec(i, s, a, b, val, start):
+        if i == len(slots):
+            if val > best[0]:
+                best[0], best[1] = val, list(chosen)
+            return
+        if val + U[i][a, b, s] <= best[0] + 1e-12:
+            return
+        lab = slots[i][1]
+        lo = start if i > 0 and slots[i - 1][1] == lab else 0  # identical slots take players in pool order
+        for j in range(lo, len(pools[lab])):
+            p, c, t = pools[lab][j], costs[lab][j], tags[lab][j]
+            if c > s or p["name"] in used:
+                continue
+            a2, b2 = (max(a - 1, 0), b) if t == 1 else (a, max(b - 1, 0)) if t == 2 else (a, b)
+            v = val + values[lab][j]
+            if v + U[i + 1][a2, b2, s - c] <= best[0] + 1e-12:
+                continue
+            chosen.append(p); used.add(p["name"])
+            rec(i + 1, s - c, a2, b2, v, j + 1)
+            chosen.pop(); used.discard(p["name"])
+
+    rec(0, S, A, B, 0.0, 0)
+    return best[0], (list(zip([sl[0] for sl in slots], best[1])) if best[1] is not None else None)
+
+def solve(fixed, open_slots, candidates, budget, need, value_fn=player_value):
+    """
+    Best assignment of candidates to open_slots (list of (slot index, label)) with salary <= budget and
+    stack counts >= need. Returns (value, {slot index: player}) or (None, None) when infeasible.
+    An open QB slot is enumerated over candidate QBs, since the stack tags depend on the QB's team.
+    """
+    qb_slot = next((sl for sl in open_slots if sl[1] == "QB"), None)
+    if qb_slot is None:
+        options = [(fixed, open_slots, budget, [])]
+    else:
+        rest = [sl for sl in open_slots if sl is not qb_slot]
+        options = [(fixed + [q], rest, budget - q["salary"], [(qb_slot[0], q)])
+                   for q in candidates if q["pos"] == "QB"]
+    best_v, best_a = NEG, None
+    for fx, slots, bud, pre in options:
+        extra = sum(value_fn(p) for _, p in pre)
+        v, assign = solve_with_qb(fx, slots, candidates, bud, need, value_fn)
+        if assign is not None and v + extra > best_v:
+            best_v, best_a = v + extra, pre + assign
+    if best_a is None:
+        return None, None
+    return best_v, dict(best_a)
+
+# ---- per-entry driver (runs in worker processes) ----
+
+_STATE = {}
+
+def _init(players, now, salary_cap):
+    _STATE.update(players=players, now=now, cap=salary_cap, memo={})
+    _STATE["open_pool"] = [p for p in players.values() if not is_locked(p, now)]
+
+def is_locked(p, now):
+    k = p.get("kickoff")
+    return k is None or pd.isna(k) or k <= now  # unknown kickoff counts as started
+
+def swap_entry(ids):
+    """ids: 9 player ids in SLOTS order -> result dict"""
+    players, now = _STATE["players"], _STATE["now"]
+    lineup = [players.get(i) for i in ids]
+    if any(p is None for p in lineup):
+        return {"status": "unknown player id", "ids": ids}
+    locked = [is_locked(p, now) for p in lineup]
+    open_slots = [(i, SLOTS[i]) for i in range(len(SLOTS)) if not locked[i]]
+    old_v = sum(player_value(p) for p in lineup)
+    if not open_slots:
+        return {"status": "all locked", "ids": ids, "old_value": old_v, "new_value": old_v, "swaps": 0}
+    fixed = [p for p, l in zip(lineup, locked) if l]
+    budget = _STATE["cap"] - sum(p["salary"] for p in fixed)
+    need = stack_counts(lineup)
+    key = (tuple(sorted((i, ids[i]) for i in range(len(ids)) if locked[i])), need)
+    if key not in _STATE["memo"]:
+        _STATE["memo"][key] = solve(fixed, open_slots, _STATE["open_pool"], budget, need)
+    val, assign = _STATE["memo"][key]
+    if assign is None:  # keep the submitted lineup if nothing legal beats it
+        return {"status": "kept (no feasible swap)", "ids": ids, "old_value": old_v, "new_value": old_v, "swaps": 0}
+    fixed_v = sum(player_value(p) for p in fixed)
+    if fixed_v + val <= old_v + 1e-9:
+        return {"status": "kept", "ids": ids, "old_value": old_v, "new_value": old_v, "swaps": 0}
+    new_ids = list(ids)
+    for slot, p in assign.items():
+        new_ids[slot] = int(p["id"])
+    swaps = sum(1 for a, b in zip(ids, new_ids) if a != b)
+    return {"status": "swapped", "ids": new_ids, "old_value": old_v, "new_value": fixed_v + val, "swaps": swaps}
+
+def _swap_chunk(chunk):
+    return [swap_entry(ids) for ids in chunk]
+
+def late_swap(entries, players, now, salary_cap=SALARY_CAP, jobs=1):
+    """Results (one dict per entry row) for an entries frame from read_entries"""
+    all_ids = entries[[f"slot_{i}" for i in range(len(SLOTS))]].to_numpy().tolist()
+    all_ids = [[int(x) if x is not None and not pd.isna(x) else None for x in row] for row in all_ids]
+    if jobs <= 1 or len(all_ids) < 2*jobs:
+        _init(players, now, salary_cap)
+        return _swap_chunk(all_ids)
+    # contiguous chunks keep entries with the same locked core in one worker (shared memo)
+    order = sorted(range(len(all_ids)), key=lambda i: [x or 0 for x in all_ids[i]])
+    chunks = [sorted(order[len(order)*j//jobs:len(order)*(j + 1)//jobs]) for j in range(jobs)]
+    out = [None]*len(all_ids)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init, initargs=(players, now, salary_cap)) as pool:
+        for idx, res in zip(chunks, pool.map(_swap_chunk, [[all_ids[i] for i in c] for c in chunks])):
+            for i, r in zip(idx, res):
+                out[i] = r
+    return out
+
+def cell(p):
+    return f"{p['name']} ({int(p['id'])})"
+
+def write_edit_file(entries, results, players, path):
+    """DK upload file: META columns plus 'Name (ID)' per slot"""
+    rows = []
+    for (_, e), r in zip(entries.iterrows(), results):
+        row = {c: e[c] for c in META}
+        for i, pid in enumerate(r["ids"]):
+            row[f"{SLOTS[i]}_{i}"] = cell(players[pid]) if pid in players else ("" if pid is None else pid)
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    df.columns = META + SLOTS  # DK expects the repeated slot headers
+    df.to_csv(path, index=False)
+
+def parse_now(s):
+    if s:
+        return pd.Timestamp(s)
+    from zoneinfo import ZoneInfo
+    return pd.Timestamp(datetime.now(ZoneInfo(TZ)).replace(tzinfo=None))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", required=True, help="DK entries CSV (DKEntries.csv)")
+    ap.add_argument("--dk", required=True)
+    ap.add_argument("--projections", default=None)
+    ap.add_argument("--ownership", default=None)
+    ap.add_argument("--now", default=None, help="Lock time, Eastern 'YYYY-MM-DD HH:MM' (default: current time)")
+    ap.add_argument("--max_salary", type=int, default=SALARY_CAP)
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--out", default="out/late_swap")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    now = parse_now(args.now)
+    players = load_players(args.dk, args.projections, args.ownership)
+    entries = read_entries(args.entries)
+    results = late_swap(entries, players, now, args.max_salary, args.jobs)
+    os.makedirs(args.out, exist_ok=True)
+    write_edit_file(entries, results, players, os.path.join(args.out, "DKEntries_late_swap.csv"))
+    summary = pd.DataFrame([{"entry_id": e, "status": r["status"], "swaps": r.get("swaps", 0),
+                             "old_value": round(r.get("old_value", np.nan), 3), "new_value": round(r.get("new_value", np.nan), 3)}
+                            for e, r in zip(entries["Entry ID"], results)])
+    summary.to_csv(os.path.join(args.out, "late_swap_summary.csv"), index=False)
+    print(summary["status"].value_counts().to_string())
+    print(f"Late swap at {now}: {len(entries)} entries, {int(summary['swaps'].sum())} slot changes, "
+          f"{time.perf_counter() - t0:.2f}s -> {os.path.join(args.out, 'DKEntries_late_swap.csv')}")
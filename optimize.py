@@ -2,32 +2,20 @@
 import pandas as pd, numpy as np, math, random, itertools, collections
 from pathlib import Path
 from utils import read_weights, load_dk, load_optional, lineup_score
+from profiling import stage
+from roster import get_roster
+from dk_export import export, slate_players
+from fill import FillSolver, FILL_CACHE
 
-def pos_ok(lineup, to_add_pos):
-    counts = collections.Counter([p["pos"] for p in lineup])
-    
-    # During building, be very flexible to allow reaching 9 players
-    # Final validation will happen later with finalize_positions
-    if len(lineup) < 9:
-        # Allow maximum flexibility during building
-        limits = {"QB":1,"RB":5,"WR":6,"TE":4,"DST":1}
-    else:
-        # Strict limits for final validation
-        limits = {"QB":1,"RB":3,"WR":4,"TE":2,"DST":1}
-    
-    return counts[to_add_pos] < limits.get(to_add_pos, 0)
-
-def finalize_positions(lineup):
-    # Validate exactly: QB1, RB2, WR3, TE1, DST1, FLEX1 among RB/WR/TE
-    counts = collections.Counter([p["pos"] for p in lineup])
-    if counts["QB"] != 1: return False
-    if counts["DST"] != 1: return False
-    # RB/WR/TE totals: should be 7 with at least RB2/WR3/TE1
-    r = counts["RB"]; w = counts["WR"]; t = counts["TE"]
-    if r + w + t != 7: return False
-    if r < 2 or w < 3 or t < 1: return False
-    # ok
-    return True
+FILL_SCAN = 50  # exact mode: fills tried per stack for one passing the ownership gates and 5-man uniqueness
+
+def pos_ok(lineup, to_add_pos, roster=None):
+    # Exact: a position is accepted only while the lineup can still be completed to a legal roster
+    return (roster or get_roster()).can_add(lineup, to_add_pos)
+
+def finalize_positions(lineup, roster=None):
+    # Validate exactly against the roster template (DK Classic: QB1, RB2, WR3, TE1, DST1, FLEX1 among RB/WR/TE)
+    return (roster or get_roster()).is_final(lineup)
 
 def build_player_rows(dk_df, proj_df, own_df):
     df = dk_df.merge(proj_df, on=["name","team","pos"], how="left")
@@ -45,6 +33,10 @@ def build_player_rows(dk_df, proj_df, own_df):
         })
     return rows
 
+def fill_value(p):
+    # Per-player score the stack fill maximises (ceiling-tilted projection less an ownership tax)
+    return p["proj"] + 0.35*(p["p90"]-p["proj"]) - 0.03*p["own"]
+
 def team_opponent_map(edge_df):
     m = {}
     for _,r in edge_df.iterrows():
@@ -65,7 +57,7 @@ def forbid_offense_vs_dst(lineup, cfg):
     # Without explicit schedule, we can't map opponent here; we just ensure no same-team offense vs DST of opponent later.
     return True
 
-def build_lineups_150(dk_df, edge_df, stacks_df, players, cfg):
+def build_lineups_150(dk_df, edge_df, stacks_df, players, cfg, rng=None):
     print(f"DEBUG: Starting build_lineups_150 with {len(players)} players")
     print(f"DEBUG: Stacks data shape: {stacks_df.shape}")
     print(f"DEBUG: Stacks columns: {stacks_df.columns.tolist()}")
@@ -91,13 +83,17 @@ def build_lineups_150(dk_df, edge_df, stacks_df, players, cfg):
     for v in pool_by_pos.values(): v.sort(key=lambda x: (x["proj"] + 0.35*(x["p90"]-x["proj"]) - 0.03*x["own"]), reverse=True)
     print(f"DEBUG: Position pools: {[(pos, len(players)) for pos, players in pool_by_pos.items()]}")
 
+    # fill_mode: "greedy" (best player per needed position) or "exact" (branch-and-bound over DP bounds)
+    fill_mode = cfg.get("fill_mode", "greedy")
+    solver = FillSolver(players, value_fn=fill_value, salary_cap=cfg["max_salary"]) if fill_mode == "exact" else None
+
     # Ownership thresholds
     low_thr = cfg["low_owned_threshold_pct"]
 
     # Construct lineups
     lineups = []
     seen_five_sets = set()
-    rng = random.Random(42)
+    rng = rng or random.Random(42)
 
     def fits_salary(lu):
         s = sum(p["salary"] for p in lu)
@@ -136,6 +132,52 @@ def build_lineups_150(dk_df, edge_df, stacks_df, players, cfg):
         
         return None
 
+    def stack_core(s):
+        # [qb, pc1, pc2, bringback] for a core_stacks row, or None if a player is missing
+        # Parse stack string (e.g., '["Ja\'Marr Chase", \'Tee Higgins\']')
+        stack_str = s["stack"]
+        if isinstance(stack_str, str):
+            # Remove quotes and brackets, split by comma
+            clean_str = stack_str.strip("[]'\"")
+            stack_names = [name.strip().strip("'\"") for name in clean_str.split(',')]
+        else:
+            stack_names = stack_str
+        qb = P(s["qb"]); pc1 = P(stack_names[0]); pc2 = P(stack_names[1]); br = P(s["bringback"])
+        if not all([qb, pc1, pc2, br]):
+            print(f"DEBUG: Missing players for stack {s}: qb={qb is not None}, pc1={pc1 is not None}, pc2={pc2 is not None}, br={br is not None}")
+            return None
+        return [qb, pc1, pc2, br]
+
+    def build_exact(stacks, need, per_stack):
+        # Round-robin over the tier's stacks; each stack yields its fills best first (lazily), up to per_stack lineups
+        live = []
+        for s in stacks:
+            core = stack_core(s)
+            if core is not None:
+                fills = solver.iter_fills(core, exclude_teams={core[0]["team"], core[3]["team"]}, min_salary=cfg["min_salary"])
+                live.append([core, fills, 0])
+        while need > 0 and live:
+            for entry in list(live):
+                if need <= 0:
+                    break
+                core, fills, taken = entry
+                lu = None
+                for _, fill in itertools.islice(fills, FILL_SCAN):
+                    cand = core + sorted(fill, key=fill_value, reverse=True)
+                    five = tuple(sorted(p["name"] for p in cand[:5]))
+                    if ok_ownership(cand) and five not in seen_five_sets:
+                        lu = cand
+                        break
+                if lu is None or taken + 1 >= per_stack:
+                    live.remove(entry)  # exhausted (or no acceptable fill within FILL_SCAN), or at its quota
+                if lu is None:
+                    continue
+                entry[2] += 1
+                seen_five_sets.add(five)
+                lineups.append((lineup_score(lu, 0.35, 0.03), lu))
+                need -= 1
+        return need
+
     # compile allowable shells proportions
     shells = [
         ("3v1", cfg["pct_3v1"]),
@@ -185,30 +227,26 @@ def build_lineups_150(dk_df, edge_df, stacks_df, players, cfg):
             continue
         print(f"DEBUG: Building {need} lineups for tier {tier} with {len(stacks)} stacks")
         
+        # Exact mode: the K best fills of every stack, round-robin (fills_per_stack_<tier> = K)
+        if solver is not None:
+            need = build_exact(stacks, need, int(cfg.get(f"fills_per_stack_{tier}", 1)))
+            print(f"DEBUG: Exact fills built tier {tier}, {need} still needed")
+
         # Try to build lineups from stacks first
         idx = 0
         attempts = 0
-        while need > 0 and attempts < need*10 and idx < len(stacks):
+        while solver is None and need > 0 and attempts < need*10 and idx < len(stacks):
             attempts += 1
             s = stacks[idx]
             idx += 1
             
             # Pull players
-            # Parse stack string (e.g., '["Ja\'Marr Chase", \'Tee Higgins\']')
-            stack_str = s["stack"]
-            if isinstance(stack_str, str):
-                # Remove quotes and brackets, split by comma
-                clean_str = stack_str.strip("[]'\"")
-                stack_names = [name.strip().strip("'\"") for name in clean_str.split(',')]
-            else:
-                stack_names = stack_str
-            
-            qb = P(s["qb"]); pc1 = P(stack_names[0]); pc2 = P(stack_names[1]); br = P(s["bringback"])
-            if not all([qb, pc1, pc2, br]): 
-                print(f"DEBUG: Missing players for stack {s}: qb={qb is not None}, pc1={pc1 is not None}, pc2={pc2 is not None}, br={br is not None}")
+            core = stack_core(s)
+            if core is None:
                 continue
             # Start lineup with core
-            lu = [qb, pc1, pc2, br]
+            lu = list(core)
+            qb, br = core[0], core[3]
 
             # Fill remaining with greedy best that respects positions, salary, and correlation avoidances
             # Avoid adding more from the two core teams unless role allows; simple rule: exclude same two teams (except DST or pass-catching RBs if they weren't selected)
@@ -370,6 +408,8 @@ def build_lineups_150(dk_df, edge_df, stacks_df, players, cfg):
                                 break
 
     print(f"DEBUG: Built {len(lineups)} total lineups")
+    if solver is not None:
+        print(f"DEBUG: Fill cache {FILL_CACHE.stats()}")
     # Sort by score desc and take top 150
     lineups = sorted(lineups, key=lambda x: x[0], reverse=True)[:150]
     return lineups
@@ -415,7 +455,8 @@ def main(weekly_path, edge_path, stacks_path, roles_path, dk_path, out_dir, proj
         raise ValueError("REAL OWNERSHIP REQUIRED: Please provide ownership.csv with columns: name,own")
 
     # Build player rows
-    players = build_player_rows(dk_df, proj_df, own_df)
+    with stage("build_player_rows"):
+        players = build_player_rows(dk_df, proj_df, own_df)
 
     # Read weights/config
     cfg = read_weights(weights_path) if weights_path else {
@@ -427,9 +468,14 @@ def main(weekly_path, edge_path, stacks_path, roles_path, dk_path, out_dir, proj
     }
 
     # Build lineups
-    lineups = build_lineups_150(dk_df, edge_df, stacks_df, players, cfg)
+    with stage("build_lineups_150"):
+        lineups = build_lineups_150(dk_df, edge_df, stacks_df, players, cfg)
     out_csv = out_dir/"lineups_150.csv"
-    export_lineups(lineups, out_csv)
+    with stage("export_lineups"):
+        export_lineups(lineups, out_csv)
+    if Path(dk_path).is_file():
+        with stage("export_upload"):
+            export([lu for _, lu in lineups], out_dir, slate_players(dk_path), stem="lineups_upload")
     return out_csv
 
 if __name__ == "__main__":
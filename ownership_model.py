@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Ownership projection model fitted on historical contest ownership.
+
+Ridge regression on logit(own) over salary, projection, value (pts/$1k), slate-relative
+value/projection ranks, game total, team spread, implied team total, position and pool size.
+Fitting is one closed-form solve in numpy; the model is a small JSON file (feature names,
+scaling, coefficients, position totals). Predictions are renormalised so each position's
+ownership sums to its observed total (QB/DST ~100%, RB/WR/TE include their FLEX share).
+
+    python ownership_model.py fit --hist data/history --target contest/ownership.csv --out config/ownership_model.json
+    python ownership_model.py predict --dk DKSalaries.csv --projections projections.csv \
+        --weekly weekly_inputs.csv --model config/ownership_model.json --out ownership.csv
+
+Training weeks use the backtest layout (see backtest.py); `--target` is the actual ownership file
+inside each week (name, own in %), e.g. the ownership.csv written by contest_standings.py.
+"""
+
+import argparse, os, json
+import pandas as pd, numpy as np
+from pathlib import Path
+from utils import load_dk, load_optional, load_weekly_inputs
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "ownership_model.json")
+POSITIONS = ["QB", "RB", "WR", "TE", "DST"]
+NUMERIC = ["sal_k", "proj", "value", "value_rank", "proj_rank", "game_total", "team_spread", "implied", "log_pool"]
+DEFAULT_TOTALS = {"QB": 100.0, "RB": 235.0, "WR": 350.0, "TE": 115.0, "DST": 100.0}
+OWN_FLOOR, OWN_CAP = 0.05, 95.0  # % bounds before the logit
+
+def team_lines(weekly_df):
+    """team -> (game total, spread from that team's side) from weekly inputs"""
+    if weekly_df is None or weekly_df.empty:
+        return pd.DataFrame(columns=["team", "game_total", "team_spread"])
+    w = weekly_df
+    total = w["ou_consensus"] if "ou_consensus" in w.columns else w.get("ou", pd.Series(np.nan, index=w.index))
+    spread = w["spread_home_consensus"] if "spread_home_consensus" in w.columns else w.get("spread_home", pd.Series(np.nan, index=w.index))
+    home = pd.DataFrame({"team": w["home_team"], "game_total": total, "team_spread": spread})
+    away = pd.DataFrame({"team": w["away_team"], "game_total": total, "team_spread": -spread})
+    return pd.concat([home, away], ignore_index=True).drop_duplicates("team")
+
+def features(players, weekly_df=None):
+    """Feature frame (NUMERIC + pos one-hots) for players with name, team, pos, salary, proj"""
+    df = players[["name", "team", "pos", "salary", "proj"]].copy()
+    df["team"] = df["team"].astype(object)
+    df["pos"] = df["pos"].astype(object)
+    df = df.merge(team_lines(weekly_df), on="team", how="left")
+    df["sal_k"] = df["salary"].astype(float)/1000.0
+    df["proj"] = df["proj"].astype(float).fillna(0.0)
+    df["value"] = df["proj"]/df["sal_k"].where(df["sal_k"] > 0)
+    grp = df.groupby("pos")
+    df["value_rank"] = grp["value"].rank(pct=True)
+    df["proj_rank"] = grp["proj"].rank(pct=True)
+    df["game_total"] = df["game_total"].fillna(df["game_total"].mean()).fillna(44.0)
+    df["team_spread"] = df["team_spread"].fillna(0.0)
+    df["implied"] = df["game_total"]/2 - df["team_spread"]/2
+    df["log_pool"] = np.log(grp["name"].transform("size").astype(float))
+    for p in POSITIONS:
+        df[f"pos_{p}"] = (df["pos"] == p).astype(float)
+    df[NUMERIC] = df[NUMERIC].fillna(0.0)
+    return df
+
+def design(df, mean, std):
+    X = (df[NUMERIC].to_numpy(float) - mean)/std
+    return np.hstack([X, df[[f"pos_{p}" for p in POSITIONS]].to_numpy(float)])
+
+def fit(frames, lam=1.0):
+    """frames: list of (feature frame with 'own' column, week label); returns the model dict"""
+    df = pd.concat([f for f, _ in frames], ignore_index=True)
+    mean = df[NUMERIC].mean().to_numpy(float)
+    std = df[NUMERIC].std().replace(0, 1).fillna(1).to_numpy(float)
+    X = design(df, mean, std)
+    own = df["own"].clip(OWN_FLOOR, OWN_CAP)/100.0
+    y = np.log(own/(1 - own)).to_numpy()
+    penalty = np.r_[np.full(len(NUMERIC), lam), np.zeros(len(POSITIONS))]  # position intercepts unpenalised
+    coef = np.linalg.solve(X.T @ X + np.diag(penalty), X.T @ y)
+    totals = (pd.concat([f.groupby("pos")["own"].sum().rename(w) for f, w in frames], axis=1).mean(axis=1))
+    model = {
+        "version": 1, "features": NUMERIC, "positions": POSITIONS, "lambda": lam,
+        "mean": mean.round(6).tolist(), "std": std.round(6).tolist(), "coef": coef.round(6).tolist(),
+        "pos_totals": {p: round(float(totals.get(p, DEFAULT_TOTALS[p])), 3) for p in POSITIONS},
+        "trained_on": {"weeks": len(frames), "rows": len(df)},
+    }
+    err = np.concatenate([np.abs(predict_frame(f, model) - f["own"].to_numpy()) for f, _ in frames])  # normalised per slate
+    model["fit_mae_pct"] = round(float(err.mean()), 3)
+    return model
+
+def normalize(own, pos, totals, cap=100.0, rounds=10):
+    """Scale own so each position sums to totals[pos], keeping every player at or below cap"""
+    own = pd.Series(np.asarray(own, float), index=pos.index)
+    target = pos.map(totals).fillna(pos.map(DEFAULT_TOTALS)).astype(float)
+    for _ in range(rounds):
+        capped = own >= cap - 1e-9
+        fixed = own.where(capped, 0.0).groupby(pos).transform("sum")
+        free = own.where(~capped, 0.0).groupby(pos).transform("sum")
+        scale = ((target - fixed)/free.where(free > 0)).fillna(1.0).clip(lower=0.0)
+        scaled = own.where(capped, own*scale)
+        own = scaled.clip(upper=cap)
+        if (scaled <= cap + 1e-9).all():
+            break
+    return own
+
+def predict_frame(feat, model, normalized=True):
+    X = design(feat, np.array(model["mean"]), np.array(model["std"]))
+    own = 100.0/(1 + np.exp(-(X @ np.array(model["coef"]))))
+    return normalize(own, feat["pos"], model["pos_totals"]).to_numpy() if normalized else own
+
+def load_model(path=DEFAULT_MODEL):
+    with open(path) as f:
+        return json.load(f)
+
+def save_model(model, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(model, f, indent=1)
+
+def predict(players, weekly_df=None, model=None):
+    """name, own (%) for a slate's players (name, team, pos, salary, proj)"""
+    model = load_model() if model is None else model
+    feat = features(players, weekly_df)
+    return pd.DataFrame({"name": feat["name"], "own": predict_frame(feat, model).round(3)})
+
+def week_frame(week_dir, target):
+    """Features joined to actual ownership for one historical week (players missing from target = 0%)"""
+    d = Path(week_dir)
+    proj = load_optional(str(d/"projections.csv"))
+    players = load_dk(str(d/"DKSalaries.csv")).merge(proj[["name", "proj"]], on="name", how="left")
+    weekly = load_weekly_inputs(str(d/"weekly_inputs.csv")) if (d/"weekly_inputs.csv").exists() else None
+    feat = features(players, weekly)
+    actual = pd.read_csv(d/target)[["name", "own"]].drop_duplicates("name")
+    feat = feat.merge(actual, on="name", how="left")
+    feat["own"] = feat["own"].fillna(0.0)
+    return feat
+
+def load_history(hist, target):
+    frames = []
+    for d in sorted(p for p in Path(hist).iterdir() if p.is_dir() and (p/target).exists()):
+        frames.append((week_frame(d, target), d.name))
+    return frames
+
+def cross_validate(frames, lam=1.0):
+    """Leave-one-week-out MAE (own %) per held-out week"""
+    rows = []
+    for i, (f, w) in enumerate(frames):
+        model = fit(frames[:i] + frames[i + 1:], lam)
+        rows.append({"week": w, "mae_pct": round(float(np.abs(predict_frame(f, model) - f["own"]).mean()), 3)})
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    f = sub.add_parser("fit", help="Fit on historical weeks and write the model JSON")
+    f.add_argument("--hist", required=True)
+    f.add_argument("--target", default="contest/ownership.csv", help="Actual ownership file inside each week dir")
+    f.add_argument("--out", default=DEFAULT_MODEL)
+    f.add_argument("--lam", type=float, default=1.0, help="Ridge penalty")
+    f.add_argument("--cv", action="store_true", help="Also report leave-one-week-out MAE")
+    p = sub.add_parser("predict", help="Project ownership for a slate")
+    p.add_argument("--dk", required=True)
+    p.add_argument("--projections", required=True)
+    p.add_argument("--weekly", default=None)
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--out", default="ownership.csv")
+    args = ap.parse_args()
+
+    if args.cmd == "fit":
+        frames = load_history(args.hist, args.target)
+        if len(frames) < 1:
+            raise SystemExit(f"No week directories with {args.target} under {args.hist}")
+        model = fit(frames, args.lam)
+        save_model(model, args.out)
+        print(f"Fitted on {model['trained_on']['weeks']} weeks / {model['trained_on']['rows']} players, "
+              f"in-sample MAE {model['fit_mae_pct']}% -> {args.out}")
+        if args.cv and len(frames) > 1:
+            cv = cross_validate(frames, args.lam)
+            print(cv.to_string(index=False))
+            print(f"Leave-one-week-out MAE: {cv['mae_pct'].mean():.3f}%")
+    else:
+        players = load_dk(args.dk).merge(load_optional(args.projections)[["name", "proj"]], on="name", how="left")
+        weekly = load_weekly_inputs(args.weekly) if args.weekly else None
+        own = predict(players, weekly, load_model(args.model))
+        own.to_csv(args.out, index=False)
+        print(f"Wrote ownership for {len(own)} players to {args.out}")
@@ -0,0 +1,229 @@
+"""
+Profiler hooks for the pipeline scripts.
+
+Two modes:
+- sample:        a background thread snapshots the main thread's stack every few ms.
+                 Low overhead; writes a collapsed-stack file (flamegraph.pl / speedscope)
+                 plus a hot-function table.
+- deterministic: cProfile around the same block; writes a .prof file plus the table, and the
+                 same collapsed-stack file rebuilt from the pstats call graph (values are
+                 microseconds, callee time split across call paths by the per-caller times).
+
+Use `Profiler` around any block, and `stage("name")` inside a profiled run to label
+individual stages (stage names become the root frames of the flamegraph and get wall
+times in <name>_stages.csv). `stage()` is a no-op when nothing is being profiled.
+"""
+
+import os, sys, io, time, threading, collections, cProfile, pstats, csv
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+_ACTIVE = None  # Profiler currently running, if any
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Profiler:
+    """Profile a block and write <name>.collapsed / <name>_hot.csv / <name>_stages.csv to out_dir"""
+
+    def __init__(self, out_dir, name="profile", mode="sample", interval=0.005, top_n=30):
+        if mode not in ("sample", "deterministic"):
+            raise ValueError(f"unknown profile mode: {mode}")
+        self.out_dir = Path(out_dir)
+        self.name = name
+        self.mode = mode
+        self.interval = interval
+        self.top_n = top_n
+        self.samples = collections.Counter()
+        self.stage_times = collections.defaultdict(float)
+        self._stage_path = ()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._cprofile = None
+        self._t0 = None
+        self.elapsed = 0.0
+
+    # ---- lifecycle ----
+    def start(self):
+        global _ACTIVE
+        self._t0 = time.perf_counter()
+        self._thread_id = threading.get_ident()
+        if self.mode == "sample":
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+        else:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        _ACTIVE = self
+        return self
+
+    def stop(self):
+        global _ACTIVE
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        self.elapsed = time.perf_counter() - self._t0
+        if _ACTIVE is self:
+            _ACTIVE = None
+        return self.write()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # ---- sampling ----
+    def _sample_loop(self):
+        tid = self._thread_id
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(tid)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[tuple(f"[{s}]" for s in self._stage_path) + tuple(stack)] += 1
+
+    def push_stage(self, name):
+        self._stage_path = self._stage_path + (name,)
+
+    def pop_stage(self, name, seconds):
+        self._stage_path = self._stage_path[:-1]
+        self.stage_times[name] += seconds
+
+    # ---- output ----
+    def collapsed_from_stats(self, min_us=1):
+        """Collapsed stacks (tuple of frames -> microseconds of self time) from the cProfile call graph"""
+        stats = pstats.Stats(self._cprofile, stream=io.StringIO()).stats
+        label = lambda k: f"{k[2]} ({os.path.basename(k[0])}:{k[1]})"
+        callees = collections.defaultdict(dict)
+        for fn, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                callees[caller][fn] = edge[3]  # cumulative time of fn when called from caller
+        out = collections.Counter()
+
+        def walk(fn, path, t):
+            # t: seconds of fn's cumulative time spent on this path
+            tt, ct = stats[fn][2], stats[fn][3]
+            scale = t/ct if ct > 0 else 0.0
+            us = int(round(tt*scale*1e6))
+            if us >= min_us:
+                out[path] += us
+            for child, edge in callees.get(fn, {}).items():
+                sub = edge*scale
+                if child not in stats or label(child) in path or sub*1e6 < min_us:
+                    continue  # recursion is folded into the first occurrence
+                walk(child, path + (label(child),), sub)
+
+        for fn, (_, _, _, ct, callers) in stats.items():
+            if not set(callers) - {fn}:  # entered from outside the profiled block
+                walk(fn, (label(fn),), ct)
+        return out
+
+    def hot_functions(self):
+        """Rows of (function, self, self_pct, total, total_pct, ...) sorted by self cost"""
+        if self.mode == "deterministic":
+            stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+            rows = []
+            total = sum(v[2] for v in stats.stats.values()) or 1.0
+            for (fn, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+                label = f"{func} ({os.path.basename(fn)}:{line})"
+                rows.append({"function": label, "ncalls": nc, "self_s": round(tt, 4), "self_pct": round(100*tt/total, 2),
+                             "total_s": round(ct, 4), "total_pct": round(100*ct/total, 2)})
+            rows.sort(key=lambda r: r["self_s"], reverse=True)
+            return rows[:self.top_n]
+
+        n = sum(self.samples.values()) or 1
+        self_counts = collections.Counter()
+        total_counts = collections.Counter()
+        for stack, c in self.samples.items():
+            frames = [f for f in stack if not f.startswith("[")]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += c
+            for f in set(frames):
+                total_counts[f] += c
+        rows = []
+        for f, c in self_counts.most_common(self.top_n):
+            rows.append({"function": f, "self_samples": c, "self_pct": round(100*c/n, 2),
+                         "total_samples": total_counts[f], "total_pct": round(100*total_counts[f]/n, 2)})
+        return rows
+
+    def write(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if self.mode == "deterministic":
+            prof = self.out_dir/f"{self.name}.prof"
+            self._cprofile.dump_stats(str(prof))
+            written.append(prof)
+        stacks = self.samples if self.mode == "sample" else self.collapsed_from_stats()
+        collapsed = self.out_dir/f"{self.name}.collapsed"
+        with open(collapsed, "w") as f:
+            for stack, c in sorted(stacks.items()):
+                f.write(";".join(stack) + f" {c}\n")
+        written.append(collapsed)
+
+        rows = self.hot_functions()
+        hot = self.out_dir/f"{self.name}_hot.csv"
+        with open(hot, "w", newline="") as f:
+            if rows:
+                w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+                w.writeheader(); w.writerows(rows)
+        written.append(hot)
+
+        if self.stage_times:
+            stages = self.out_dir/f"{self.name}_stages.csv"
+            with open(stages, "w", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["stage", "seconds"])
+                for k, v in self.stage_times.items():
+                    w.writerow([k, round(v, 4)])
+            written.append(stages)
+
+        self.print_summary(rows)
+        for p in written:
+            print(f"Profile written: {p}")
+        return written
+
+    def print_summary(self, rows):
+        print(f"\n=== Profile ({self.mode}) {self.name}: {self.elapsed:.2f}s ===")
+        for k, v in self.stage_times.items():
+            print(f"  stage {k:<24} {v:8.3f}s")
+        for r in rows[:15]:
+            print(f"  {r['self_pct']:6.2f}%  {r['function']}")
+
+@contextmanager
+def stage(name):
+    """Label a pipeline stage; times it and tags samples when a profiler is running"""
+    prof = _ACTIVE
+    if prof is None:
+        yield
+        return
+    prof.push_stage(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        prof.pop_stage(name, time.perf_counter() - t0)
+
+def add_profile_args(ap):
+    """Add the shared --profile flags to an argparse parser"""
+    ap.add_argument("--profile", action="store_true", help="Run under the profiler and write results to the out dir")
+    ap.add_argument("--profile_mode", choices=["sample", "deterministic"], default="sample")
+    ap.add_argument("--profile_interval", type=float, default=0.005, help="Sampling interval in seconds")
+    ap.add_argument("--profile_top", type=int, default=30, help="Rows in the hot-function table")
+    return ap
+
+def maybe_profile(args, out_dir, name):
+    """Profiler context if --profile was given, otherwise a no-op context"""
+    if not getattr(args, "profile", False):
+        return nullcontext()
+    return Profiler(out_dir, name=name, mode=args.profile_mode, interval=args.profile_interval, top_n=args.profile_top)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Quality-vs-runtime regression harness.
+
+Runs each engine in bench.ENGINES on the same synthetic slates and seeds, then scores
+every lineup against the exact best lineup that keeps the same stack core
+(QB + QB teammates + opponent skill players), computed with fill.best_fill_score.
+Scores use the repo objective (utils.lineup_score with 0.35 proj / 0.03 own) over one
+canonical player table, so engines that drop ownership are scored the same way.
+
+    python quality.py --games 2 6 13 --seeds 1 2 3 --out out/quality
+
+Writes quality_results.csv (one row per games/seed/engine) and quality_lineups.csv.
+"""
+
+import argparse, os, time, contextlib
+import pandas as pd, numpy as np
+from pathlib import Path
+import fill, synth_slate
+from bench import ENGINES, load_context, run_isolated
+import validate as V
+
+RULES = V.UNKNOWN_PLAYER | V.DUPLICATE_PLAYER | V.POSITIONS | V.SALARY | V.STACK | V.BRINGBACK
+
+def canonical_players(ctx):
+    """DK pool joined to projections/ownership, as {name: player dict}"""
+    proj = ctx["proj"][["name", "team", "pos", "proj", "p90"]]
+    df = ctx["dk"].merge(proj, on=["name", "team", "pos"], how="left")
+    df = df.merge(ctx["own"][["name", "own"]], on="name", how="left")
+    df["proj"] = df["proj"].fillna(0.0)
+    df["p90"] = df["p90"].fillna(df["proj"]*1.6)
+    df["own"] = df["own"].fillna(5.0)
+    df["salary"] = df["salary"].astype(int)
+    return {r["name"]: r for r in df[["name", "team", "pos", "salary", "proj", "p90", "own"]].to_dict("records")}
+
+def opponent_map(weekly_df):
+    m = {}
+    for h, a in zip(weekly_df["home_team"], weekly_df["away_team"]):
+        m[h] = a; m[a] = h
+    return m
+
+def stack_core(lu, opp):
+    """QB plus QB-team skill players plus opponent skill players"""
+    qb = next((p for p in lu if p["pos"] == "QB"), None)
+    if qb is None:
+        return []
+    o = opp.get(qb["team"])
+    mates = [p for p in lu if p is not qb and p["pos"] != "DST" and p["team"] == qb["team"]]
+    backs = [p for p in lu if p["pos"] != "DST" and p["team"] == o]
+    return [qb] + mates + backs
+
+def validity(engine_lineups, players, opp, cfg):
+    """Per-lineup validity (full roster, salary band, QB + 2 WR/TE + bring-back) in one batch"""
+    table = V.PlayerTable(list(players.values()), opp=opp)
+    band = {"min_salary": cfg["min_salary"], "max_salary": cfg["max_salary"]}
+    return (V.validate(table.matrix(engine_lineups), table, band) & RULES) == 0
+
+def run_engine(engine, slate_dir, n, seed, weights_path="config/weights.yaml"):
+    """Run one engine quietly; returns generation seconds and lineups as name lists"""
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        ctx = load_context(slate_dir, weights_path)
+        t0 = time.perf_counter()
+        lineups = ENGINES[engine](ctx, n, seed)
+        gen_s = time.perf_counter() - t0
+    return {"gen_s": gen_s, "lineups": [[p["name"] for p in lu] for _, lu in lineups]}
+
+def evaluate(engine_lineups, players, opp, cfg, bound_cache=None):
+    """Per-lineup rows: score, exact same-core optimum, gap %, validity"""
+    bound_cache = {} if bound_cache is None else bound_cache
+    pool = list(players.values())
+    valid = validity(engine_lineups, players, opp, cfg)
+    rows = []
+    for i, names in enumerate(engine_lineups):
+        lu = [players[n] for n in names if n in players]
+        score = sum(fill.player_value(p) for p in lu)
+        core = stack_core(lu, opp)
+        key = frozenset(p["name"] for p in core)
+        if key not in bound_cache:
+            bound_cache[key] = fill.best_fill_score(core, pool, salary_cap=cfg["max_salary"])
+        opt = bound_cache[key]
+        gap = 100.0*(opt - score)/abs(opt) if np.isfinite(opt) and opt != 0 else np.nan
+        rows.append({"lineup": i + 1, "score": round(score, 4), "core_opt": round(opt, 4) if np.isfinite(opt) else np.nan,
+                     "gap_pct": round(gap, 3) if np.isfinite(gap) else np.nan, "valid": bool(valid[i]),
+                     "core": "|".join(sorted(key)), "players": "|".join(sorted(names))})
+    return rows
+
+def summarize(rows, slate_opt, gen_s):
+    if not rows:
+        return {"n_lineups": 0, "valid_rate": 0.0, "unique_rate": 0.0, "runtime_s": round(gen_s, 3)}
+    df = pd.DataFrame(rows)
+    gaps = df["gap_pct"].dropna()  # infeasible cores (e.g. two QBs) have no bound
+    return {
+        "n_lineups": len(df),
+        "valid_rate": round(df["valid"].mean(), 4),
+        "unique_rate": round(df["players"].nunique()/len(df), 4),
+        "mean_score": round(df["score"].mean(), 3),
+        "bounded_rate": round(len(gaps)/len(df), 4),
+        "mean_gap_pct": round(gaps.mean(), 3) if len(gaps) else np.nan,
+        "median_gap_pct": round(gaps.median(), 3) if len(gaps) else np.nan,
+        "p90_gap_pct": round(gaps.quantile(0.9), 3) if len(gaps) else np.nan,
+        "max_gap_pct": round(gaps.max(), 3) if len(gaps) else np.nan,
+        "top_vs_slate_opt_pct": round(100.0*(slate_opt - df["score"].max())/abs(slate_opt), 3),
+        "runtime_s": round(gen_s, 3),
+        "lineups_per_s": round(len(df)/gen_s, 2) if gen_s > 0 else np.nan,
+    }
+
+def main(games, seeds, engines, n, out_dir, weights_path="config/weights.yaml", timeout=300, isolate=True):
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+    results, details = [], []
+    for g in games:
+        for seed in seeds:
+            slate_dir = out/"slates"/f"g{g:02d}_s{seed}"
+            synth_slate.write_slate(synth_slate.make_slate(n_games=g, seed=seed), slate_dir)
+            ctx = load_context(slate_dir, weights_path)
+            players = canonical_players(ctx)
+            opp = opponent_map(ctx["weekly"])
+            slate_opt = fill.best_fill_score([], list(players.values()), salary_cap=ctx["cfg"]["max_salary"])
+            bounds = {}
+            for e in engines:
+                args = (e, str(slate_dir), n, seed, weights_path)
+                if isolate:
+                    status, res = run_isolated(run_engine, args, timeout)
+                else:
+                    status, res = "ok", run_engine(*args)
+                row = {"games": g, "seed": seed, "engine": e, "status": status if status != "error" else f"error: {res}",
+                       "slate_opt": round(slate_opt, 3)}
+                if status == "ok":
+                    lrows = evaluate(res["lineups"], players, opp, ctx["cfg"], bounds)
+                    row.update(summarize(lrows, slate_opt, res["gen_s"]))
+                    for r in lrows:
+                        details.append(dict(r, games=g, seed=seed, engine=e))
+                results.append(row)
+                print(f"[quality] {g:>2}g seed {seed} {e:<24} {row['status']:<8} "
+                      f"n={row.get('n_lineups', 0):>4} valid={row.get('valid_rate', 0):.2f} "
+                      f"gap={row.get('mean_gap_pct', np.nan)}% t={row.get('runtime_s', np.nan)}s")
+    res_df = pd.DataFrame(results)
+    res_df.to_csv(out/"quality_results.csv", index=False)
+    pd.DataFrame(details).to_csv(out/"quality_lineups.csv", index=False)
+    print(f"Wrote {out/'quality_results.csv'} and {out/'quality_lineups.csv'}")
+    return res_df
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--games", type=int, nargs="+", default=[2, 6, 13])
+    ap.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    ap.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    ap.add_argument("--n", type=int, default=150)
+    ap.add_argument("--weights", default="config/weights.yaml")
+    ap.add_argument("--out", default="out/quality")
+    ap.add_argument("--timeout", type=float, default=300)
+    ap.add_argument("--inproc", action="store_true", help="Run engines in this process (no timeout)")
+    args = ap.parse_args()
+    main(args.games, args.seeds, args.engines, args.n, args.out, args.weights, args.timeout, not args.inproc)
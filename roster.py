@@ -0,0 +1,153 @@
+"""
+Roster templates (config/rosters.yaml) compiled to bit operations.
+
+A template is a list of slots and the positions each slot accepts. Compiling it gives
+  - one bit per position and an eligibility mask per slot,
+  - a packed count word per lineup (a few bits per position), so adding a player is one integer add,
+  - the set of count words that are legal full rosters (`final`) and the set that can still be
+    completed to one (`partial`), found once by Hall's condition over the slot masks.
+`can_add` / `is_final` are then a single set lookup and the build phase is exact: a position is
+only accepted while the roster can still be completed.
+
+    from roster import get_roster
+    dk = get_roster("dk_classic")
+    dk.can_add(lineup, "RB"); dk.is_final(lineup); dk.upload_row(lineup, key=lambda p: p["salary"])
+"""
+
+import argparse, os, itertools, functools, collections, yaml
+
+ROSTERS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "rosters.yaml")
+DEFAULT = "dk_classic"
+
+class Roster:
+    def __init__(self, name, slots, eligible=None, salary_cap=50000, site="", multipliers=None):
+        eligible = eligible or {}
+        self.name, self.site, self.salary_cap = name, site, int(salary_cap)
+        self.slots = tuple(slots)
+        self.multipliers = {s: float((multipliers or {}).get(s, 1.0)) for s in self.slots}  # salary and points
+        self.size = len(self.slots)
+        self.eligible = {s: frozenset(eligible.get(s, [s])) for s in self.slots}
+        self.positions = tuple(dict.fromkeys(p for s in self.slots for p in sorted(self.eligible[s])))
+        self.bit = {p: 1 << i for i, p in enumerate(self.positions)}
+        self.slot_masks = tuple(sum(self.bit[p] for p in self.eligible[s]) for s in self.slots)
+        self.width = self.size.bit_length()  # a count never exceeds the roster size, so fields never carry
+        self.inc = {p: 1 << (self.width*i) for i, p in enumerate(self.positions)}
+        self.max = {p: sum(1 for m in self.slot_masks if m & self.bit[p]) for p in self.positions}
+        self.min = {p: sum(1 for m in self.slot_masks if m == self.bit[p]) for p in self.positions}
+        self._finals = self._final_counts()
+        self.final = frozenset(self.pack_counts(c) for c in self._finals)
+        self.partial = frozenset(self.pack_counts(dict(zip(self.positions, sub)))
+                                 for c in self._finals
+                                 for sub in itertools.product(*[range(c[p] + 1) for p in self.positions]))
+        # upload column names as pandas reads the site's template header ("RB", "RB.1", ...)
+        seen = collections.Counter()
+        self.columns = []
+        for s in self.slots:
+            self.columns.append(s if not seen[s] else f"{s}.{seen[s]}")
+            seen[s] += 1
+
+    def __repr__(self):
+        return f"Roster({self.name!r}, {list(self.slots)}, cap={self.salary_cap})"
+
+    def _fits(self, counts):
+        """Hall's condition: every set of positions fits in the slots that accept any of them"""
+        for r in range(1, len(self.positions) + 1):
+            for sub in itertools.combinations(self.positions, r):
+                mask = sum(self.bit[p] for p in sub)
+                if sum(counts[p] for p in sub) > sum(1 for m in self.slot_masks if m & mask):
+                    return False
+        return True
+
+    def _final_counts(self):
+        out = []
+        for combo in itertools.product(*[range(self.min[p], self.max[p] + 1) for p in self.positions]):
+            c = dict(zip(self.positions, combo))
+            if sum(combo) == self.size and self._fits(c):
+                out.append(c)
+        return tuple(out)
+
+    def final_counts(self):
+        """All legal full-roster position-count vectors (as dicts)"""
+        return [dict(c) for c in self._finals]
+
+    def pack_counts(self, counts):
+        return sum(self.inc[p]*k for p, k in counts.items())
+
+    def pack(self, lineup):
+        """Packed count word for a lineup of player dicts (None if it has a position the roster lacks)"""
+        word = 0
+        for p in lineup:
+            inc = self.inc.get(p["pos"])
+            if inc is None:
+                return None
+            word += inc
+        return word
+
+    def can_add(self, lineup, pos):
+        """Whether a `pos` player can join `lineup` with the roster still completable"""
+        if pos not in self.inc or len(lineup) >= self.size:
+            return False
+        word = self.pack(lineup)
+        return word is not None and word + self.inc[pos] in self.partial
+
+    def is_final(self, lineup):
+        """Exact legal full roster by positions"""
+        return len(lineup) == self.size and self.pack(lineup) in self.final
+
+    def assign(self, lineup, key=None):
+        """
+        Players in slot order (None where a slot cannot be filled). Players are tried in `key` order
+        (descending; lineup order when None), most restrictive slots first, so dedicated slots take the
+        top players of their position and FLEX-type slots the best remaining one.
+        """
+        players = sorted(lineup, key=key, reverse=True) if key else list(lineup)
+        bits = [self.bit.get(p["pos"], 0) for p in players]
+        order = sorted(range(self.size), key=lambda i: (bin(self.slot_masks[i]).count("1"), i))
+        out = [None]*self.size
+
+        def place(k, used):
+            if k == len(order):
+                return True
+            i = order[k]
+            for j, b in enumerate(bits):
+                if not (used >> j) & 1 and b & self.slot_masks[i]:
+                    out[i] = players[j]
+                    if place(k + 1, used | (1 << j)):
+                        return True
+            out[i] = None
+            return False
+
+        if not place(0, 0):
+            # no complete assignment: greedy, leaving unfillable slots empty
+            used = 0
+            for i in order:
+                j = next((j for j, b in enumerate(bits) if not (used >> j) & 1 and b & self.slot_masks[i]), None)
+                out[i] = None if j is None else players[j]
+                used |= 0 if j is None else 1 << j
+        return out
+
+    def upload_row(self, lineup, key=None):
+        """{upload column: player id} in slot order ('' for empty slots)"""
+        return {c: (p.get("id", "") if p else "") for c, p in zip(self.columns, self.assign(lineup, key))}
+
+def load_templates(path=ROSTERS):
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+@functools.lru_cache(maxsize=None)
+def get_roster(name=DEFAULT, path=ROSTERS):
+    """Compiled template by name (cached)"""
+    templates = load_templates(path)
+    if name not in templates:
+        raise KeyError(f"Unknown roster template {name!r}; known: {sorted(templates)}")
+    t = templates[name]
+    return Roster(name, t["slots"], t.get("eligible"), t.get("salary_cap", 50000), t.get("site", ""), t.get("multipliers"))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=ROSTERS)
+    args = ap.parse_args()
+    for name in load_templates(args.path):
+        r = get_roster(name, args.path)
+        print(f"{name:<12} {r.site:<10} cap={r.salary_cap:<6} slots={'/'.join(r.slots)}")
+        print(f"{'':<12} min={r.min} max={r.max} final={len(r.final)} partial={len(r.partial)}")
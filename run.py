@@ -5,15 +5,19 @@ from edge_scores import main as edge_main
 from stacks import main as stacks_main
 from optimize import main as opt_main
 from utils import read_weights
+from profiling import stage, add_profile_args, maybe_profile
 
 def run(weekly, roles, dk, weights, out_dir, projections=None, ownership=None):
     out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
     edge_csv = out/"edge_scores.csv"
     stacks_csv = out/"core_stacks.csv"
 
-    edge_df = edge_main(weekly, weights, str(edge_csv))
-    stacks_df = stacks_main(str(edge_csv), roles, weekly, str(stacks_csv))
-    lu_csv = opt_main(weekly, str(edge_csv), str(stacks_csv), roles, dk, out_dir, projections, ownership, weights)
+    with stage("edge_scores"):
+        edge_df = edge_main(weekly, weights, str(edge_csv))
+    with stage("stacks"):
+        stacks_df = stacks_main(str(edge_csv), roles, weekly, str(stacks_csv))
+    with stage("optimize"):
+        lu_csv = opt_main(weekly, str(edge_csv), str(stacks_csv), roles, dk, out_dir, projections, ownership, weights)
     print("Generated:", lu_csv)
 
 if __name__ == "__main__":
@@ -25,5 +29,7 @@ if __name__ == "__main__":
     ap.add_argument("--out", required=True)
     ap.add_argument("--projections", default=None)
     ap.add_argument("--ownership", default=None)
+    add_profile_args(ap)
     args = ap.parse_args()
-    run(args.weekly, args.roles, args.dk, args.weights, args.out, args.projections, args.ownership)
+    with maybe_profile(args, args.out, "run_profile"):
+        run(args.weekly, args.roles, args.dk, args.weights, args.out, args.projections, args.ownership)
@@ -1,5 +1,8 @@
-
-import os, argparse, pandas as pd, json, subprocess, sys, shutil, yaml
+import os, argparse, pandas as pd, json, subprocess, sys, shutil, yaml, time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import fetch_schedule_espn, fetch_lines_oddsapi, fetch_weather_openmeteo
+import compute_proe_pace, compute_concentration, fetch_depth_charts_ourlads
+from http_client import add_http_args, configure
 
 here = os.path.dirname(__file__)
 
@@ -8,6 +11,93 @@ def run(cmd:list):
     res = subprocess.run(cmd, check=True)
     return res.returncode
 
+def plan_tasks(args, paths):
+    """name -> {fn, kwargs, cmd, deps}; cmd is the equivalent script call for --mode subprocess"""
+    py = sys.executable
+    season = str(args.season)
+    return {
+        "schedule": {"fn": fetch_schedule_espn.fetch_schedule, "deps": (),
+                     "kwargs": {"season": args.season, "week": args.week, "out": paths["schedule"]},
+                     "cmd": [py, os.path.join(here,"fetch_schedule_espn.py"), "--season", season, "--week", str(args.week), "--out", paths["schedule"]]},
+        "odds": {"fn": fetch_lines_oddsapi.fetch_lines, "deps": (),
+                 "kwargs": {"out": paths["odds"], "api_key": args.odds_api_key, "season": args.season, "week": args.week},
+                 "cmd": [py, os.path.join(here,"fetch_lines_oddsapi.py"), "--out", paths["odds"], "--season", season, "--week", str(args.week)]
+                        + (["--api_key", args.odds_api_key] if args.odds_api_key else [])},
+        "weather": {"fn": fetch_weather_openmeteo.fetch_weather, "deps": ("schedule",),
+                    "kwargs": {"schedule": paths["schedule"], "stadiums": args.stadiums, "out": paths["weather"], "stub": args.weather_stub},
+                    "cmd": [py, os.path.join(here,"fetch_weather_openmeteo.py"), "--schedule", paths["schedule"], "--stadiums", args.stadiums, "--out", paths["weather"]]
+                           + (["--stub"] if args.weather_stub else [])},
+        "proe_pace": {"fn": compute_proe_pace.compute_proe_pace, "deps": (),
+                      "kwargs": {"season": args.season, "out": paths["proe_pace"], "pbp": args.pbp, "week": args.week},
+                      "cmd": [py, os.path.join(here,"compute_proe_pace.py"), "--season", season, "--out", paths["proe_pace"]]
+                             + (["--pbp", *args.pbp, "--week", str(args.week)] if args.pbp else [])},
+        "concentration": {"fn": compute_concentration.compute_concentration, "deps": (),
+                          "kwargs": {"season": args.season, "out": paths["concentration"], "pbp": args.pbp, "week": args.week,
+                                     "rosters": args.rosters, "participation": args.participation},
+                          "cmd": [py, os.path.join(here,"compute_concentration.py"), "--season", season, "--out", paths["concentration"]]
+                                 + (["--pbp", *args.pbp, "--week", str(args.week)] if args.pbp else [])
+                                 + (["--rosters", *args.rosters] if args.rosters else [])
+                                 + (["--participation", *args.participation] if args.participation else [])},
+        "roles": {"fn": fetch_depth_charts_ourlads.fetch_depth_charts, "deps": (),
+                  "kwargs": {"out": paths["roles"]},
+                  "cmd": [py, os.path.join(here,"fetch_depth_charts_ourlads.py"), "--out", paths["roles"]]},
+    }
+
+def _timed(fn, kwargs):
+    t0 = time.perf_counter()
+    fn(**kwargs)
+    return time.perf_counter() - t0
+
+def run_tasks(tasks, mode="thread", jobs=None):
+    """
+    Run tasks as soon as their deps have succeeded. A failed task only skips the tasks that
+    depend on it. Returns name -> {"status": ok|failed|skipped, "seconds", "error"}.
+    mode: thread / process call the script functions in a pool; subprocess launches each script.
+    """
+    jobs = jobs or len(tasks)
+    pool = ProcessPoolExecutor(jobs) if mode == "process" else ThreadPoolExecutor(jobs)
+    results, running = {}, {}
+    t_start = time.perf_counter()
+
+    def submit_ready():
+        for name, t in tasks.items():
+            if name in results or name in running.values():
+                continue
+            if any(results.get(d, {}).get("status") in ("failed", "skipped") for d in t["deps"]):
+                results[name] = {"status": "skipped", "seconds": 0.0, "error": "dependency failed"}
+                print(f"[fetch] {name:<14} skipped (dependency failed)")
+                continue
+            if all(results.get(d, {}).get("status") == "ok" for d in t["deps"]):
+                if mode == "subprocess":
+                    fut = pool.submit(_timed, run, {"cmd": t["cmd"]})
+                else:
+                    fut = pool.submit(_timed, t["fn"], t["kwargs"])
+                running[fut] = name
+
+    with pool:
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    secs = fut.result()
+                    results[name] = {"status": "ok", "seconds": round(secs, 3), "error": ""}
+                    print(f"[fetch] {name:<14} ok      {secs:7.2f}s")
+                except BaseException as e:
+                    results[name] = {"status": "failed", "seconds": float("nan"), "error": f"{type(e).__name__}: {e}"}
+                    print(f"[fetch] {name:<14} FAILED  {type(e).__name__}: {e}")
+            submit_ready()
+        submit_ready()  # mark anything left behind a failed dependency
+    print(f"[fetch] {len(tasks)} tasks in {time.perf_counter() - t_start:.2f}s ({mode}, jobs={jobs})")
+    return results
+
+def read_output(path, result):
+    """Task output as a DataFrame; empty if the task did not succeed"""
+    if result["status"] != "ok" or not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path)
+
 if __name__=="__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--season", type=int, required=True)
@@ -15,34 +105,42 @@ if __name__=="__main__":
     ap.add_argument("--outdir", type=str, required=True)
     ap.add_argument("--odds_api_key", type=str, default=os.getenv("ODDS_API_KEY"))
     ap.add_argument("--stadiums", type=str, default=os.path.join(os.path.dirname(here),"config","stadiums.json"))
+    ap.add_argument("--mode", choices=["thread", "process", "subprocess"], default="thread",
+                    help="Run fetchers as functions in a thread/process pool, or as separate scripts")
+    ap.add_argument("--pbp", nargs="+", default=None, help="Play-by-play CSV/Parquet file(s) for PROE/pace and concentration")
+    ap.add_argument("--rosters", nargs="+", default=None, help="Roster file(s) giving player positions for concentration")
+    ap.add_argument("--participation", nargs="+", default=None, help="Participation file(s) for route shares")
+    ap.add_argument("--weather_stub", action="store_true", help="Generate weather locally instead of calling Open-Meteo")
+    ap.add_argument("--jobs", type=int, default=None, help="Max concurrent fetchers (1 = sequential)")
+    add_http_args(ap)
     args = ap.parse_args()
+    configure(args)
 
     os.makedirs(args.outdir, exist_ok=True)
-    schedule_csv = os.path.join(args.outdir, "schedule.csv")
-    odds_csv = os.path.join(args.outdir, "odds.csv")
-    weather_csv = os.path.join(args.outdir, "weather.csv")
-    proe_csv = os.path.join(args.outdir, "proe_pace.csv")
-    conc_csv = os.path.join(args.outdir, "concentration.csv")
-    roles_csv = os.path.join(args.outdir, "roles.csv")
-
-    # Run all the data fetching scripts
-    run([sys.executable, os.path.join(here,"fetch_schedule_espn.py"), "--season", str(args.season), "--week", str(args.week), "--out", schedule_csv])
-    run([sys.executable, os.path.join(here,"fetch_lines_oddsapi.py"), "--out", odds_csv] + (["--api_key", args.odds_api_key] if args.odds_api_key else []))
-    run([sys.executable, os.path.join(here,"fetch_weather_openmeteo.py"), "--schedule", schedule_csv, "--stadiums", args.stadiums, "--out", weather_csv])
-    run([sys.executable, os.path.join(here,"compute_proe_pace.py"), "--season", str(args.season), "--out", proe_csv])
-    run([sys.executable, os.path.join(here,"compute_concentration.py"), "--season", str(args.season), "--out", conc_csv])
-    run([sys.executable, os.path.join(here,"fetch_depth_charts_ourlads.py"), "--out", roles_csv])
+    paths = {k: os.path.join(args.outdir, f) for k, f in [
+        ("schedule", "schedule.csv"), ("odds", "odds.csv"), ("weather", "weather.csv"),
+        ("proe_pace", "proe_pace.csv"), ("concentration", "concentration.csv"), ("roles", "roles.csv")]}
+
+    # Run all the data fetching tasks (weather waits on schedule, the rest are independent)
+    results = run_tasks(plan_tasks(args, paths), mode=args.mode, jobs=args.jobs)
+    pd.DataFrame([dict(task=k, **v) for k, v in results.items()]).to_csv(
+        os.path.join(args.outdir, "fetch_timings.csv"), index=False)
+    if results["schedule"]["status"] != "ok":
+        sys.exit(f"Schedule fetch failed ({results['schedule']['error']}); cannot build weekly inputs")
 
     # Load all the data
-    sched = pd.read_csv(schedule_csv)
-    odds = pd.read_csv(odds_csv)
-    wx = pd.read_csv(weather_csv)
-    proe = pd.read_csv(proe_csv)
-    conc = pd.read_csv(conc_csv)
-    roles = pd.read_csv(roles_csv)
+    sched = pd.read_csv(paths["schedule"])
+    odds = read_output(paths["odds"], results["odds"])
+    wx = read_output(paths["weather"], results["weather"])
+    proe = read_output(paths["proe_pace"], results["proe_pace"])
+    conc = read_output(paths["concentration"], results["concentration"])
+    roles = read_output(paths["roles"], results["roles"])
 
     # Start with schedule and merge weather
-    df = sched.merge(wx[["game_id","venue_roof","wind_mph"]], on="game_id", how="left")
+    if not wx.empty:
+        df = sched.merge(wx[["game_id","venue_roof","wind_mph"]], on="game_id", how="left")
+    else:
+        df = sched.copy()
     
     # Merge odds data by team abbreviations
     if not odds.empty:
@@ -102,58 +200,48 @@ if __name__=="__main__":
         df["spread_home"] = None
 
     # Merge PROE and pace data
-    proe_home = proe.rename(columns={
-        "team": "home_team",
-        "proe": "proe_home",
-        "sec_per_play_neutral": "sec_per_play_home"
-    })
-    proe_away = proe.rename(columns={
-        "team": "away_team", 
-        "proe": "proe_away",
-        "sec_per_play_neutral": "sec_per_play_away"
-    })
-    
-    df = df.merge(proe_home[["home_team","proe_home","sec_per_play_home"]], on="home_team", how="left")
-    df = df.merge(proe_away[["away_team","proe_away","sec_per_play_away"]], on="away_team", how="left")
+    if not proe.empty:
+        proe_home = proe.rename(columns={
+            "team": "home_team",
+            "proe": "proe_home",
+            "sec_per_play_neutral": "sec_per_play_home"
+        })
+        proe_away = proe.rename(columns={
+            "team": "away_team", 
+            "proe": "proe_away",
+            "sec_per_play_neutral": "sec_per_play_away"
+        })
     
-    # Calculate pace ranks
-    pace_df = proe[["team","sec_per_play_neutral"]].copy()
-    pace_df["pace_rank"] = pace_df["sec_per_play_neutral"].rank(method="min")
+        df = df.merge(proe_home[["home_team","proe_home","sec_per_play_home"]], on="home_team", how="left")
+        df = df.merge(proe_away[["away_team","proe_away","sec_per_play_away"]], on="away_team", how="left")
     
-    pace_home = pace_df.rename(columns={"team": "home_team", "pace_rank": "pace_rank_home"})
-    pace_away = pace_df.rename(columns={"team": "away_team", "pace_rank": "pace_rank_away"})
+        # Calculate pace ranks
+        pace_df = proe[["team","sec_per_play_neutral"]].copy()
+        pace_df["pace_rank"] = pace_df["sec_per_play_neutral"].rank(method="min")
     
-    df = df.merge(pace_home[["home_team","pace_rank_home"]], on="home_team", how="left")
-    df = df.merge(pace_away[["away_team","pace_rank_away"]], on="away_team", how="left")
-
-    # Merge concentration data
-    conc_home = conc.rename(columns={
-        "team": "home_team",
-        "top2_tgt_share_avg": "top2_tgt_share_home",
-        "te_route_share": "te_route_share_home", 
-        "rb_route_share": "rb_route_share_home"
-    })
-    conc_away = conc.rename(columns={
-        "team": "away_team",
-        "top2_tgt_share_avg": "top2_tgt_share_away",
-        "te_route_share": "te_route_share_away",
-        "rb_route_share": "rb_route_share_away"
-    })
+        pace_home = pace_df.rename(columns={"team": "home_team", "pace_rank": "pace_rank_home"})
+        pace_away = pace_df.rename(columns={"team": "away_team", "pace_rank": "pace_rank_away"})
     
-    df = df.merge(conc_home[["home_team","top2_tgt_share_home","te_route_share_home","rb_route_share_home"]], on="home_team", how="left")
-    df = df.merge(conc_away[["away_team","top2_tgt_share_away","te_route_share_away","rb_route_share_away"]], on="away_team", how="left")
+        df = df.merge(pace_home[["home_team","pace_rank_home"]], on="home_team", how="left")
+        df = df.merge(pace_away[["away_team","pace_rank_away"]], on="away_team", how="left")
+
+    # Merge concentration data (direct WR1/WR2 shares when compute_concentration had play-by-play)
+    if not conc.empty:
+        conc_cols = ["top2_tgt_share_avg", "wr1_tgt_share", "wr2_tgt_share", "te_route_share", "rb_route_share"]
+        conc = conc[["team"] + [c for c in conc_cols if c in conc.columns]].rename(columns={"top2_tgt_share_avg": "top2_tgt_share"})
+        for side in ["home", "away"]:
+            df = df.merge(conc.add_suffix(f"_{side}").rename(columns={f"team_{side}": f"{side}_team"}), on=f"{side}_team", how="left")
     
-    # Create WR1/WR2 target share columns
+    # Create WR1/WR2 target share columns (split of top-2 share when not measured directly)
     for side in ["home", "away"]:
-        top2 = df[f"top2_tgt_share_{side}"].fillna(0.45)
-        df[f"wr1_tgt_share_{side}"] = (top2 * 0.60).clip(0, 1)
-        df[f"wr2_tgt_share_{side}"] = (top2 * 0.40).clip(0, 1)
+        top2 = df.get(f"top2_tgt_share_{side}", pd.Series(0.45, index=df.index)).fillna(0.45)
+        for col, ratio in [(f"wr1_tgt_share_{side}", 0.60), (f"wr2_tgt_share_{side}", 0.40)]:
+            split = (top2 * ratio).clip(0, 1)
+            df[col] = df[col].fillna(split) if col in df.columns else split
         
         # Fill missing route shares
-        if f"te_route_share_{side}" not in df.columns:
-            df[f"te_route_share_{side}"] = 0.18
-        if f"rb_route_share_{side}" not in df.columns:
-            df[f"rb_route_share_{side}"] = 0.16
+        for col, default in [(f"te_route_share_{side}", 0.18), (f"rb_route_share_{side}", 0.16)]:
+            df[col] = df[col].fillna(default) if col in df.columns else default
 
     # Add ownership penalty placeholder
     df["stack_cum_own_est"] = 0.0
@@ -1,7 +1,10 @@
 
-import argparse, pandas as pd, numpy as np
+import argparse, os, pandas as pd, numpy as np
+from pbp_stream import iter_games, read_chunks, expand_paths, WeeklyPartials, window_partials, DEFAULT_CACHE_DIR
 
-# Create comprehensive concentration data for all teams
+PARTIALS_VERSION = 1  # bump when week_partials changes so cached weeks are recomputed
+
+# Fallback concentration for all teams, used when no play-by-play file is given
 # This represents the target share concentration for WR1/WR2 and route participation for TE/RB
 TEAM_CONCENTRATION_2025 = {
     "ARI": {"top2_tgt_share": 0.52, "te_route": 0.18, "rb_route": 0.15},
@@ -38,12 +41,10 @@ TEAM_CONCENTRATION_2025 = {
     "WAS": {"top2_tgt_share": 0.44, "te_route": 0.26, "rb_route": 0.20}
 }
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--season", type=int, required=True)
-    ap.add_argument("--out", required=True)
-    args = ap.parse_args()
-    
+PBP_COLUMNS = ["season", "week", "play_id", "posteam", "pass", "qb_dropback", "receiver_player_id", "receiver_player_name"]
+ROUTE_POS = ("WR", "TE", "RB", "FB")
+
+def fallback_rows():
     rows = []
     for team, data in TEAM_CONCENTRATION_2025.items():
         # Add some realistic variation
@@ -58,10 +59,139 @@ def main():
             "rb_route_share": max(0.10, min(0.35, data["rb_route"] + rb_variation)),
             "weeks_window": "1-1"  # Week 1 data
         })
+    return pd.DataFrame(rows)
+
+def load_positions(rosters):
+    """player_id -> position from an nflverse roster file (gsis_id or player_id column)"""
+    if not rosters:
+        return {}
+    frames = [c for p in expand_paths(rosters) for c in read_chunks(p, ["gsis_id", "player_id", "position"])]
+    df = pd.concat(frames, ignore_index=True)
+    ids = df["gsis_id"] if "gsis_id" in df.columns else df["player_id"]
+    return dict(zip(ids, df["position"].replace({"FB": "RB"})))
+
+def load_participation(participation, season, skip_weeks):
+    """(game_id, play_id, offense_players) for the games of `season` outside skip_weeks"""
+    if not participation:
+        return None
+    frames = []
+    for p in expand_paths(participation):
+        for c in read_chunks(p, ["nflverse_game_id", "game_id", "play_id", "offense_players"]):
+            c = c.rename(columns={"nflverse_game_id": "game_id"})
+            gid = c["game_id"].astype(str)
+            c = c[(gid.str[:4] == str(season)) & ~gid.str[5:7].astype(int).isin(skip_weeks)]
+            frames.append(c[["game_id", "play_id", "offense_players"]])
+    return pd.concat(frames, ignore_index=True)
+
+def week_partials(pbp, positions, part=None):
+    """Per season/week/team/player targets, and routes (dropbacks on the field) when participation is given"""
+    keys = ["season", "week", "team", "player_id"]
+    tg = pbp[(pbp["pass"] == 1) & pbp["receiver_player_id"].notna()]
+    targets = (tg.rename(columns={"posteam": "team", "receiver_player_id": "player_id", "receiver_player_name": "name"})
+                 .groupby(keys, as_index=False).agg(targets=("play_id", "size"), name=("name", "last")))
+    if part is None:
+        targets["routes"] = 0
+        return targets
+    db = pbp[pbp["qb_dropback"] == 1][["game_id", "play_id", "season", "week", "posteam"]].merge(part, on=["game_id", "play_id"])
+    on_field = db.assign(player_id=db["offense_players"].str.split(";")).explode("player_id")
+    on_field = on_field[on_field["player_id"].map(positions).isin(ROUTE_POS)]
+    routes = on_field.rename(columns={"posteam": "team"}).groupby(keys).size().rename("routes").reset_index()
+    out = targets.merge(routes, on=keys, how="outer")
+    out["targets"] = out["targets"].fillna(0).astype(int)
+    out["routes"] = out["routes"].fillna(0).astype(int)
+    return out
+
+def update_partials(season, pbp, positions, participation=None, cache_dir=DEFAULT_CACHE_DIR, chunksize=250_000, rosters=None):
+    """
+    Aggregate only the uncached weeks of `season` (newest week is not persisted); returns (cache, new partials).
+    `rosters` is the file `positions` came from, part of the cache fingerprint.
+    """
+    cache = WeeklyPartials("concentration_routes" if participation else "concentration", cache_dir,
+                           sources=[pbp, participation, rosters], version=PARTIALS_VERSION)
+    cached = cache.cached_weeks(season)
+    part = load_participation(participation, season, cached)
+    keep = lambda c: (c["season"] == season) & ~c["week"].isin(cached)
+    chunks = [week_partials(g, positions, part) for g in iter_games(pbp, PBP_COLUMNS, chunksize, keep)]
+    new = pd.DataFrame()
+    if chunks:
+        new = (pd.concat(chunks).groupby(["season", "week", "team", "player_id"], as_index=False)
+                 .agg(targets=("targets", "sum"), routes=("routes", "sum"), name=("name", "last")))
+        cache.save(new, skip_weeks={new["week"].max()})
+    print(f"Concentration: {len(cached)} cached weeks, processed weeks {sorted(new['week'].unique()) if len(new) else []}")
+    return cache, new
+
+def player_shares(partials, positions):
+    """Window totals per player with target share and share of team routes"""
+    p = partials.groupby(["team", "player_id"], as_index=False).agg(
+        targets=("targets", "sum"), routes=("routes", "sum"), name=("name", "last"))
+    p["position"] = p["player_id"].map(positions).fillna("UNK")
+    team = p.groupby("team")[["targets", "routes"]].transform("sum")
+    p["tgt_share"] = (p["targets"]/team["targets"]).fillna(0).round(4)
+    p["route_share"] = (p["routes"]/team["routes"].replace(0, np.nan)).fillna(0).round(4)
+    return p.sort_values(["team", "tgt_share"], ascending=[True, False]).reset_index(drop=True)
+
+def team_concentration(players, has_routes):
+    """
+    WR1/WR2 target share and top TE/RB target share per team, plus top TE/RB route share with
+    participation (NaN without it, so loaders keep their fallback split)
+    """
+    def nth(pos, col, n):
+        sub = players[players["position"].isin(pos)] if pos else players
+        sub = sub.sort_values(col, ascending=False)
+        sub = sub[sub.groupby("team").cumcount() == n]
+        return sub.set_index("team")[col].reindex(teams)
+    teams = sorted(players["team"].unique())
+    wr = ("WR",) if (players["position"] != "UNK").any() else None
+    df = pd.DataFrame({"team": teams})
+    df["wr1_tgt_share"] = nth(wr, "tgt_share", 0).fillna(0).values
+    df["wr2_tgt_share"] = nth(wr, "tgt_share", 1).fillna(0).values
+    df["top2_tgt_share_avg"] = (df["wr1_tgt_share"] + df["wr2_tgt_share"]).round(4)
+    df["te_tgt_share"] = nth(("TE",), "tgt_share", 0).values
+    df["rb_tgt_share"] = nth(("RB",), "tgt_share", 0).values
+    df["te_route_share"] = nth(("TE",), "route_share", 0).values if has_routes else np.nan
+    df["rb_route_share"] = nth(("RB",), "route_share", 0).values if has_routes else np.nan
+    return df
+
+def compute_concentration(season, out, pbp=None, week=None, weeks_back=4, rosters=None, participation=None,
+                          cache_dir=DEFAULT_CACHE_DIR, chunksize=250_000):
+    """
+    Write team target/route concentration to `out` and return it. From `pbp` over the `weeks_back` weeks
+    before `week` (0 = season to date), with per-player shares in <out>_players.csv; hardcoded without it.
+    Positions come from `rosters`; routes (WR/TE/RB on the field for a dropback) need `participation`.
+    """
+    if pbp is None:
+        df = fallback_rows()
+    else:
+        positions = load_positions(rosters)
+        cache, new = update_partials(season, pbp, positions, participation, cache_dir, chunksize, rosters)
+        parts, weeks = window_partials(cache, new, season, week, weeks_back)
+        if parts.empty:
+            raise RuntimeError(f"No play-by-play for season {season} in the requested window")
+        players = player_shares(parts, positions)
+        df = team_concentration(players, has_routes=players["routes"].sum() > 0)
+        df["weeks_window"] = f"{min(weeks)}-{max(weeks)}"
+        players_out = os.path.splitext(out)[0] + "_players.csv"
+        players.to_csv(players_out, index=False)
+        print(f"Wrote {len(players)} player shares to {players_out}")
     
-    df = pd.DataFrame(rows)
-    df.to_csv(args.out, index=False)
-    print(f"Wrote concentration data for {len(df)} teams to {args.out}")
+    df.to_csv(out, index=False)
+    print(f"Wrote concentration data for {len(df)} teams to {out}")
+    return df
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season", type=int, required=True)
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--pbp", nargs="+", default=None, help="Play-by-play CSV/Parquet file(s) or globs")
+    ap.add_argument("--week", type=int, default=None, help="Use games before this week")
+    ap.add_argument("--weeks_back", type=int, default=4, help="Rolling window in weeks (0 = season to date)")
+    ap.add_argument("--rosters", nargs="+", default=None, help="Roster file(s) with gsis_id/player_id and position")
+    ap.add_argument("--participation", nargs="+", default=None, help="Participation file(s) with offense_players")
+    ap.add_argument("--cache_dir", default=DEFAULT_CACHE_DIR, help="Per-week aggregate cache")
+    ap.add_argument("--chunksize", type=int, default=250_000)
+    args = ap.parse_args()
+    compute_concentration(args.season, args.out, args.pbp, args.week, args.weeks_back, args.rosters,
+                          args.participation, args.cache_dir, args.chunksize)
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,10 @@
 
 import argparse, pandas as pd, numpy as np
+from pbp_stream import iter_games, WeeklyPartials, window_partials, DEFAULT_CACHE_DIR
 
-# Create comprehensive PROE and pace data for all teams
-# This is simplified data - in production you'd want actual NFL stats
+PARTIALS_VERSION = 1  # bump when week_partials changes so cached weeks are recomputed
+
+# Fallback PROE and pace for all teams, used when no play-by-play file is given
 TEAM_DATA_2025 = {
     "ARI": {"proe": -2.5, "sec_per_play": 65.0},
     "ATL": {"proe": -1.8, "sec_per_play": 68.0},
@@ -38,12 +40,11 @@ TEAM_DATA_2025 = {
     "WAS": {"proe": -1.9, "sec_per_play": 69.0}
 }
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--season", type=int, required=True)
-    ap.add_argument("--out", required=True)
-    args = ap.parse_args()
-    
+PBP_COLUMNS = ["season", "week", "play_id", "posteam", "play_type", "pass", "xpass", "wp", "down", "qtr",
+               "half_seconds_remaining", "game_seconds_remaining", "drive"]
+SUM_COLUMNS = ["plays", "pass_all", "n_neutral", "pass_sum", "xpass_sum", "sec_sum", "sec_n"]
+
+def fallback_rows():
     rows = []
     for team, data in TEAM_DATA_2025.items():
         # Add some realistic variation
@@ -58,10 +59,81 @@ def main():
             "sec_per_play_neutral": data["sec_per_play"] + pace_variation,
             "weeks_window": "1-1"  # Week 1 data
         })
+    return pd.DataFrame(rows)
+
+def week_partials(pbp):
+    """Per season/week/team sums for PROE and neutral pace from a chunk of whole games"""
+    df = pbp[pbp["posteam"].notna() & pbp["play_type"].isin(["pass", "run"])].sort_values(["game_id", "play_id"])
+    nxt = df.shift(-1)
+    same_drive = (nxt["game_id"] == df["game_id"]) & (nxt["posteam"] == df["posteam"]) & (nxt["drive"] == df["drive"])
+    secs = (df["game_seconds_remaining"] - nxt["game_seconds_remaining"]).where(same_drive)
+    secs = secs.where(secs.between(1, 60))  # drops timeouts, reviews and quarter breaks
+    neutral = (df["wp"].between(0.2, 0.8) & df["down"].isin([1, 2, 3]) & (df["qtr"] <= 4)
+               & (df["half_seconds_remaining"] > 120))
+    pr = neutral & df["xpass"].notna()
+    parts = pd.DataFrame({
+        "season": df["season"], "week": df["week"], "team": df["posteam"],
+        "plays": 1, "pass_all": df["pass"].fillna(0),
+        "n_neutral": pr.astype(int), "pass_sum": df["pass"].fillna(0).where(pr, 0), "xpass_sum": df["xpass"].where(pr, 0),
+        "sec_sum": secs.where(neutral, 0).fillna(0), "sec_n": (secs.notna() & neutral).astype(int),
+    })
+    out = parts.groupby(["season", "week", "team"], as_index=False)[SUM_COLUMNS].sum()
+    games = df.groupby(["season", "week", "posteam"])["game_id"].nunique().rename("games").reset_index()
+    return out.merge(games.rename(columns={"posteam": "team"}), on=["season", "week", "team"])
+
+def update_partials(season, pbp, cache_dir=DEFAULT_CACHE_DIR, chunksize=250_000):
+    """
+    Stream `pbp`, aggregating only weeks of `season` not already cached. The newest week found is
+    returned but not persisted, since its games may still be in progress. Returns (cache, new partials).
+    """
+    cache = WeeklyPartials("proe_pace", cache_dir, sources=[pbp], version=PARTIALS_VERSION)
+    cached = cache.cached_weeks(season)
+    keep = lambda c: (c["season"] == season) & ~c["week"].isin(cached)
+    chunks = [week_partials(g) for g in iter_games(pbp, PBP_COLUMNS, chunksize, keep)]
+    new = pd.DataFrame()
+    if chunks:
+        new = pd.concat(chunks).groupby(["season", "week", "team"], as_index=False)[SUM_COLUMNS + ["games"]].sum()
+        cache.save(new, skip_weeks={new["week"].max()})
+    print(f"PROE/pace: {len(cached)} cached weeks, processed weeks {sorted(new['week'].unique()) if len(new) else []}")
+    return cache, new
+
+def compute_proe_pace(season, out, pbp=None, week=None, weeks_back=4, cache_dir=DEFAULT_CACHE_DIR, chunksize=250_000):
+    """
+    Write team PROE / neutral pace to `out` and return it. From `pbp` (CSV/Parquet path or glob),
+    over the `weeks_back` weeks before `week` (0 = season to date); hardcoded values without it.
+    """
+    if pbp is None:
+        df = fallback_rows()
+    else:
+        cache, new = update_partials(season, pbp, cache_dir, chunksize)
+        tot, weeks = window_partials(cache, new, season, week, weeks_back)
+        if tot.empty:
+            raise RuntimeError(f"No play-by-play for season {season} in the requested window")
+        tot = tot.groupby("team")[SUM_COLUMNS + ["games"]].sum()
+        df = pd.DataFrame({
+            "team": tot.index,
+            "plays": (tot["plays"]/tot["games"]).round(1),
+            "proe": (100*(tot["pass_sum"] - tot["xpass_sum"])/tot["n_neutral"]).round(2),
+            "pass_rate": (tot["pass_all"]/tot["plays"]).round(3),
+            "sec_per_play_neutral": (tot["sec_sum"]/tot["sec_n"]).round(2),
+            "weeks_window": f"{min(weeks)}-{max(weeks)}",
+        })
     
-    df = pd.DataFrame(rows)
-    df.to_csv(args.out, index=False)
-    print(f"Wrote PROE and pace data for {len(df)} teams to {args.out}")
+    df.to_csv(out, index=False)
+    print(f"Wrote PROE and pace data for {len(df)} teams to {out}")
+    return df
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season", type=int, required=True)
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--pbp", nargs="+", default=None, help="Play-by-play CSV/Parquet file(s) or globs")
+    ap.add_argument("--week", type=int, default=None, help="Use games before this week")
+    ap.add_argument("--weeks_back", type=int, default=4, help="Rolling window in weeks (0 = season to date)")
+    ap.add_argument("--cache_dir", default=DEFAULT_CACHE_DIR, help="Per-week aggregate cache")
+    ap.add_argument("--chunksize", type=int, default=250_000)
+    args = ap.parse_args()
+    compute_proe_pace(args.season, args.out, args.pbp, args.week, args.weeks_back, args.cache_dir, args.chunksize)
 
 if __name__ == "__main__":
     main()
@@ -38,11 +38,8 @@ DEPTH_CHART_2025 = {
     "WAS": {"QB1": "Jayden Daniels", "RB1": "Austin Ekeler", "WR1": "Terry McLaurin", "WR2": "Jahan Dotson", "TE1": "Zach Ertz"}
 }
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--out", required=True)
-    args = ap.parse_args()
-    
+def fetch_depth_charts(out):
+    """Write QB1/RB1/WR1/WR2/TE1 roles per team to `out` and return them"""
     rows = []
     for team, roles in DEPTH_CHART_2025.items():
         row = {"team": team}
@@ -50,8 +47,15 @@ def main():
         rows.append(row)
     
     df = pd.DataFrame(rows)
-    df.to_csv(args.out, index=False)
-    print(f"Wrote depth chart roles for {len(df)} teams to {args.out}")
+    df.to_csv(out, index=False)
+    print(f"Wrote depth chart roles for {len(df)} teams to {out}")
+    return df
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    args = ap.parse_args()
+    fetch_depth_charts(args.out)
 
 if __name__ == "__main__":
     main()
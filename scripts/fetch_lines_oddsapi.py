@@ -1,5 +1,9 @@
 
 import requests, pandas as pd, argparse, os
+from datetime import datetime, timezone
+from http_client import get_client, add_http_args, configure, CacheMiss
+import line_history
+from line_history import consensus
 
 # Updated team name mapping for 2025 season
 TEAM_NAME_TO_ABBR = {
@@ -37,7 +41,7 @@ TEAM_NAME_TO_ABBR = {
     "Washington Commanders": "WAS"
 }
 
-def fetch_odds(api_key, sport="americanfootball_nfl"):
+def fetch_odds(api_key, sport="americanfootball_nfl", client=None):
     url = f"https://api.the-odds-api.com/v4/sports/{sport}/odds"
     params = {
         "apiKey": api_key,
@@ -47,61 +51,51 @@ def fetch_odds(api_key, sport="americanfootball_nfl"):
     }
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return (client or get_client()).get_json(url, params=params)
+    except (requests.exceptions.RequestException, CacheMiss) as e:
         print(f"Error fetching odds: {e}")
         return []
 
-def parse_odds_data(odds_data):
-    rows = []
-    for game in odds_data:
-        home_team = game.get("home_team", "")
-        away_team = game.get("away_team", "")
-        
-        # Get spreads and totals
-        spreads = [book for book in game.get("bookmakers", []) if book.get("key") == "draftkings"]
-        totals = [book for book in game.get("bookmakers", []) if book.get("key") == "draftkings"]
-        
-        spread_home = None
-        ou = None
-        
-        if spreads:
-            spread_markets = [m for m in spreads[0].get("markets", []) if m.get("key") == "spreads"]
-            if spread_markets:
-                spread_home = spread_markets[0].get("outcomes", [{}])[0].get("point", None)
-        
-        if totals:
-            total_markets = [m for m in totals[0].get("markets", []) if m.get("key") == "totals"]
-            if total_markets:
-                ou = total_markets[0].get("outcomes", [{}])[0].get("point", None)
-        
-        rows.append({
-            "home_team_name": home_team,
-            "away_team_name": away_team,
-            "ou_consensus": ou,
-            "spread_home_consensus": spread_home
-        })
-    
-    return pd.DataFrame(rows)
+ODDS_COLUMNS = ["event_id", "commence_time", "home_team_name", "away_team_name", "book", "market",
+                "outcome", "point", "price", "last_update"]
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--out", required=True)
-    ap.add_argument("--api_key", default=os.getenv("ODDS_API_KEY"))
-    args = ap.parse_args()
-    
-    if not args.api_key:
-        print("Error: No API key provided. Set ODDS_API_KEY environment variable or use --api_key")
-        return
+def flatten_odds(odds_data):
+    """Every book/market/outcome as one row of a long table (one pass over the JSON)"""
+    rows = [
+        (g.get("id") or f"{g.get('away_team')}@{g.get('home_team')} {g.get('commence_time')}", g.get("commence_time"), g.get("home_team", ""), g.get("away_team", ""),
+         b.get("key"), m.get("key"), o.get("name"), o.get("point"), o.get("price"), m.get("last_update", b.get("last_update")))
+        for g in odds_data
+        for b in g.get("bookmakers", [])
+        for m in b.get("markets", [])
+        for o in m.get("outcomes", [])
+    ]
+    df = pd.DataFrame(rows, columns=ODDS_COLUMNS)
+    df["point"] = pd.to_numeric(df["point"], errors="coerce").astype("float32")
+    df["price"] = pd.to_numeric(df["price"], errors="coerce").astype("float32")
+    return df
+
+def parse_odds_data(odds_data, method="median"):
+    """Consensus total/home spread per game across every book"""
+    return consensus(flatten_odds(odds_data), method)
+
+def fetch_lines(out, api_key=None, season=None, week=None, method="median", history_dir=line_history.DEFAULT_DIR):
+    """
+    Write consensus lines to `out` and return them; raises RuntimeError if nothing can be fetched.
+    With season/week, the raw pull is appended to the line-history store and open/move columns are added.
+    """
+    if not api_key and get_client().mode != "replay":
+        raise RuntimeError("No API key provided. Set ODDS_API_KEY environment variable or use --api_key")
     
-    odds_data = fetch_odds(args.api_key)
+    odds_data = fetch_odds(api_key)
     if len(odds_data) == 0:  # Fixed: check length instead of truthiness
-        print("No odds data received")
-        return
+        raise RuntimeError("No odds data received")
     
-    df = parse_odds_data(odds_data)
+    long_df = flatten_odds(odds_data)
+    df = consensus(long_df, method)
+    if season is not None and week is not None and history_dir:
+        pulled_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        line_history.append(long_df, season, week, pulled_at, history_dir)
+        df = df.merge(line_history.movement(season, week, history_dir, method), on="event_id", how="left")
     
     # Add team abbreviations
     df["home_abbr"] = df["home_team_name"].map(TEAM_NAME_TO_ABBR)
@@ -110,8 +104,25 @@ def main():
     # Filter to only include teams we have data for
     df = df.dropna(subset=["home_abbr", "away_abbr"])
     
-    df.to_csv(args.out, index=False)
-    print(f"Wrote {len(df)} games to {args.out}")
+    df.to_csv(out, index=False)
+    print(f"Wrote {len(df)} games to {out}")
+    return df
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--api_key", default=os.getenv("ODDS_API_KEY"))
+    ap.add_argument("--season", type=int, default=None)
+    ap.add_argument("--week", type=int, default=None)
+    ap.add_argument("--consensus", choices=["median", "vig"], default="median")
+    ap.add_argument("--history_dir", default=line_history.DEFAULT_DIR, help="Line-history store (needs --season/--week)")
+    add_http_args(ap)
+    args = ap.parse_args()
+    configure(args)
+    try:
+        fetch_lines(args.out, args.api_key, args.season, args.week, args.consensus, args.history_dir)
+    except RuntimeError as e:
+        raise SystemExit(f"Error: {e}")
 
 if __name__ == "__main__":
     main()
@@ -16,22 +16,26 @@ WEEK1_2025_SCHEDULE = [
     {"game_id": "2025_01_TEN_DEN", "away_team": "TEN", "home_team": "DEN", "start_time": "2025-09-07 16:05", "venue": "Empower Field at Mile High"}
 ]
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--season", type=int, required=True)
-    ap.add_argument("--week", type=int, required=True)
-    ap.add_argument("--out", required=True)
-    args = ap.parse_args()
-    
+def fetch_schedule(season, week, out):
+    """Write the week's schedule to `out` and return it"""
     # For now, just use the hardcoded schedule for 2025 Week 1
-    if args.season == 2025 and args.week == 1:
+    if season == 2025 and week == 1:
         df = pd.DataFrame(WEEK1_2025_SCHEDULE)
     else:
         # Fallback to empty schedule for other weeks
         df = pd.DataFrame(columns=["game_id", "away_team", "home_team", "start_time", "venue"])
     
-    df.to_csv(args.out, index=False)
-    print(f"Wrote {len(df)} games to {args.out}")
+    df.to_csv(out, index=False)
+    print(f"Wrote {len(df)} games to {out}")
+    return df
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season", type=int, required=True)
+    ap.add_argument("--week", type=int, required=True)
+    ap.add_argument("--out", required=True)
+    args = ap.parse_args()
+    fetch_schedule(args.season, args.week, args.out)
 
 if __name__ == "__main__":
     main()
@@ -1,63 +1,135 @@
-import argparse, pandas as pd, json
-
-# Create realistic weather data for 2025 Week 1
-# This is simplified - in production you'd want actual weather API calls
-WEATHER_DATA_2025_WEEK1 = {
-    "2025_01_CIN_CLE": {"venue_roof": "outdoor", "wind_mph": 8.5, "gust_mph": 12.0, "precip_mm": 0.0, "cloudcover_pct": 25},
-    "2025_01_TB_ATL": {"venue_roof": "retractable", "wind_mph": 5.2, "gust_mph": 8.0, "precip_mm": 0.0, "cloudcover_pct": 15},
-    "2025_01_DET_GB": {"venue_roof": "outdoor", "wind_mph": 12.8, "gust_mph": 18.5, "precip_mm": 0.0, "cloudcover_pct": 40},
-    "2025_01_HOU_LAR": {"venue_roof": "fixed", "wind_mph": 3.1, "gust_mph": 5.5, "precip_mm": 0.0, "cloudcover_pct": 10},
-    "2025_01_SF_SEA": {"venue_roof": "outdoor", "wind_mph": 7.3, "gust_mph": 11.2, "precip_mm": 0.0, "cloudcover_pct": 35},
-    "2025_01_LV_NE": {"venue_roof": "outdoor", "wind_mph": 9.7, "gust_mph": 14.8, "precip_mm": 0.0, "cloudcover_pct": 30},
-    "2025_01_NYG_WAS": {"venue_roof": "outdoor", "wind_mph": 6.4, "gust_mph": 9.1, "precip_mm": 0.0, "cloudcover_pct": 20},
-    "2025_01_MIA_IND": {"venue_roof": "retractable", "wind_mph": 4.2, "gust_mph": 6.8, "precip_mm": 0.0, "cloudcover_pct": 15},
-    "2025_01_CAR_JAX": {"venue_roof": "outdoor", "wind_mph": 5.8, "gust_mph": 8.9, "precip_mm": 0.0, "cloudcover_pct": 25},
-    "2025_01_ARI_NO": {"venue_roof": "dome", "wind_mph": 0.0, "gust_mph": 0.0, "precip_mm": 0.0, "cloudcover_pct": 0},
-    "2025_01_PIT_NYJ": {"venue_roof": "outdoor", "wind_mph": 11.2, "gust_mph": 16.5, "precip_mm": 0.0, "cloudcover_pct": 45},
-    "2025_01_TEN_DEN": {"venue_roof": "outdoor", "wind_mph": 8.9, "gust_mph": 13.2, "precip_mm": 0.0, "cloudcover_pct": 30}
-}
+import argparse, pandas as pd, numpy as np, json, os, time, hashlib
+from datetime import date, timedelta
+from http_client import get_client, add_http_args, configure
+
+# Kickoff-hour weather per outdoor/retractable stadium from Open-Meteo (no API key).
+# One multi-coordinate request per game date, and every hourly value it returns is cached
+# by (lat, lon, hour), so reruns and other kickoffs that day are free.
+here = os.path.dirname(__file__)
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+HOURLY = ["wind_speed_10m", "wind_gusts_10m", "precipitation", "cloud_cover"]
+TZ = "America/New_York"  # schedule start times are Eastern
+ROOFED = {"dome", "fixed"}
+DEFAULT_CACHE = os.path.join(os.path.dirname(here), "out", "weather_cache.json")
+CACHE_TTL = 3*3600  # forecasts move, so cached hours expire
+
+def geo_key(lat, lon, hour):
+    return f"{lat:.4f},{lon:.4f},{hour}"
+
+def load_cache(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_cache(cache, path):
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(cache, f)
+    os.replace(path + ".tmp", path)
+
+def stub_response(coords, day):
+    """Open-Meteo-shaped hourly payload generated locally (deterministic per coordinate/day)"""
+    out = []
+    for lat, lon in coords:
+        seed = int(hashlib.sha1(f"{lat:.4f},{lon:.4f},{day}".encode()).hexdigest()[:8], 16)
+        rng = np.random.default_rng(seed)
+        wind = rng.gamma(2.0, 3.5) + 2.0*np.sin(np.arange(24)/24*2*np.pi)
+        out.append({"latitude": lat, "longitude": lon, "hourly": {
+            "time": [f"{day}T{h:02d}:00" for h in range(24)],
+            "wind_speed_10m": np.round(np.clip(wind, 0, None), 1).tolist(),
+            "wind_gusts_10m": np.round(np.clip(wind*1.5, 0, None), 1).tolist(),
+            "precipitation": np.round(rng.exponential(0.2, 24)*(rng.random(24) < 0.15), 1).tolist(),
+            "cloud_cover": rng.integers(0, 101, 24).tolist(),
+        }})
+    return out
+
+def fetch_day(coords, day, stub=False, client=None):
+    """One batched request for every (lat, lon) on `day`; returns a list of per-location payloads"""
+    if stub:
+        return stub_response(coords, day)
+    url = ARCHIVE_URL if date.fromisoformat(day) < date.today() - timedelta(days=5) else FORECAST_URL
+    params = {
+        "latitude": ",".join(f"{lat:.4f}" for lat, _ in coords),
+        "longitude": ",".join(f"{lon:.4f}" for _, lon in coords),
+        "hourly": ",".join(HOURLY),
+        "wind_speed_unit": "mph",
+        "timezone": TZ,
+        "start_date": day,
+        "end_date": day,
+    }
+    data = (client or get_client()).get_json(url, params=params, ttl=CACHE_TTL)
+    return data if isinstance(data, list) else [data]  # single location comes back as an object
+
+def fetch_weather(schedule, stadiums, out, stub=False, cache_path=DEFAULT_CACHE):
+    """Write per-game kickoff weather for the games in the `schedule` CSV to `out` and return it"""
+    schedule_df = pd.read_csv(schedule)
+    with open(stadiums) as f:
+        venues = {s["team"]: s for s in json.load(f)}
+
+    games = schedule_df.copy()
+    kick = pd.to_datetime(games["start_time"], errors="coerce")
+    games["hour"] = kick.dt.strftime("%Y-%m-%dT%H:00")
+    games["day"] = kick.dt.strftime("%Y-%m-%d")
+    games["lat"] = games["home_team"].map(lambda t: venues.get(t, {}).get("lat"))
+    games["lon"] = games["home_team"].map(lambda t: venues.get(t, {}).get("lon"))
+    games["venue_roof"] = games["home_team"].map(lambda t: venues.get(t, {}).get("roof", "outdoor"))
+    need = games[~games["venue_roof"].isin(ROOFED) & games["lat"].notna() & games["hour"].notna()]
+
+    if stub and cache_path:
+        cache_path = cache_path.replace(".json", "_stub.json")  # keep generated values out of the real cache
+    cache = load_cache(cache_path)
+    now = time.time()
+    def fresh(key):
+        e = cache.get(key)
+        return e is not None and now - e["fetched_at"] < CACHE_TTL
+
+    misses = need[np.array([not fresh(geo_key(r.lat, r.lon, r.hour)) for r in need.itertuples()], dtype=bool)]
+    for day, grp in misses.groupby("day"):
+        coords = list(dict.fromkeys(zip(grp["lat"], grp["lon"])))
+        for (lat, lon), loc in zip(coords, fetch_day(coords, day, stub)):
+            h = loc["hourly"]
+            for i, t in enumerate(h["time"]):
+                cache[geo_key(lat, lon, t)] = {"hour": t, "fetched_at": now,
+                                               **{v: h[v][i] for v in HOURLY}}
+    save_cache(cache, cache_path)
+    print(f"Weather: {len(need)} open-air games, {len(misses)} fetched "
+          f"({misses['day'].nunique()} batched request(s){', stub' if stub else ''}), {len(need) - len(misses)} cached")
+
+    rows = []
+    for g in games.itertuples():
+        w = cache.get(geo_key(g.lat, g.lon, g.hour), {}) if g.Index in need.index else {}
+        rows.append({
+            "game_id": g.game_id,
+            "home_team": g.home_team,
+            "away_team": g.away_team,
+            "venue_roof": g.venue_roof,
+            "wind_mph": w.get("wind_speed_10m") or 0.0,
+            "gust_mph": w.get("wind_gusts_10m") or 0.0,
+            "precip_mm": w.get("precipitation") or 0.0,
+            "cloudcover_pct": w.get("cloud_cover") or 0,
+        })
+
+    df = pd.DataFrame(rows, columns=["game_id", "home_team", "away_team", "venue_roof", "wind_mph",
+                                     "gust_mph", "precip_mm", "cloudcover_pct"])
+    df.to_csv(out, index=False)
+    print(f"Wrote weather data for {len(df)} games to {out}")
+    return df
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--schedule", required=True)
     ap.add_argument("--stadiums", required=True)
     ap.add_argument("--out", required=True)
+    ap.add_argument("--stub", action="store_true", help="Generate weather locally instead of calling Open-Meteo")
+    ap.add_argument("--cache", default=DEFAULT_CACHE, help="(lat, lon, hour) weather cache file")
+    add_http_args(ap)
     args = ap.parse_args()
-    
-    # Read schedule to get game IDs
-    schedule_df = pd.read_csv(args.schedule)
-    
-    rows = []
-    for _, game in schedule_df.iterrows():
-        game_id = game["game_id"]
-        if game_id in WEATHER_DATA_2025_WEEK1:
-            weather = WEATHER_DATA_2025_WEEK1[game_id]
-            rows.append({
-                "game_id": game_id,
-                "home_team": game["home_team"],
-                "away_team": game["away_team"],
-                "venue_roof": weather["venue_roof"],
-                "wind_mph": weather["wind_mph"],
-                "gust_mph": weather["gust_mph"],
-                "precip_mm": weather["precip_mm"],
-                "cloudcover_pct": weather["cloudcover_pct"]
-            })
-        else:
-            # Fallback for unknown games
-            rows.append({
-                "game_id": game_id,
-                "home_team": game["home_team"],
-                "away_team": game["away_team"],
-                "venue_roof": "outdoor",
-                "wind_mph": 5.0,
-                "gust_mph": 8.0,
-                "precip_mm": 0.0,
-                "cloudcover_pct": 25
-            })
-    
-    df = pd.DataFrame(rows)
-    df.to_csv(args.out, index=False)
-    print(f"Wrote weather data for {len(df)} games to {args.out}")
+    configure(args)
+    fetch_weather(args.schedule, args.stadiums, args.out, args.stub, args.cache)
 
 if __name__ == "__main__":
     main()
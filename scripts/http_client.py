@@ -0,0 +1,252 @@
+"""
+Shared HTTP client for the weekly fetchers.
+
+- one pooled requests.Session per process (thread-safe enough for the fetch pool)
+- on-disk response cache with a TTL; stale entries are revalidated with ETag / If-Modified-Since
+- exponential backoff with jitter on connection errors, 429 and 5xx (honours Retry-After)
+- quota accounting from The Odds API headers (x-requests-remaining / used / last)
+- modes: live (cache + network), refresh (always revalidate), replay (cache only, never the network)
+- base_url override to point every request at a local stub server (see --serve)
+
+Cache keys ignore the host and secret params (apiKey etc.), so a cache recorded live can be replayed
+offline or served by the stub, and keys never land on disk.
+
+    FETCH_MODE=replay python scripts/build_weekly_inputs.py ...
+    python scripts/http_client.py --serve out/http_cache --port 8765
+    FETCH_BASE_URL=http://127.0.0.1:8765 python scripts/fetch_lines_oddsapi.py --out odds.csv --api_key x
+"""
+
+import os, json, time, random, hashlib, threading, argparse
+from email.utils import formatdate
+from urllib.parse import urlsplit, urlunsplit, urlencode, parse_qsl
+import requests
+from requests.adapters import HTTPAdapter
+
+here = os.path.dirname(__file__)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(here), "out", "http_cache")
+MODES = ("live", "refresh", "replay")
+SECRET_PARAMS = {"apikey", "api_key", "key", "token"}
+QUOTA_HEADERS = {"x-requests-remaining": "remaining", "x-requests-used": "used", "x-requests-last": "last"}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class CacheMiss(Exception):
+    """Raised in replay mode when a request has no recorded response"""
+
+class Response:
+    """Minimal response: status, headers, text, plus whether it came from the cache"""
+    def __init__(self, status, headers, text, from_cache=False):
+        self.status_code = status
+        self.headers = headers
+        self.text = text
+        self.from_cache = from_cache
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+def cache_key(url, params=None):
+    """Host-independent key over path + non-secret query params"""
+    parts = urlsplit(url)
+    q = parse_qsl(parts.query) + sorted((params or {}).items())
+    q = sorted((k, str(v)) for k, v in q if k.lower() not in SECRET_PARAMS)
+    return hashlib.sha1(f"{parts.path}?{urlencode(q)}".encode()).hexdigest()
+
+class FetchClient:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=900, mode="live", base_url=None, retries=4,
+                 backoff=0.5, max_backoff=30.0, timeout=20.0, pool_size=16, quota_warn=50):
+        if mode not in MODES:
+            raise ValueError(f"unknown fetch mode: {mode}")
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.mode = mode
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.quota_warn = quota_warn
+        self.quota = {}
+        self.stats = {"network": 0, "cache_hit": 0, "revalidated": 0, "retries": 0}
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "nfl_8020-fetch/1.0"
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # ---- cache ----
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self, key):
+        if not self.cache_dir or not os.path.exists(self._path(key)):
+            return None
+        with open(self._path(key)) as f:
+            return json.load(f)
+
+    def _store(self, key, url, resp_headers, status, text):
+        if not self.cache_dir:
+            return
+        keep = {k.lower(): v for k, v in resp_headers.items() if k.lower() in ("etag", "last-modified", "content-type")}
+        entry = {"url": url.split("?")[0], "status": status, "headers": keep, "text": text, "fetched_at": time.time()}
+        tmp = self._path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._path(key))
+
+    def _touch(self, key, entry):
+        entry["fetched_at"] = time.time()
+        self._store(key, entry["url"], entry["headers"], entry["status"], entry["text"])
+
+    # ---- network ----
+    def _rewrite(self, url):
+        if not self.base_url:
+            return url
+        parts = urlsplit(url)
+        base = urlsplit(self.base_url)
+        return urlunsplit((base.scheme, base.netloc, base.path + parts.path, parts.query, ""))
+
+    def _track_quota(self, headers):
+        q = {name: headers[h] for h, name in QUOTA_HEADERS.items() if h in headers}
+        if not q:
+            return
+        # one writer at a time, and readers only ever see a complete file
+        with self._lock:
+            self.quota.update(q)
+            if self.cache_dir:
+                path = os.path.join(self.cache_dir, "quota.json")
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(dict(self.quota, checked_at=time.time()), f)
+                os.replace(tmp, path)
+        try:
+            if int(float(q.get("remaining", self.quota_warn + 1))) <= self.quota_warn:
+                print(f"[http] API quota low: {q.get('remaining')} requests remaining")
+        except ValueError:
+            pass
+
+    def _send(self, url, params, headers):
+        for attempt in range(self.retries + 1):
+            try:
+                r = self.session.get(self._rewrite(url), params=params, headers=headers, timeout=self.timeout)
+                if r.status_code not in RETRY_STATUS or attempt == self.retries:
+                    with self._lock:
+                        self.stats["network"] += 1
+                    self._track_quota({k.lower(): v for k, v in r.headers.items()})
+                    return r
+                wait = r.headers.get("Retry-After")
+                wait = float(wait) if wait and wait.replace(".", "", 1).isdigit() else None
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                wait = None
+            wait = min(self.max_backoff, wait if wait is not None else self.backoff * 2**attempt * (1 + random.random()))
+            with self._lock:
+                self.stats["retries"] += 1
+            print(f"[http] retry {attempt + 1}/{self.retries} for {url.split('?')[0]} in {wait:.1f}s")
+            time.sleep(wait)
+
+    def get(self, url, params=None, ttl=None, headers=None):
+        """GET through the cache; returns a Response (from_cache=True when no body was downloaded)"""
+        ttl = self.ttl if ttl is None else ttl
+        key = cache_key(url, params)
+        entry = self._load(key)
+        if entry is not None and (self.mode == "replay" or (self.mode == "live" and time.time() - entry["fetched_at"] < ttl)):
+            with self._lock:
+                self.stats["cache_hit"] += 1
+            return Response(entry["status"], entry["headers"], entry["text"], from_cache=True)
+        if self.mode == "replay":
+            raise CacheMiss(f"no recorded response for {url.split('?')[0]} (key {key})")
+
+        h = dict(headers or {})
+        if entry is not None:
+            if "etag" in entry["headers"]:
+                h["If-None-Match"] = entry["headers"]["etag"]
+            h["If-Modified-Since"] = entry["headers"].get("last-modified") or formatdate(entry["fetched_at"], usegmt=True)
+        r = self._send(url, params, h)
+        if r.status_code == 304 and entry is not None:
+            self._touch(key, entry)
+            with self._lock:
+                self.stats["revalidated"] += 1
+            return Response(entry["status"], entry["headers"], entry["text"], from_cache=True)
+        if r.status_code == 200:
+            self._store(key, url, r.headers, r.status_code, r.text)
+        return Response(r.status_code, dict(r.headers), r.text)
+
+    def get_json(self, url, params=None, ttl=None, headers=None):
+        r = self.get(url, params=params, ttl=ttl, headers=headers)
+        r.raise_for_status()
+        return r.json()
+
+# ---- process-wide client ----
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def get_client():
+    """Shared FetchClient configured from FETCH_MODE / FETCH_CACHE_DIR / FETCH_TTL / FETCH_BASE_URL"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = FetchClient(cache_dir=os.getenv("FETCH_CACHE_DIR", DEFAULT_CACHE_DIR),
+                                  ttl=float(os.getenv("FETCH_TTL", 900)),
+                                  mode=os.getenv("FETCH_MODE", "live"),
+                                  base_url=os.getenv("FETCH_BASE_URL") or None)
+        return _CLIENT
+
+def add_http_args(ap):
+    """Add the shared fetch flags to an argparse parser"""
+    ap.add_argument("--http_mode", choices=MODES, default=None, help="live (cache+network), refresh or replay (offline)")
+    ap.add_argument("--http_cache", default=None, help="Response cache dir")
+    ap.add_argument("--http_ttl", type=float, default=None, help="Cache TTL in seconds")
+    ap.add_argument("--http_base_url", default=None, help="Send requests to this host instead (stub server)")
+    return ap
+
+def configure(args):
+    """Apply --http_* flags; exported via env so subprocess fetchers see the same settings"""
+    global _CLIENT
+    for flag, env in [("http_mode", "FETCH_MODE"), ("http_cache", "FETCH_CACHE_DIR"),
+                      ("http_ttl", "FETCH_TTL"), ("http_base_url", "FETCH_BASE_URL")]:
+        v = getattr(args, flag, None)
+        if v is not None:
+            os.environ[env] = str(v)
+    with _CLIENT_LOCK:
+        _CLIENT = None
+
+# ---- stub server ----
+
+def serve_cache(cache_dir, port=8765, host="127.0.0.1"):
+    """Serve recorded responses over HTTP (404 on a miss) so fetchers can run against a local stub"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            key = cache_key(self.path)
+            path = os.path.join(cache_dir, f"{key}.json")
+            if not os.path.exists(path):
+                self.send_response(404); self.end_headers()
+                return
+            with open(path) as f:
+                entry = json.load(f)
+            body = entry["text"].encode()
+            self.send_response(entry["status"])
+            self.send_header("Content-Type", entry["headers"].get("content-type", "application/json"))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving {cache_dir} on http://{host}:{port}")
+    srv.serve_forever()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--serve", default=DEFAULT_CACHE_DIR, help="Cache dir to serve")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+    serve_cache(args.serve, args.port)
@@ -0,0 +1,96 @@
+"""
+Append-only line-history store for odds pulls.
+
+Each pull of the flattened odds table (fetch_lines_oddsapi.flatten_odds) is written as one file
+under <root>/season=YYYY/week=WW/, so a week's movement is a read of one small partition
+instead of a re-fetch. Files are Parquet when pyarrow is available, gzipped CSV otherwise.
+The per-game consensus over books lives here too, so one pull and a history of pulls are
+summarized the same way.
+"""
+
+import os, glob, importlib.util
+import pandas as pd, numpy as np
+
+here = os.path.dirname(__file__)
+DEFAULT_DIR = os.path.join(os.path.dirname(here), "out", "line_history")
+PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+def partition_dir(season, week, root=DEFAULT_DIR):
+    return os.path.join(root, f"season={int(season)}", f"week={int(week):02d}")
+
+def append(long_df, season, week, pulled_at, root=DEFAULT_DIR):
+    """Write one pull; returns the file path. Existing pulls are never rewritten."""
+    d = partition_dir(season, week, root)
+    os.makedirs(d, exist_ok=True)
+    df = long_df.assign(pulled_at=pulled_at)
+    for c in ("book", "market", "outcome"):
+        df[c] = df[c].astype("category")
+    stem = os.path.join(d, "pull_" + pulled_at.replace(":", "").replace("-", "").replace("+", "_"))
+    if PARQUET:
+        path = stem + ".parquet"
+        df.to_parquet(path, index=False)
+    else:
+        path = stem + ".csv.gz"
+        df.to_csv(path, index=False)
+    return path
+
+def read(season, week, root=DEFAULT_DIR, event_ids=None, books=None, markets=None):
+    """All pulls for one season/week, optionally filtered, sorted by pull time"""
+    files = sorted(glob.glob(os.path.join(partition_dir(season, week, root), "pull_*")))
+    if not files:
+        return pd.DataFrame()
+    parts = [pd.read_parquet(f) if f.endswith(".parquet") else pd.read_csv(f) for f in files]
+    df = pd.concat(parts, ignore_index=True)
+    for col, keep in [("event_id", event_ids), ("book", books), ("market", markets)]:
+        if keep is not None:
+            df = df[df[col].isin(keep)]
+    return df.sort_values("pulled_at", kind="stable").reset_index(drop=True)
+
+def implied_prob(price):
+    """American odds -> implied probability (with vig)"""
+    price = np.asarray(price, dtype="float64")
+    return np.where(price < 0, -price/(-price + 100.0), 100.0/(price + 100.0))
+
+def consensus(long_df, method="median", by=("event_id",)):
+    """
+    Per-game consensus total and home spread across all books, grouped by `by`
+    (add "pulled_at" to get one consensus per history snapshot).
+    median: median line across books. vig: books weighted by 1/overround, so sharper
+    (lower-hold) books count more.
+    """
+    by = list(by)
+    cols = by + [c for c in ["commence_time", "home_team_name", "away_team_name"] if c not in by]
+    games = long_df[cols].drop_duplicates(by).set_index(by)
+    df = long_df.assign(prob=implied_prob(long_df["price"]))
+    # hold per book/market: sum of implied probs over the two sides minus 1
+    hold = df.groupby(by + ["book", "market"])["prob"].transform("sum") - 1.0
+    df["w"] = 1.0/hold.clip(lower=0.005)
+
+    spreads = df[(df["market"] == "spreads") & (df["outcome"] == df["home_team_name"])]
+    totals = df[(df["market"] == "totals") & (df["outcome"] == "Over")]
+    out = games.copy()
+    for name, side in [("spread_home_consensus", spreads), ("ou_consensus", totals)]:
+        side = side.dropna(subset=["point"])
+        if method == "vig":
+            g = side.assign(wp=side["point"]*side["w"]).groupby(by)
+            out[name] = g["wp"].sum()/g["w"].sum()
+        else:
+            out[name] = side.groupby(by)["point"].median()
+    out["n_books"] = df.groupby(by)["book"].nunique()
+    return out.reset_index()
+
+def movement(season, week, root=DEFAULT_DIR, method="median"):
+    """Per event: opening and current consensus spread/total, their moves, and the number of pulls"""
+    hist = read(season, week, root)
+    if hist.empty:
+        return pd.DataFrame(columns=["event_id"])
+    snap = consensus(hist, method, by=("event_id", "pulled_at")).sort_values(["event_id", "pulled_at"])
+    g = snap.groupby("event_id")
+    out = pd.DataFrame({
+        "spread_home_open": g["spread_home_consensus"].first(),
+        "ou_open": g["ou_consensus"].first(),
+        "spread_move": g["spread_home_consensus"].last() - g["spread_home_consensus"].first(),
+        "ou_move": g["ou_consensus"].last() - g["ou_consensus"].first(),
+        "n_pulls": g.size(),
+    })
+    return out.reset_index()
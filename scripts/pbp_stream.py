@@ -0,0 +1,111 @@
+"""
+Streaming play-by-play reader shared by the team-metric scripts.
+
+- read_chunks: column-pruned chunks from CSV(.gz) or Parquet, so a multi-GB multi-season file
+  never has to fit in memory
+- iter_games: re-chunks so a game's plays never straddle two chunks (needed for snap-to-snap diffs)
+- WeeklyPartials: per (season, week) partial aggregates on disk; a rerun on the same sources only
+  processes weeks not yet cached. Partials are filed under a fingerprint of the source files (path,
+  size, mtime) and the caller's aggregation version, so a changed file or aggregation starts over
+
+Expects nflfastR-style columns (game_id, season, week, posteam, ...); files must be ordered by game.
+"""
+
+import os, glob, hashlib
+import pandas as pd
+
+here = os.path.dirname(__file__)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(here), "out", "pbp_cache")
+
+def expand_paths(paths):
+    """Files from a path, glob, or list of either"""
+    if isinstance(paths, str):
+        paths = [paths]
+    out = []
+    for p in paths:
+        out.extend(sorted(glob.glob(p)) or [p])
+    return out
+
+def read_chunks(path, columns, chunksize=250_000):
+    """Yield DataFrames with only `columns` (those present in the file)"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        cols = [c for c in columns if c in pf.schema_arrow.names]
+        for batch in pf.iter_batches(batch_size=chunksize, columns=cols):
+            yield batch.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        cols = [c for c in columns if c in header]
+        yield from pd.read_csv(path, usecols=cols, chunksize=chunksize, low_memory=False)
+
+def iter_games(paths, columns, chunksize=250_000, keep=None):
+    """
+    Yield chunks holding whole games only. `keep(chunk) -> bool mask` drops rows early
+    (e.g. weeks that are already cached) before anything else is done with them.
+    """
+    columns = list(dict.fromkeys(["game_id"] + list(columns)))
+    carry = None
+    for path in expand_paths(paths):
+        for chunk in read_chunks(path, columns, chunksize):
+            if keep is not None:
+                chunk = chunk[keep(chunk)]
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            if chunk.empty:
+                continue
+            tail = (chunk["game_id"] == chunk["game_id"].iloc[-1]).to_numpy()
+            carry = chunk[tail]
+            if (~tail).any():
+                yield chunk[~tail]
+    if carry is not None and len(carry):
+        yield carry
+
+def source_tag(sources, version=1):
+    """Fingerprint of the source files (each a path, glob, list or None) and an aggregation version"""
+    h = hashlib.sha1(repr(version).encode())
+    for src in sources:
+        for p in (expand_paths(src) if src else []):
+            st = os.stat(p)
+            h.update(repr((os.path.abspath(p), st.st_size, st.st_mtime_ns)).encode())
+    return h.hexdigest()[:12]
+
+class WeeklyPartials:
+    """Per-week partial aggregates stored as <cache_dir>/<name>/<source_tag>/season=YYYY/week=WW.csv"""
+
+    def __init__(self, name, cache_dir=DEFAULT_CACHE_DIR, sources=(), version=1):
+        self.root = os.path.join(cache_dir, name, source_tag(sources, version))
+
+    def path(self, season, week):
+        return os.path.join(self.root, f"season={int(season)}", f"week={int(week):02d}.csv")
+
+    def cached_weeks(self, season):
+        files = glob.glob(os.path.join(self.root, f"season={int(season)}", "week=*.csv"))
+        return {int(os.path.basename(f)[5:7]) for f in files}
+
+    def save(self, partial, skip_weeks=()):
+        """Write each (season, week) slice of `partial`; weeks in skip_weeks are not persisted"""
+        for (season, week), df in partial.groupby(["season", "week"]):
+            if week in skip_weeks:
+                continue
+            os.makedirs(os.path.dirname(self.path(season, week)), exist_ok=True)
+            df.to_csv(self.path(season, week), index=False)
+
+    def load(self, season, weeks):
+        parts = [pd.read_csv(self.path(season, w)) for w in sorted(weeks) if os.path.exists(self.path(season, w))]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+def window_weeks(available, week=None, weeks_back=4):
+    """Weeks before `week` (all available if None), limited to the last `weeks_back` (0 = season to date)"""
+    weeks = sorted(w for w in available if week is None or w < week)
+    return weeks[-weeks_back:] if weeks_back else weeks
+
+def window_partials(cache, new, season, week=None, weeks_back=4):
+    """Cached weeks plus the unpersisted newest week in `new`, limited to the window; returns (partials, weeks)"""
+    saved = cache.cached_weeks(season)
+    live = set(new["week"]) - saved if len(new) else set()
+    weeks = window_weeks(saved | live, week, weeks_back)
+    parts = [cache.load(season, [w for w in weeks if w not in live])]
+    if live:
+        parts.append(new[new["week"].isin(set(weeks) & live)])
+    return pd.concat(parts, ignore_index=True), weeks
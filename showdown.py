@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+DraftKings Showdown (captain mode) builder.
+
+A single-game pool is small enough to enumerate every legal roster: CPT (1.5x salary and points,
+its own DK ID) plus 5 FLEX. FLEX 5-sets are generated with NumPy in chunks (one chunk per lowest
+FLEX index) and crossed with every captain at once, so salary, both-teams, bring-back and QB-stack
+rules are array masks and a running top-N keeps memory flat. The top candidates are scored against
+projections, or against per-player simulations when a sims file is given, and a portfolio is picked
+greedily under exposure and uniqueness limits.
+
+    python showdown.py --dk DKSalaries_showdown.csv --projections projections.csv --ownership ownership.csv \
+        --sims sims.csv --n 20 --out out/showdown
+
+sims.csv is one row per player: name, then one column per simulation (DK points). Writes
+showdown_lineups.csv (names, salary, projection, ownership, sim metrics) and
+showdown_upload.csv (CPT/FLEX player IDs for the DK upload).
+"""
+
+import argparse, os
+import pandas as pd, numpy as np
+from input_cache import read_dk_salaries
+from utils import read_weights, load_optional
+from roster import get_roster
+
+ROSTER = get_roster("dk_showdown")
+CPT_MULT = ROSTER.multipliers["CPT"]
+N_FLEX = ROSTER.size - 1
+PASS_CATCHERS = ("WR", "TE")
+BLOCK = 4_000_000  # (FLEX set x captain) cells per vectorized block
+
+def load_showdown(dk_path):
+    """One row per player: name, team, opp, pos, flex_id/salary, cpt_id/salary (CPT rows paired by name+team)"""
+    dk = read_dk_salaries(dk_path)
+    for c in ("team", "pos", "roster_pos", "opp"):
+        if c in dk.columns:
+            dk[c] = dk[c].astype(object)
+    rp = dk["roster_pos"] if "roster_pos" in dk.columns else pd.Series("FLEX", index=dk.index)
+    flex = dk[rp != "CPT"].drop_duplicates(["name", "team"])
+    cols = ["name", "team", "pos", "id", "salary"] + (["opp"] if "opp" in dk.columns else [])
+    df = flex[cols].rename(columns={"id": "flex_id", "salary": "flex_salary"})
+    cpt = dk[rp == "CPT"][["name", "team", "id", "salary"]].rename(columns={"id": "cpt_id", "salary": "cpt_salary"})
+    df = df.merge(cpt.drop_duplicates(["name", "team"]), on=["name", "team"], how="left")
+    if df["cpt_id"].isna().all():
+        print(f"WARNING: {dk_path} has no CPT rows; captain salary = 1.5x and the upload has no CPT IDs")
+    # classic-style file without CPT rows: DK prices the captain at 1.5x
+    df["cpt_salary"] = df["cpt_salary"].fillna(np.round(df["flex_salary"]*CPT_MULT/100)*100).astype(int)
+    teams = sorted(df["team"].unique())
+    if len(teams) != 2:
+        raise ValueError(f"{dk_path}: Showdown needs exactly one game, found teams {teams}")
+    if "opp" not in df.columns:
+        df["opp"] = df["team"].map({teams[0]: teams[1], teams[1]: teams[0]})
+    return df.reset_index(drop=True)
+
+def read_sims(path, names):
+    """Player x sim matrix (rows in `names` order; players without sims get NaN rows)"""
+    sims = pd.read_csv(path).drop_duplicates("name").set_index("name")
+    return sims.apply(pd.to_numeric, errors="coerce").reindex(names).to_numpy(float)
+
+def build_pool(dk, proj_df, own_df=None, sims=None, min_proj=0.0):
+    """Players with proj (sim mean when sims given), own and cpt_own; zero-projection players dropped"""
+    df = dk.merge(proj_df[["name", "proj"]].drop_duplicates("name"), on="name", how="left")
+    df["proj"] = df["proj"].fillna(0.0).astype(float)
+    if own_df is not None and "own" in own_df.columns:
+        keep = ["name", "own"] + (["cpt_own"] if "cpt_own" in own_df.columns else [])
+        df = df.merge(own_df[keep].drop_duplicates("name"), on="name", how="left")
+    df["own"] = df["own"].fillna(0.0) if "own" in df.columns else 0.0
+    df["cpt_own"] = df["cpt_own"].fillna(df["own"]/N_FLEX) if "cpt_own" in df.columns else df["own"]/N_FLEX
+    S = None
+    if sims is not None:
+        S = read_sims(sims, df["name"])
+        has = ~np.isnan(S).all(axis=1)
+        df.loc[has, "proj"] = np.nanmean(S[has], axis=1)
+        S = np.nan_to_num(S)
+    keep = (df["proj"] > min_proj).to_numpy()
+    return df[keep].reset_index(drop=True), (S[keep] if S is not None else None)
+
+def combinations(n, k):
+    """All k-subsets of range(n) as an (C(n,k), k) int array, rows in lexicographic order"""
+    c = np.arange(n)[:, None]
+    for _ in range(k - 1):
+        last = c[:, -1]
+        counts = n - 1 - last
+        rows = np.repeat(np.arange(len(c)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        c = np.column_stack([c[rows], last[rows] + 1 + offsets])
+    return c
+
+def _top_per_captain(cpt, score, k):
+    """Indices of the k best scores within each captain"""
+    order = np.lexsort((-score, cpt))
+    c = cpt[order]
+    starts = np.r_[0, np.flatnonzero(c[1:] != c[:-1]) + 1]
+    rank = np.arange(len(c)) - np.repeat(starts, np.diff(np.r_[starts, len(c)]))
+    return order[rank < k]
+
+def enumerate_lineups(pool, cfg, own_weight=0.0, top=20000, no_flex=None, no_cpt=None):
+    """
+    Every legal (CPT, 5 FLEX) roster, keeping the best top/n per captain by projected score
+    (so the portfolio step sees every captain, not just the few best ones). no_flex / no_cpt are
+    boolean masks of players barred from any slot / from the captain slot.
+    Returns (cpt idx, flex idx (top x 5), score, n_legal).
+    """
+    n = len(pool)
+    sal = pool["flex_salary"].to_numpy(np.int64)
+    csal = pool["cpt_salary"].to_numpy(np.int64)
+    val = pool["proj"].to_numpy(float) - own_weight*pool["own"].to_numpy(float)
+    cval = CPT_MULT*pool["proj"].to_numpy(float) - own_weight*pool["cpt_own"].to_numpy(float)
+    teams = sorted(pool["team"].unique())
+    t0 = (pool["team"] == teams[0]).to_numpy(np.int64)
+    qb = (pool["pos"] == "QB").to_numpy(np.int64)
+    pc = pool["pos"].isin(PASS_CATCHERS).to_numpy(np.int64)
+    cap = int(cfg.get("sd_max_salary", ROSTER.salary_cap))
+    lo = int(cfg.get("sd_min_salary", 0))
+    min_bb = int(cfg.get("sd_min_bringback", 1))
+    qb_stack = bool(cfg.get("sd_qb_stack", True))
+    block = max(1, BLOCK//max(n, 1))
+    per_cpt = max(1, top//max(n, 1))
+
+    best_s, best_c, best_f = np.empty(0), np.empty(0, np.int64), np.empty((0, N_FLEX), np.int64)
+    n_legal = 0
+    for i in range(n - N_FLEX + 1):
+        rest = combinations(n - i - 1, N_FLEX - 1) + i + 1
+        F = np.column_stack([np.full(len(rest), i), rest])
+        fsal = sal[F].sum(axis=1)
+        F = F[fsal + csal.min() <= cap]
+        if no_flex is not None:
+            F = F[~no_flex[F].any(axis=1)]
+        for b in range(0, len(F), block):
+            f = F[b:b + block]
+            s = sal[f].sum(axis=1)[:, None] + csal[None, :]
+            ok = (s <= cap) & (s >= lo)
+            if no_cpt is not None:
+                ok &= ~no_cpt[None, :]
+            ok &= ~(f[:, :, None] == np.arange(n)[None, None, :]).any(axis=1)
+            T0 = t0[f].sum(axis=1)[:, None] + t0[None, :]
+            ok &= (T0 >= 1) & (T0 <= N_FLEX)  # DK: players from both teams
+            if min_bb:
+                opp = np.where(t0[None, :] == 1, N_FLEX + 1 - T0, T0)  # players facing the captain
+                ok &= opp >= min_bb
+            if qb_stack:
+                for side in (t0, 1 - t0):
+                    q = (qb*side)[f].sum(axis=1)[:, None] + (qb*side)[None, :]
+                    p = (pc*side)[f].sum(axis=1)[:, None] + (pc*side)[None, :]
+                    ok &= ~((q > 0) & (p == 0))
+            r, c = np.nonzero(ok)
+            n_legal += len(r)
+            if not len(r):
+                continue
+            score = val[f[r]].sum(axis=1) + cval[c]
+            keep = _top_per_captain(c, score, per_cpt)
+            best_s = np.concatenate([best_s, score[keep]])
+            best_c = np.concatenate([best_c, c[keep]])
+            best_f = np.concatenate([best_f, f[r[keep]]])
+            if len(best_s) > 2*top:
+                keep = _top_per_captain(best_c, best_s, per_cpt)
+                best_s, best_c, best_f = best_s[keep], best_c[keep], best_f[keep]
+    keep = _top_per_captain(best_c, best_s, per_cpt)
+    order = keep[np.argsort(-best_s[keep], kind="stable")]
+    return best_c[order], best_f[order], best_s[order], n_legal
+
+def sim_metrics(cpt, flex, S, top_pct=0.01):
+    """Per-lineup sim mean, p90 and share of sims finishing in the top `top_pct` of the candidates"""
+    pts = S[flex].sum(axis=1) + CPT_MULT*S[cpt]
+    cut = np.quantile(pts, 1 - top_pct, axis=0)
+    return {"sim_mean": pts.mean(axis=1), "sim_p90": np.quantile(pts, 0.9, axis=1),
+            "top_rate": (pts >= cut[None, :]).mean(axis=1)}
+
+def select_portfolio(cpt, flex, rank, n, n_players, max_exposure=0.5, max_cpt_exposure=0.3, min_unique=2):
+    """Greedy by descending rank: every pick differs from each earlier one in >= min_unique roster spots"""
+    picked = []
+    member = np.zeros((0, 2*n_players), bool)  # FLEX use in [0, n), CPT use in [n, 2n)
+    exp = np.zeros(n_players, int)
+    cexp = np.zeros(n_players, int)
+    max_n, max_c = max(1, int(np.floor(max_exposure*n))), max(1, int(np.floor(max_cpt_exposure*n)))
+    for j in np.argsort(-rank, kind="stable"):
+        if len(picked) >= n:
+            break
+        c, f = cpt[j], flex[j]
+        if cexp[c] >= max_c or exp[c] >= max_n or (exp[f] >= max_n).any():
+            continue
+        row = np.zeros(2*n_players, bool)
+        row[f] = True
+        row[n_players + c] = True
+        if len(picked) and (member[:, row].sum(axis=1) > N_FLEX + 1 - min_unique).any():
+            continue
+        picked.append(j)
+        member = np.vstack([member, row])
+        exp[f] += 1; exp[c] += 1; cexp[c] += 1
+    return picked, exp >= max_n, cexp >= max_c
+
+def build_portfolio(pool, S, cfg, n, own_weight=0.0, rank_by="score", top=20000, rounds=5):
+    """
+    Enumerate, then pick greedily. When exposure caps leave the portfolio short, players at their cap
+    are barred and the enumeration re-run, so the next candidates are built around everyone else.
+    """
+    no_flex, no_cpt = np.zeros(len(pool), bool), np.zeros(len(pool), bool)
+    cands = []
+    for _ in range(rounds):
+        c, f, sc, n_legal = enumerate_lineups(pool, cfg, own_weight, top, no_flex if no_flex.any() else None,
+                                              no_cpt if no_cpt.any() else None)
+        cands.append((c, f, sc))
+        cpt, flex, score = (np.concatenate(x) for x in zip(*cands))
+        metrics = sim_metrics(cpt, flex, S) if S is not None else {}
+        picked, full, cfull = select_portfolio(cpt, flex, score if rank_by == "score" else metrics[rank_by], n, len(pool),
+                                               float(cfg.get("sd_max_exposure", 0.5)), float(cfg.get("sd_max_cpt_exposure", 0.3)),
+                                               max(1, int(cfg.get("sd_min_unique", 2))))
+        print(f"[showdown] {n_legal:,} legal rosters, {len(score):,} candidates, {len(picked)} picked")
+        if len(picked) >= n or ((full | no_flex) == no_flex).all() and ((cfull | no_cpt) == no_cpt).all():
+            break
+        no_flex, no_cpt = no_flex | full, no_cpt | cfull
+    return cpt, flex, score, metrics, picked
+
+def lineup_frames(pool, cpt, flex, score, metrics, picked):
+    names, ids = pool["name"].to_numpy(object), pool["flex_id"].to_numpy(object)
+    cids = pool["cpt_id"].to_numpy(object)
+    rows, upload = [], []
+    for k, j in enumerate(picked, start=1):
+        c, f = cpt[j], flex[j]
+        r = {"lineup": k, "CPT": names[c], **{f"FLEX{i+1}": names[x] for i, x in enumerate(f)},
+             "salary": int(pool["cpt_salary"].iat[c] + pool["flex_salary"].to_numpy()[f].sum()),
+             "proj": round(float(CPT_MULT*pool["proj"].iat[c] + pool["proj"].to_numpy()[f].sum()), 3),
+             "own": round(float(pool["cpt_own"].iat[c] + pool["own"].to_numpy()[f].sum()), 2),
+             "score": round(float(score[j]), 3)}
+        r.update({m: round(float(v[j]), 4) for m, v in metrics.items()})
+        rows.append(r)
+        cid = cids[c] if pd.notna(cids[c]) else ""
+        upload.append(dict(zip(ROSTER.columns, [cid] + [ids[x] for x in f])))
+    return pd.DataFrame(rows), pd.DataFrame(upload, columns=ROSTER.columns)
+
+def main(dk_path, projections, ownership=None, sims=None, weights=None, out_dir="out/showdown", n=20,
+         own_weight=0.0, rank_by=None, top=20000):
+    cfg = read_weights(weights) if weights else {}
+    dk = load_showdown(dk_path)
+    proj_df = load_optional(projections)
+    own_df = load_optional(ownership) if ownership else None
+    pool, S = build_pool(dk, proj_df, own_df, sims, float(cfg.get("sd_min_proj", 0.0)))
+    print(f"[showdown] {'@'.join(sorted(pool['team'].unique()))}: {len(pool)} players in pool")
+    rank_by = rank_by or ("top_rate" if S is not None else "score")
+    cpt, flex, score, metrics, picked = build_portfolio(pool, S, cfg, n, own_weight, rank_by, top)
+    if not picked:
+        raise SystemExit("No legal Showdown rosters under the current constraints")
+    if len(picked) < n:
+        print(f"WARNING: only {len(picked)} of {n} lineups fit the exposure/uniqueness limits")
+    lineups, upload = lineup_frames(pool, cpt, flex, score, metrics, picked)
+    os.makedirs(out_dir, exist_ok=True)
+    lineups.to_csv(os.path.join(out_dir, "showdown_lineups.csv"), index=False)
+    upload.to_csv(os.path.join(out_dir, "showdown_upload.csv"), index=False, header=list(ROSTER.slots))
+    print(f"Wrote {len(lineups)} Showdown lineups (ranked by {rank_by}) to {out_dir}")
+    return lineups
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dk", required=True, help="Showdown DKSalaries.csv (CPT and FLEX rows)")
+    ap.add_argument("--projections", required=True)
+    ap.add_argument("--ownership", default=None, help="name, own[, cpt_own] in %%")
+    ap.add_argument("--sims", default=None, help="name + one column per simulation")
+    ap.add_argument("--weights", default="config/weights.yaml")
+    ap.add_argument("--out", default="out/showdown")
+    ap.add_argument("--n", type=int, default=20, help="Lineups in the portfolio")
+    ap.add_argument("--own_weight", type=float, default=0.0, help="Points per 1%% ownership subtracted from the score")
+    ap.add_argument("--rank_by", choices=["score", "sim_mean", "sim_p90", "top_rate"], default=None,
+                    help="Portfolio order (default: top_rate with sims, else score)")
+    ap.add_argument("--top", type=int, default=20000, help="Candidates kept from the enumeration")
+    args = ap.parse_args()
+    main(args.dk, args.projections, args.ownership, args.sims, args.weights, args.out, args.n,
+         args.own_weight, args.rank_by, args.top)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Synthetic slate generator.
+
+Writes files shaped like a real week so the pipeline and benchmarks can run without
+out/week01 data:
+  DKSalaries.csv, projections.csv, ownership.csv, roles.csv, schedule.csv, weekly_inputs.csv
+
+Player names are "<TEAM> <POS><depth>" (e.g. "KC WR1"), so roles.csv always resolves.
+"""
+
+import argparse, numpy as np, pandas as pd
+from pathlib import Path
+from utils import NICK_TO_ABBR
+
+TEAMS = sorted(set(NICK_TO_ABBR.values()))
+
+# players per team by position (depth 1..n)
+DEFAULT_ROSTER = {"QB": 2, "RB": 4, "WR": 6, "TE": 3, "DST": 1}
+
+# (low, high) salary band per depth-chart slot; deeper players reuse the last band.
+# A team-level strength draw places every starter inside its band, so good offenses
+# are expensive top to bottom and most of the pool sits near the minimum, like DK.
+SALARY_BANDS = {
+    "QB": [(5000, 8400), (4000, 4600)],
+    "RB": [(5200, 9000), (4200, 6200), (4000, 5000), (4000, 4500)],
+    "WR": [(5000, 9200), (4000, 7200), (3200, 5400), (3000, 4200), (3000, 3600), (3000, 3300)],
+    "TE": [(2900, 7500), (2500, 4000), (2500, 3000)],
+    "DST": [(2500, 4000)],
+}
+
+# projected points per $1000 of salary
+PTS_PER_K = {"QB": 2.55, "RB": 2.25, "WR": 2.15, "TE": 1.95, "DST": 2.3}
+
+# field ownership per position across a 9-man roster (sums to 900%)
+OWN_TOTALS = {"QB": 100.0, "RB": 230.0, "WR": 360.0, "TE": 110.0, "DST": 100.0}
+
+KICKOFFS = ["01:00PM", "04:05PM", "04:25PM", "08:20PM"]
+
+def make_slate(n_games=13, roster=None, seed=0, salary_noise=0.12, proj_sigma=0.25,
+               p90_range=(1.45, 1.95), own_skew=2.0, date="09/07/2025", season=2025, week=1):
+    """Build a synthetic slate; returns a dict of DataFrames keyed by output file stem"""
+    if not 1 <= n_games <= len(TEAMS)//2:
+        raise ValueError(f"n_games must be between 1 and {len(TEAMS)//2}")
+    roster = roster or DEFAULT_ROSTER
+    rng = np.random.default_rng(seed)
+    teams = list(rng.permutation(TEAMS)[:2*n_games])
+
+    games = []
+    for g in range(n_games):
+        away, home = teams[2*g], teams[2*g+1]
+        # most games in the early window, a few late, one prime-time
+        if g == n_games - 1 and n_games > 2:
+            ko = KICKOFFS[3]
+        elif g >= int(n_games*0.7):
+            ko = KICKOFFS[1 + g % 2]
+        else:
+            ko = KICKOFFS[0]
+        games.append({"game_id": f"{season}_{week:02d}_{away}_{home}", "away_team": away, "home_team": home,
+                      "start_time": ko, "game_info": f"{away}@{home} {date} {ko} ET"})
+
+    rows = []
+    pid = 30000000
+    for g in games:
+        for team, opp in [(g["away_team"], g["home_team"]), (g["home_team"], g["away_team"])]:
+            strength = rng.uniform(0, 1)
+            for pos, n in roster.items():
+                bands = SALARY_BANDS[pos]
+                sal = []
+                for d in range(n):
+                    lo, hi = bands[min(d, len(bands)-1)]
+                    u = np.clip(strength + rng.normal(0, salary_noise), 0, 1)
+                    sal.append(int(round((lo + u*(hi - lo))/100)*100))
+                sal = sorted(sal, reverse=True)
+                for d in range(n):
+                    name = f"{team} DST" if pos == "DST" else f"{team} {pos}{d+1}"
+                    rows.append({"name": name, "team": team, "opp": opp, "pos": pos, "salary": int(sal[d]),
+                                 "id": pid, "game_info": g["game_info"], "depth": d+1})
+                    pid += 1
+    df = pd.DataFrame(rows)
+
+    # projections: salary-implied points with lognormal noise, ceiling uplift
+    pts = df["salary"]/1000.0 * df["pos"].map(PTS_PER_K)
+    df["proj"] = (pts * rng.lognormal(0.0, proj_sigma, len(df))).round(2)
+    df["p90"] = (df["proj"] * rng.uniform(p90_range[0], p90_range[1], len(df))).round(2)
+
+    # ownership: value^skew within position, scaled to the position total
+    value = (df["proj"] / (df["salary"]/1000.0)).clip(lower=0.05)
+    w = value ** own_skew * (df["salary"]/df["salary"].max())
+    df["own"] = w / w.groupby(df["pos"]).transform("sum") * df["pos"].map(OWN_TOTALS)
+    df["own"] = df["own"].clip(0.1, 60.0).round(2)
+
+    dk = pd.DataFrame({
+        "Position": df["pos"],
+        "Name + ID": df["name"] + " (" + df["id"].astype(str) + ")",
+        "Name": df["name"],
+        "ID": df["id"],
+        "Roster Position": df["pos"].map(lambda p: p if p in ("QB", "DST") else f"{p}/FLEX"),
+        "Salary": df["salary"],
+        "Game Info": df["game_info"],
+        "TeamAbbrev": df["team"],
+        "AvgPointsPerGame": (df["proj"]*0.9).round(2),
+    })
+    projections = df[["name", "team", "pos", "proj", "p90"]].copy()
+    ownership = df[["name", "own"]].copy()
+
+    roles = []
+    for team in teams:
+        def nm(pos, d):
+            return f"{team} {pos}{d}" if roster.get(pos, 0) >= d else None
+        roles.append({"team": team, "QB1": nm("QB", 1), "RB1": nm("RB", 1), "WR1": nm("WR", 1),
+                      "WR2": nm("WR", 2), "TE1": nm("TE", 1)})
+    roles = pd.DataFrame(roles)
+
+    schedule = pd.DataFrame([{"game_id": g["game_id"], "away_team": g["away_team"], "home_team": g["home_team"],
+                              "start_time": f"{date} {g['start_time']}", "venue": f"{g['home_team']} Stadium"} for g in games])
+
+    n = len(games)
+    weekly = schedule[["game_id", "home_team", "away_team"]].copy()
+    weekly["venue_roof"] = rng.choice(["outdoor", "outdoor", "dome", "retractable"], n)
+    weekly["wind_mph"] = np.where(weekly["venue_roof"] == "outdoor", rng.gamma(2.0, 3.5, n), 0.0).round(1)
+    weekly["ou"] = (rng.normal(45.5, 3.5, n)*2).round()/2
+    weekly["spread_home"] = (rng.normal(-1.5, 4.5, n)*2).round()/2
+    for side in ["home", "away"]:
+        weekly[f"proe_{side}"] = rng.normal(0, 3, n).round(2)
+        weekly[f"pace_rank_{side}"] = rng.integers(1, 33, n)
+        top2 = rng.uniform(0.36, 0.58, n)
+        weekly[f"wr1_tgt_share_{side}"] = (top2*0.60).round(3)
+        weekly[f"wr2_tgt_share_{side}"] = (top2*0.40).round(3)
+        weekly[f"te_route_share_{side}"] = ((1-top2)*0.55).round(3)
+        weekly[f"rb_route_share_{side}"] = ((1-top2)*0.45).round(3)
+    weekly["stack_cum_own_est"] = 0.0
+
+    return {"DKSalaries": dk, "projections": projections, "ownership": ownership,
+            "roles": roles, "schedule": schedule, "weekly_inputs": weekly}
+
+def write_slate(slate, out_dir):
+    """Write a slate dict from make_slate as CSVs; returns the output dir"""
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+    for stem, df in slate.items():
+        df.to_csv(out/f"{stem}.csv", index=False)
+    return out
+
+def main(out_dir, n_games=13, seed=0, **kwargs):
+    slate = make_slate(n_games=n_games, seed=seed, **kwargs)
+    write_slate(slate, out_dir)
+    print(f"Wrote {n_games}-game synthetic slate ({len(slate['DKSalaries'])} players) to {out_dir}")
+    return slate
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--games", type=int, default=13)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--qb", type=int, default=DEFAULT_ROSTER["QB"], help="QBs per team")
+    ap.add_argument("--rb", type=int, default=DEFAULT_ROSTER["RB"], help="RBs per team")
+    ap.add_argument("--wr", type=int, default=DEFAULT_ROSTER["WR"], help="WRs per team")
+    ap.add_argument("--te", type=int, default=DEFAULT_ROSTER["TE"], help="TEs per team")
+    ap.add_argument("--salary_noise", type=float, default=0.12, help="Std dev of a player's position inside its salary band (0-1 scale)")
+    ap.add_argument("--proj_sigma", type=float, default=0.25, help="Lognormal sigma of projection noise")
+    ap.add_argument("--own_skew", type=float, default=2.0, help="Exponent on value when spreading ownership (higher = chalkier)")
+    args = ap.parse_args()
+    roster = {"QB": args.qb, "RB": args.rb, "WR": args.wr, "TE": args.te, "DST": 1}
+    main(args.out, args.games, args.seed, roster=roster, salary_noise=args.salary_noise,
+         proj_sigma=args.proj_sigma, own_skew=args.own_skew)
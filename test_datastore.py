@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Round-trip weekly inputs through the Parquet store for weeks that have only some component tables
+"""
+
+import os, tempfile
+import pandas as pd
+import datastore
+from synth_slate import make_slate, write_slate
+from utils import load_weekly_inputs
+
+def main():
+    slate = make_slate(n_games=4, seed=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        week_dir = write_slate(slate, os.path.join(tmp, "week"))
+        root = os.path.join(tmp, "store")
+        games = set(slate["schedule"]["game_id"])
+
+        # schedule only: the merge runs with the missing components as NaN columns
+        datastore.ingest_week(week_dir, 2025, 1, root, tables=["schedule"])
+        wk = load_weekly_inputs(root, 2025, 1)
+        assert set(wk["game_id"]) == games, "schedule-only week lost its games"
+        assert wk["wind_mph"].isna().all() and (wk["te_route_share_home"] > 0).all()
+        print(f"schedule only:            {len(wk)} games, fallback shares")
+
+        # schedule plus a stored weekly_inputs: the stored table wins over a partial merge
+        datastore.ingest_week(week_dir, 2025, 2, root, tables=["schedule", "weekly_inputs"])
+        wk = load_weekly_inputs(root, 2025, 2)
+        want = slate["weekly_inputs"].set_index("game_id")["wind_mph"]
+        assert set(wk["game_id"]) == games
+        assert (wk.set_index("game_id")["wind_mph"] - want).abs().max() < 1e-9, "stored weekly_inputs not used"
+        print(f"schedule + weekly_inputs: {len(wk)} games, stored values")
+
+        # every component: the merge runs as before
+        weather = slate["schedule"][["game_id", "home_team", "away_team"]].assign(venue_roof="outdoor", wind_mph=7.0)
+        teams = pd.unique(slate["schedule"][["home_team", "away_team"]].values.ravel())
+        proe = pd.DataFrame({"team": teams, "proe": 0.0, "sec_per_play_neutral": 28.0})
+        conc = pd.DataFrame({"team": teams, "top2_tgt_share_avg": 0.5, "te_route_share": 0.2, "rb_route_share": 0.1})
+        datastore.ingest_week(week_dir, 2025, 3, root, tables=["schedule"])
+        for name, df in [("weather", weather), ("proe_pace", proe), ("concentration", conc)]:
+            datastore.write_table(root, name, df, 2025, 3)
+        wk = load_weekly_inputs(root, 2025, 3)
+        assert set(wk["game_id"]) == games and (wk["wind_mph"] == 7.0).all()
+        print(f"all components:           {len(wk)} games, merged")
+    print("OK")
+
+if __name__ == "__main__":
+    main()
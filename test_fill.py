@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Check the exact fill solver, the fill cache, the lineup validator and roster compilation on a
+small synthetic slate (deterministic; brute force where it is cheap enough)
+"""
+
+import itertools, tempfile
+import numpy as np
+from synth_slate import make_slate, write_slate
+from late_swap import load_players
+from roster import get_roster
+from fill import FillSolver, FillCache, player_value
+import validate as V
+
+ROSTER = get_roster("dk_classic")
+
+def tiny_pool():
+    """Two games, one QB / two RB / three WR / one TE / DST per team (32 players)"""
+    slate = make_slate(n_games=2, seed=3, roster={"QB": 1, "RB": 2, "WR": 3, "TE": 1, "DST": 1})
+    with tempfile.TemporaryDirectory() as tmp:
+        d = write_slate(slate, tmp)
+        players = load_players(str(d/"DKSalaries.csv"), str(d/"projections.csv"), str(d/"ownership.csv"))
+    return list(players.values())
+
+def brute_fills(core, players, exclude_teams=(), min_salary=0):
+    """Every legal completion of `core` as (lineup value, fill names), best first"""
+    names = {p["name"] for p in core}
+    pool = [p for p in players if p["name"] not in names and (p["pos"] == "DST" or p["team"] not in exclude_teams)]
+    core_sal, core_val = sum(p["salary"] for p in core), sum(player_value(p) for p in core)
+    out = []
+    for fill in itertools.combinations(pool, ROSTER.size - len(core)):
+        sal = core_sal + sum(p["salary"] for p in fill)
+        if min_salary <= sal <= ROSTER.salary_cap and ROSTER.is_final(core + list(fill)):
+            out.append((core_val + sum(player_value(p) for p in fill), frozenset(p["name"] for p in fill)))
+    return sorted(out, key=lambda x: -x[0])
+
+def check_top_fills(players):
+    by = {p["name"]: p for p in players}
+    qb = next(p for p in players if p["pos"] == "QB")
+    # cheapest receivers, so the core leaves room under the cap
+    cheap = lambda t: sorted((p for p in players if p["team"] == t and p["pos"] == "WR"), key=lambda p: p["salary"])
+    mates, back = cheap(qb["team"])[:2], cheap(qb["opp"])[0]
+    core = [qb] + mates + [back]
+    solver = FillSolver(players, cache=FillCache())
+    for exclude, floor in [((), 0), ((qb["team"], qb["opp"]), 0), ((), 49000)]:
+        want = brute_fills(core, players, exclude, floor)
+        got = solver.top_fills(core, k=25, exclude_teams=exclude, min_salary=floor)
+        assert len(got) == min(25, len(want)), (exclude, floor, len(got), len(want))
+        assert np.allclose([v for v, _ in got], [v for v, _ in want[:len(got)]]), (exclude, floor)
+        fills = [frozenset(p["name"] for p in f) for _, f in got]
+        assert len(set(fills)) == len(fills), "duplicate fills"
+        for v, f in got:
+            lu = core + f
+            assert ROSTER.is_final(lu) and floor <= sum(p["salary"] for p in lu) <= ROSTER.salary_cap
+            assert not any(p["team"] in exclude and p["pos"] != "DST" for p in f)
+            assert abs(v - sum(player_value(by[p["name"]]) for p in lu)) < 1e-9
+        print(f"top_fills exclude={exclude or '-'} min_salary={floor}: {len(got)} fills match brute force ({len(want)} legal)")
+    assert solver.best_fill(core)[0] == brute_fills(core, players)[0][0]
+
+def check_cache(players):
+    cache = FillCache()
+    qb = next(p for p in players if p["pos"] == "QB")
+    core = [qb] + sorted((p for p in players if p["team"] == qb["team"] and p["pos"] == "WR"), key=lambda p: p["salary"])[:2]
+    first = FillSolver(players, cache=cache).top_fills(core, k=10)
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 0
+    # a second solver over the same pool reads the same stream
+    again = FillSolver(players, cache=cache).top_fills(core, k=10)
+    assert cache.stats()["hits"] == 1
+    assert [(v, [p["name"] for p in f]) for v, f in first] == [(v, [p["name"] for p in f]) for v, f in again]
+    # deeper reads extend the shared stream and keep its prefix
+    deeper = FillSolver(players, cache=cache).top_fills(core, k=20)
+    assert [v for v, _ in deeper[:10]] == [v for v, _ in first]
+    # a different pool (other values) never shares entries
+    FillSolver(players, value_fn=lambda p: p["proj"], cache=cache).top_fills(core, k=1)
+    assert cache.stats()["misses"] == 2
+    print(f"fill cache: {cache.stats()}")
+
+def check_validator(players):
+    table = V.PlayerTable(players)
+    by = {p["name"]: p for p in players}
+    qb = next(p for p in players if p["pos"] == "QB")
+    team = lambda t, pos: [p for p in players if p["team"] == t and p["pos"] == pos]
+    other = next(t for t in sorted({p["team"] for p in players}) if t not in (qb["team"], qb["opp"]))
+    other_opp = by[team(other, "QB")[0]["name"]]["opp"]
+    # QB + 2 WR + TE of one team, opp WR bring-back, the rest and the DST from one team of the other game
+    base = ([qb] + team(qb["team"], "WR")[:2] + team(qb["team"], "TE") + team(qb["opp"], "WR")[:1]
+            + team(other_opp, "RB")[:2] + team(other_opp, "WR")[:1] + team(other_opp, "DST"))
+    cfg = {"min_salary": 0, "max_salary": 10**6}
+    assert ROSTER.is_final(base) and V.validate(table.matrix([base]), table, cfg)[0] == 0
+
+    swap = lambda lu, i, p: lu[:i] + [p] + lu[i+1:]
+    no_stack = swap(swap(base, 1, team(other_opp, "WR")[1]), 2, team(other_opp, "WR")[2])
+    cases = [
+        ("unknown player", [swap(base, 5, {"name": "Nobody"})], {}, V.UNKNOWN_PLAYER | V.POSITIONS),
+        ("duplicate player", [swap(base, 6, base[5])], {}, V.DUPLICATE_PLAYER),
+        ("positions", [swap(base, 5, team(other_opp, "TE")[0])], {}, V.POSITIONS),
+        ("salary", [base], {"max_salary": sum(p["salary"] for p in base) - 100}, V.SALARY),
+        ("ownership", [base], {"cum_own_cap_pct": 1.0}, V.OWNERSHIP),
+        ("stack", [no_stack], {}, V.STACK),
+        ("bringback", [swap(base, 4, team(other_opp, "WR")[1])], {}, V.BRINGBACK),
+        ("dst vs offense", [swap(base, 8, team(other, "DST")[0])], {}, V.DST_VS_OFFENSE),
+        ("duplicate lineup", [base, list(reversed(base))], {}, V.DUPLICATE_LINEUP),
+    ]
+    for name, lineups, extra, bit in cases:
+        flags = V.validate(table.matrix(lineups), table, dict(cfg, **extra))
+        assert flags[-1] == bit, (name, V.describe(flags))
+        print(f"validator {name:<17} -> {V.describe(flags)[-1]}")
+    flags = V.validate(table.matrix([base, swap(base, 7, team(other_opp, "WR")[1])]), table, cfg, max_overlap=7)
+    assert flags.tolist() == [0, V.OVERLAP], V.describe(flags)
+    print(f"validator {'overlap':<17} -> {V.describe(flags)[-1]}")
+
+def check_roster():
+    want = {(1, rb, wr, te, 1) for rb in (2, 3) for wr in (3, 4) for te in (1, 2) if rb + wr + te == 7}
+    got = {tuple(c[p] for p in ("QB", "RB", "WR", "TE", "DST")) for c in ROSTER.final_counts()}
+    assert got == want, got
+    for c in ROSTER.final_counts():
+        lu = [{"name": f"{p}{i}", "pos": p} for p, k in c.items() for i in range(k)]
+        assert ROSTER.is_final(lu)
+        slots = ROSTER.assign(lu)
+        assert all(p is not None and p["pos"] in ROSTER.eligible[s] for s, p in zip(ROSTER.slots, slots))
+        assert ROSTER.can_add(lu[:-1], lu[-1]["pos"]) and not ROSTER.can_add(lu[:-1], "QB")
+    print(f"roster dk_classic: {len(got)} legal count vectors, all assign to eligible slots")
+
+def main():
+    players = tiny_pool()
+    check_top_fills(players)
+    check_cache(players)
+    check_validator(players)
+    check_roster()
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,12 @@
 Test ownership values being generated
 """
 
-import pandas as pd
 from utils import ownership_proxy
+from input_cache import read_dk_salaries
 
 def main():
     # Load DraftKings data
-    dk_df = pd.read_csv('DKSalaries.csv')
-    
-    # Rename columns to match what utils expects
-    dk_df = dk_df.rename(columns={
-        'Position': 'pos',
-        'Name': 'name',
-        'Salary': 'salary',
-        'TeamAbbrev': 'team'
-    })
+    dk_df = read_dk_salaries('DKSalaries.csv')
     
     # Generate ownership
     own_df = ownership_proxy(dk_df)
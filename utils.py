@@ -43,13 +43,27 @@ def tier_label(edge_score: float) -> str:
     else:
         return "D"
 
+def _resolve_store(path):
+    """(root, table) when path points into the Parquet store (datastore.py), else None"""
+    if not path or not os.path.isdir(path):
+        return None
+    import datastore
+    return datastore.resolve(path)
+
 def load_roles(roles_path: str) -> pd.DataFrame:
     """Load depth chart roles from CSV"""
     return pd.read_csv(roles_path)
 
-def load_dk(dk_path: str) -> pd.DataFrame:
-    """Load DraftKings salaries from CSV"""
-    df = pd.read_csv(dk_path)
+def load_dk(dk_path: str, season: int = None, week: int = None) -> pd.DataFrame:
+    """Load DraftKings salaries from CSV, or from the store's dk_salaries table for season/week"""
+    store = _resolve_store(dk_path)
+    if store is not None:
+        import datastore
+        df = datastore.read_table(store[0], "dk_salaries", seasons=season, weeks=week,
+                                  columns=["Name", "TeamAbbrev", "Position", "Salary", "ID"])
+    else:
+        from input_cache import read_dk_salaries
+        return read_dk_salaries(dk_path)[["name", "team", "pos", "salary", "id"]]
     # Parse team abbreviation from Game Info column
     df["team"] = df["TeamAbbrev"]
     df["pos"] = df["Position"]
@@ -58,45 +72,46 @@ def load_dk(dk_path: str) -> pd.DataFrame:
     df["id"] = df["ID"]  # Include player ID for DraftKings upload format
     return df[["name", "team", "pos", "salary", "id"]]
 
-def load_optional(path: str) -> pd.DataFrame:
-    """Load optional projections or ownership file"""
+def load_optional(path: str, season: int = None, week: int = None, table: str = None) -> pd.DataFrame:
+    """Load optional projections or ownership file (or store table, e.g. <root>/projections)"""
+    store = _resolve_store(path)
+    if store is not None:
+        import datastore
+        table = table or store[1]
+        if table is None:
+            raise ValueError("load_optional on a store root needs table= (e.g. 'projections')")
+        return datastore.read_table(store[0], table, seasons=season, weeks=week).drop(columns=["season", "week"], errors="ignore")
     if path and os.path.exists(path):
-        try:
-            df = pd.read_csv(path)
-            # Check if the dataframe is empty or has no data rows
-            if df.empty or len(df) == 0:
-                return pd.DataFrame()
-            return df
-        except pd.errors.EmptyDataError:
+        from input_cache import read_table
+        df = read_table(path)
+        # Check if the dataframe is empty or has no data rows
+        if df.empty or len(df) == 0:
             return pd.DataFrame()
+        return df
     return pd.DataFrame()
 
-def ownership_proxy(dk_df: pd.DataFrame, weekly_df: pd.DataFrame = None) -> pd.DataFrame:
-    """Create proxy ownership from salary rank and position"""
+def ownership_proxy(dk_df: pd.DataFrame, weekly_df: pd.DataFrame = None, model_path: str = None) -> pd.DataFrame:
+    """
+    Proxy ownership: the fitted ownership model (ownership_model.py) when config/ownership_model.json
+    exists, otherwise salary rank within position
+    """
+    import ownership_model
+    model_path = model_path or ownership_model.DEFAULT_MODEL
+    if os.path.exists(model_path):
+        players = dk_df if "proj" in dk_df.columns else dk_df.merge(projection_proxy(dk_df)[["name", "proj"]], on="name", how="left")
+        return ownership_model.predict(players, weekly_df, ownership_model.load_model(model_path))
     df = dk_df.copy()
     # Group by position and rank by salary
     df["salary_rank"] = df.groupby("pos")["salary"].rank(ascending=False)
     
-    # Much more aggressive ownership distribution to meet validation requirements
-    # Top 1-2 players per position: 8-12%
-    # Middle players: 4-7%
-    # Bottom players: 2-3%
-    df["own"] = 12 - (df["salary_rank"] - 1) * 1.5  # Top salary = 12%, decrease by 1.5% per rank
-    df["own"] = df["own"].clip(2, 12)  # Clamp between 2% and 12%
-    
-    # Ensure we have enough low-owned players for validation
-    # We need at least 1 player <5% and 2 players <10%
-    # With 9 players, we can have at most 7 players >=10%
-    # So we need at least 2 players <10%
+    # Top salary = 12%, decrease by 1.5% per rank, clamped to 2-12%
+    df["own"] = (12 - (df["salary_rank"] - 1) * 1.5).clip(2, 12)
     
-    # Force some players to be very low-owned
-    low_owned_count = 0
-    target_low_owned = len(df) * 0.3  # 30% should be under 5%
-    
-    for idx in df.index:
-        if low_owned_count < target_low_owned:
-            df.loc[idx, "own"] = df.loc[idx, "own"] * 0.3  # Make them very low-owned
-            low_owned_count += 1
+    # Force the first 30% of the pool very low-owned so lineups can meet the low-owned minimums
+    n_low = int(np.ceil(len(df) * 0.3))
+    own = df["own"].to_numpy(copy=True)
+    own[:n_low] *= 0.3
+    df["own"] = own
     
     return df[["name", "own"]]
 
@@ -119,100 +134,103 @@ def lineup_score(lineup: list, proj_weight: float = 1.0, own_weight: float = 0.0
     """Calculate total projected points for a lineup"""
     return sum(p.get("proj", 0) * proj_weight - p.get("own", 0) * own_weight for p in lineup)
 
-def load_weekly_inputs(path:str)->pd.DataFrame:
-    if os.path.isdir(path):
-        indir = path
-        sched = pd.read_csv(os.path.join(indir, "schedule.csv"))
-        wx = pd.read_csv(os.path.join(indir, "weather.csv"))
-        odds_path = os.path.join(indir, "odds.csv")
-        odds = pd.read_csv(odds_path) if os.path.exists(odds_path) else pd.DataFrame()
-        proe_pace = pd.read_csv(os.path.join(indir, "proe_pace.csv"))
-        conc = pd.read_csv(os.path.join(indir, "concentration.csv"))
+def _merge_weekly(sched, wx, odds, proe_pace, conc):
+    """Join schedule, weather, odds and team metrics into the game-level weekly frame; empty components give NaN columns"""
+    if wx.empty:
+        wx = pd.DataFrame({"game_id": pd.Series(dtype=object), "venue_roof": pd.Series(dtype=object), "wind_mph": pd.Series(dtype=float)})
+    if proe_pace.empty:
+        proe_pace = pd.DataFrame({"team": pd.Series(dtype=object), "proe": pd.Series(dtype=float), "sec_per_play_neutral": pd.Series(dtype=float)})
+    if conc.empty:
+        conc = pd.DataFrame({"team": pd.Series(dtype=object), "top2_tgt_share_avg": pd.Series(dtype=float)})
+    # ==== odds merge (best-effort) ====
+    if not odds.empty:
+        odds["home_abbr"] = odds["home_team_name"].map(_nick_to_abbr)
+        odds["away_abbr"] = odds["away_team_name"].map(_nick_to_abbr)
+        odds = odds.dropna(subset=["home_abbr","away_abbr"])
         
-        # ==== odds merge (best-effort) ====
-        if not odds.empty:
-            odds["home_abbr"] = odds["home_team_name"].map(_nick_to_abbr)
-            odds["away_abbr"] = odds["away_team_name"].map(_nick_to_abbr)
-            odds = odds.dropna(subset=["home_abbr","away_abbr"])
-            
-            # Start with base merge
-            base = sched.merge(wx[["game_id","venue_roof","wind_mph"]], on="game_id", how="left")
-            
-            # Try to merge with both team orders
-            # First, try exact match (home vs away)
-            base = base.merge(
-                odds[["home_abbr","away_abbr","ou_consensus","spread_home_consensus"]],
-                left_on=["home_team","away_team"], right_on=["home_abbr","away_abbr"], how="left"
-            )
-            
-            # For games without odds, try reversed order (away vs home)
-            missing_odds = base["ou_consensus"].isna()
-            if missing_odds.any():
-                # Create a copy of odds with reversed teams for missing games
-                missing_games = base[missing_odds][["home_team", "away_team"]].copy()
-                missing_games = missing_games.merge(
-                    odds[["away_abbr","home_abbr","ou_consensus","spread_home_consensus"]],
-                    left_on=["home_team","away_team"], right_on=["away_abbr","home_abbr"], how="left"
-                )
-                
-                # Update the missing values in base
-                for idx, row in missing_games.iterrows():
-                    if pd.notna(row["ou_consensus"]):
-                        base.loc[idx, "ou_consensus"] = row["ou_consensus"]
-                        base.loc[idx, "spread_home_consensus"] = -row["spread_home_consensus"]  # Flip spread
-                
-                base = base.drop(columns=["home_abbr","away_abbr"])
-        else:
-            base = sched.merge(wx[["game_id","venue_roof","wind_mph"]], on="game_id", how="left")
-        
-        # ==== team-level merges ====
-        proe = proe_pace.rename(columns={"team":"team_abbr","proe":"proe_pct","sec_per_play_neutral":"sec_per_play"})
-        pace_rank = proe[["team_abbr","sec_per_play"]].copy()
-        pace_rank["pace_rank"] = pace_rank["sec_per_play"].rank(method="min")  # lower sec/play -> lower rank
-        home = proe.add_suffix("_home").rename(columns={"team_abbr_home":"home_team"})
-        away = proe.add_suffix("_away").rename(columns={"team_abbr_away":"away_team"})
-        base = base.merge(home, on="home_team", how="left").merge(away, on="away_team", how="left")
-        pr_home = pace_rank.add_suffix("_home").rename(columns={"team_abbr_home":"home_team"})
-        pr_away = pace_rank.add_suffix("_away").rename(columns={"team_abbr_away":"away_team"})
-        base = base.merge(pr_home, on="home_team", how="left").merge(pr_away, on="away_team", how="left")
-        # ==== concentration proxies -> WR1/WR2/TE/RB route/target splits ====
-        conc = conc.rename(columns={"team":"team_abbr","top2_tgt_share_avg":"top2"})
-        ch = conc.add_suffix("_home").rename(columns={"team_abbr_home":"home_team"})
-        ca = conc.add_suffix("_away").rename(columns={"team_abbr_away":"away_team"})
-        base = base.merge(ch, on="home_team", how="left").merge(ca, on="away_team", how="left")
-        for side in ["home","away"]:
-            top2 = base[f"top2_{side}"].fillna(0.45)
-            base[f"wr1_tgt_share_{side}"] = (top2*0.60).clip(0,1)
-            base[f"wr2_tgt_share_{side}"] = (top2*0.40).clip(0,1)
-            rem = (1.0 - top2).clip(0,1)
-            base[f"te_route_share_{side}"] = (rem*0.55).clip(0,1)
-            base[f"rb_route_share_{side}"] = (rem*0.45).clip(0,1)
-        base["proe_home"] = base["proe_pct_home"].fillna(0.0)
-        base["proe_away"] = base["proe_pct_away"].fillna(0.0)
-        base["pace_rank_home"] = base["pace_rank_home"].fillna(base["pace_rank_home"].median())
-        base["pace_rank_away"] = base["pace_rank_away"].fillna(base["pace_rank_away"].median())
-        base["stack_cum_own_est"] = 0.0
+        # Start with base merge
+        base = sched.merge(wx[["game_id","venue_roof","wind_mph"]], on="game_id", how="left")
         
-        # Rename odds columns to match expected names
-        if "ou_consensus" in base.columns:
-            base["ou"] = base["ou_consensus"]
-        if "spread_home_consensus" in base.columns:
-            base["spread_home"] = base["spread_home_consensus"]
+        # Try to merge with both team orders
+        # First, try exact match (home vs away)
+        base = base.merge(
+            odds[["home_abbr","away_abbr","ou_consensus","spread_home_consensus"]],
+            left_on=["home_team","away_team"], right_on=["home_abbr","away_abbr"], how="left"
+        )
         
-        # columns expected downstream
-        need = [
-            "game_id","home_team","away_team","venue_roof","wind_mph",
-            "proe_home","proe_away","pace_rank_home","pace_rank_away",
-            "wr1_tgt_share_home","wr2_tgt_share_home","te_route_share_home","rb_route_share_home",
-            "wr1_tgt_share_away","wr2_tgt_share_away","te_route_share_away","rb_route_share_away",
-            "stack_cum_own_est","ou","spread_home"
-        ]
-        for c in need:
-            if c not in base.columns: base[c] = np.nan
-        
-        return base[need].copy()
-    # csv path: pass-through (older mode)
-    df = pd.read_csv(path)
+        # For games without odds, try reversed order (away vs home)
+        missing_odds = base["ou_consensus"].isna()
+        if missing_odds.any():
+            # Create a copy of odds with reversed teams for missing games
+            missing_games = base[missing_odds][["home_team", "away_team"]].copy()
+            missing_games = missing_games.merge(
+                odds[["away_abbr","home_abbr","ou_consensus","spread_home_consensus"]],
+                left_on=["home_team","away_team"], right_on=["away_abbr","home_abbr"], how="left"
+            )
+            
+            # Update the missing values in base
+            for idx, row in missing_games.iterrows():
+                if pd.notna(row["ou_consensus"]):
+                    base.loc[idx, "ou_consensus"] = row["ou_consensus"]
+                    base.loc[idx, "spread_home_consensus"] = -row["spread_home_consensus"]  # Flip spread
+            
+            base = base.drop(columns=["home_abbr","away_abbr"])
+    else:
+        base = sched.merge(wx[["game_id","venue_roof","wind_mph"]], on="game_id", how="left")
+    
+    # ==== team-level merges ====
+    proe = proe_pace.rename(columns={"team":"team_abbr","proe":"proe_pct","sec_per_play_neutral":"sec_per_play"})
+    pace_rank = proe[["team_abbr","sec_per_play"]].copy()
+    pace_rank["pace_rank"] = pace_rank["sec_per_play"].rank(method="min")  # lower sec/play -> lower rank
+    home = proe.add_suffix("_home").rename(columns={"team_abbr_home":"home_team"})
+    away = proe.add_suffix("_away").rename(columns={"team_abbr_away":"away_team"})
+    base = base.merge(home, on="home_team", how="left").merge(away, on="away_team", how="left")
+    pr_home = pace_rank.add_suffix("_home").rename(columns={"team_abbr_home":"home_team"})
+    pr_away = pace_rank.add_suffix("_away").rename(columns={"team_abbr_away":"away_team"})
+    base = base.merge(pr_home, on="home_team", how="left").merge(pr_away, on="away_team", how="left")
+    # ==== concentration proxies -> WR1/WR2/TE/RB route/target splits ====
+    # only the play-by-play path writes wr1_tgt_share; the fallback table's te/rb_route_share are not measured
+    measured_file = "wr1_tgt_share" in conc.columns
+    conc = conc.rename(columns={"team":"team_abbr","top2_tgt_share_avg":"top2"})
+    ch = conc.add_suffix("_home").rename(columns={"team_abbr_home":"home_team"})
+    ca = conc.add_suffix("_away").rename(columns={"team_abbr_away":"away_team"})
+    base = base.merge(ch, on="home_team", how="left").merge(ca, on="away_team", how="left")
+    # measured shares (compute_concentration with play-by-play) win; fixed-ratio split of top2 otherwise
+    for side in ["home","away"]:
+        top2 = base[f"top2_{side}"].fillna(0.45)
+        rem = (1.0 - top2).clip(0,1)
+        for col, split in [("wr1_tgt_share", top2*0.60), ("wr2_tgt_share", top2*0.40),
+                           ("te_route_share", rem*0.55), ("rb_route_share", rem*0.45)]:
+            measured = base.get(f"{col}_{side}") if measured_file else None
+            split = split.clip(0,1)
+            base[f"{col}_{side}"] = measured.fillna(split) if measured is not None else split
+    base["proe_home"] = base["proe_pct_home"].fillna(0.0)
+    base["proe_away"] = base["proe_pct_away"].fillna(0.0)
+    base["pace_rank_home"] = base["pace_rank_home"].fillna(base["pace_rank_home"].median() if base["pace_rank_home"].notna().any() else 16)
+    base["pace_rank_away"] = base["pace_rank_away"].fillna(base["pace_rank_away"].median() if base["pace_rank_away"].notna().any() else 16)
+    base["stack_cum_own_est"] = 0.0
+    
+    # Rename odds columns to match expected names
+    if "ou_consensus" in base.columns:
+        base["ou"] = base["ou_consensus"]
+    if "spread_home_consensus" in base.columns:
+        base["spread_home"] = base["spread_home_consensus"]
+    
+    # columns expected downstream
+    need = [
+        "game_id","home_team","away_team","venue_roof","wind_mph",
+        "proe_home","proe_away","pace_rank_home","pace_rank_away",
+        "wr1_tgt_share_home","wr2_tgt_share_home","te_route_share_home","rb_route_share_home",
+        "wr1_tgt_share_away","wr2_tgt_share_away","te_route_share_away","rb_route_share_away",
+        "stack_cum_own_est","ou","spread_home"
+    ]
+    for c in need:
+        if c not in base.columns: base[c] = np.nan
+    
+    return base[need].copy()
+
+def _weekly_defaults(df):
+    """Pass-through weekly_inputs with fallbacks for missing columns"""
     # ensure columns exist (fallbacks if missing)
     defaults = {
         "proe_home":0.0,"proe_away":0.0,"pace_rank_home":16,"pace_rank_away":16,
@@ -223,3 +241,34 @@ def load_weekly_inputs(path:str)->pd.DataFrame:
     for k,v in defaults.items():
         if k not in df.columns: df[k]=v
     return df
+
+def load_weekly_inputs(path:str, season:int=None, week:int=None)->pd.DataFrame:
+    """
+    Game-level weekly inputs from a week directory of CSVs, a single weekly_inputs CSV, or the
+    Parquet store (root or <root>/weekly_inputs, with season/week; see datastore.py).
+    """
+    store = _resolve_store(path)
+    if store is not None:
+        import datastore
+        root, table = store
+        if table != "weekly_inputs" and season is not None and week is not None:
+            t = {name: datastore.read_table(root, name, seasons=season, weeks=week).drop(columns=["season","week"], errors="ignore")
+                 for name in ["schedule","weather","odds","proe_pace","concentration"]}
+            # a week with only some component tables prefers its stored weekly_inputs; without one the
+            # missing components join as empty (odds are optional either way)
+            missing = [n for n in ["weather","proe_pace","concentration"] if t[n].empty]
+            stored = (int(season), int(week)) in datastore.partitions(root, "weekly_inputs")
+            if not t["schedule"].empty and not (missing and stored):
+                return _merge_weekly(t["schedule"], t["weather"], t["odds"], t["proe_pace"], t["concentration"])
+        return _weekly_defaults(datastore.read_table(root, "weekly_inputs", seasons=season, weeks=week))
+    if os.path.isdir(path):
+        indir = path
+        sched = pd.read_csv(os.path.join(indir, "schedule.csv"))
+        wx = pd.read_csv(os.path.join(indir, "weather.csv"))
+        odds_path = os.path.join(indir, "odds.csv")
+        odds = pd.read_csv(odds_path) if os.path.exists(odds_path) else pd.DataFrame()
+        proe_pace = pd.read_csv(os.path.join(indir, "proe_pace.csv"))
+        conc = pd.read_csv(os.path.join(indir, "concentration.csv"))
+        return _merge_weekly(sched, wx, odds, proe_pace, conc)
+    # csv path: pass-through (older mode)
+    return _weekly_defaults(pd.read_csv(path))
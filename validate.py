@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Vectorized lineup validator.
+
+Lineups are an (N, roster size) matrix of indexes into a player table (-1 = player not in the table).
+Each rule is one pass over the whole matrix -- positions (packed roster count words), salary band,
+ownership gates, QB stack and bring-back, DST facing rostered offense, duplicate and overlapping
+lineups -- and the result is an int of violation bitflags per lineup (0 = valid).
+
+    from validate import PlayerTable, validate, describe
+    table = PlayerTable(players)                 # dicts or a frame: name, team, pos, salary, own[, opp]
+    flags = validate(table.matrix(lineups), table, cfg)
+
+    python validate.py --lineups out/lineups_150.csv --dk DKSalaries.csv --ownership ownership.csv --out out/validate.csv
+"""
+
+import argparse, os
+import pandas as pd, numpy as np
+from roster import get_roster
+from utils import read_weights, load_optional
+
+(UNKNOWN_PLAYER, DUPLICATE_PLAYER, POSITIONS, SALARY, OWNERSHIP, STACK, BRINGBACK, DST_VS_OFFENSE,
+ DUPLICATE_LINEUP, OVERLAP) = (1 << i for i in range(10))
+FLAG_NAMES = {UNKNOWN_PLAYER: "unknown_player", DUPLICATE_PLAYER: "duplicate_player", POSITIONS: "positions",
+              SALARY: "salary", OWNERSHIP: "ownership", STACK: "stack", BRINGBACK: "bringback",
+              DST_VS_OFFENSE: "dst_vs_offense", DUPLICATE_LINEUP: "duplicate_lineup", OVERLAP: "overlap"}
+OFFENSE = ("QB", "RB", "WR", "TE")
+PASS_CATCHERS = ("WR", "TE")
+SKILL = ("RB", "WR", "TE")
+
+class PlayerTable:
+    """Player attributes as arrays with a trailing all-empty sentinel row for unknown players"""
+
+    def __init__(self, players, opp=None, roster=None):
+        df = pd.DataFrame(players).drop_duplicates("name").reset_index(drop=True)
+        self.roster = roster or get_roster()
+        self.names = df["name"].to_numpy(object)
+        self.index = {n: i for i, n in enumerate(self.names)}
+        self.sentinel = len(df)
+        teams = pd.Index(sorted(set(df["team"].astype(str))))
+        if "opp" not in df.columns or opp:
+            df["opp"] = df["team"].map(opp or {})
+        pos_code = {p: i for i, p in enumerate(self.roster.positions)}
+        pad = lambda a, v: np.r_[a, v]
+        self.team = pad(teams.get_indexer(df["team"].astype(str)), -1)
+        self.opp = pad(teams.get_indexer(df["opp"].astype(str)), -1)  # -1 when unknown or off-slate
+        self.pos = pad(df["pos"].map(pos_code).fillna(-1).astype(int).to_numpy(), -1)
+        self.salary = pad(df["salary"].astype(float).to_numpy(), 0.0)
+        self.own = pad(df["own"].astype(float).to_numpy() if "own" in df.columns else np.zeros(len(df)), 0.0)
+        self.pos_code = pos_code
+
+    def matrix(self, lineups):
+        """(N, size) index matrix from lineups given as lists of names or player dicts (-1 = unknown/missing)"""
+        M = np.full((len(lineups), self.roster.size), -1, dtype=np.int64)
+        for r, lu in enumerate(lineups):
+            idx = [self.index.get(p["name"] if isinstance(p, dict) else p, -1) for p in lu][:self.roster.size]
+            M[r, :len(idx)] = idx
+        return M
+
+    def codes(self, positions):
+        return [self.pos_code[p] for p in positions if p in self.pos_code]
+
+def _first(mask):
+    """Column of the first True per row (0 where none)"""
+    return mask.argmax(axis=1)
+
+def validate(M, table, cfg=None, stack_min=2, bringback_min=1, max_overlap=None, block=2000):
+    """Violation bitflags per lineup row of M; cfg supplies the salary band, ownership gates and max_same_dst_opp"""
+    cfg = cfg or {}
+    M = np.asarray(M, dtype=np.int64)
+    N = len(M)
+    roster = table.roster
+    known = M >= 0
+    X = np.where(known, M, table.sentinel)
+    rows = np.arange(N)
+    flags = np.zeros(N, dtype=np.int64)
+    flags |= np.where((~known).any(axis=1), UNKNOWN_PLAYER, 0)
+
+    S = np.sort(M, axis=1)
+    flags |= np.where(((S[:, 1:] == S[:, :-1]) & (S[:, 1:] >= 0)).any(axis=1), DUPLICATE_PLAYER, 0)
+
+    # positions: per-row count word against the roster's legal words
+    P = table.pos[X]
+    inc = np.array([roster.inc[p] for p in roster.positions], dtype=np.int64)
+    counts = (P[:, :, None] == np.arange(len(inc))[None, None, :]).sum(axis=1)
+    legal = np.isin(counts @ inc, np.fromiter(roster.final, dtype=np.int64)) & (P >= 0).all(axis=1)
+    flags |= np.where(legal, 0, POSITIONS)
+
+    sal = table.salary[X].sum(axis=1)
+    lo, hi = cfg.get("min_salary", -np.inf), cfg.get("max_salary", roster.salary_cap)
+    flags |= np.where((sal < lo) | (sal > hi), SALARY, 0)
+
+    O = table.own[X]
+    bad_own = np.zeros(N, bool)
+    if "cum_own_cap_pct" in cfg:
+        bad_own |= O.sum(axis=1) > cfg["cum_own_cap_pct"]
+    if cfg.get("min_low_owned_per_lu"):
+        bad_own |= ((O < cfg.get("low_owned_threshold_pct", 5)) & known).sum(axis=1) < cfg["min_low_owned_per_lu"]
+    if cfg.get("min_sub10_owned_per_lu"):
+        bad_own |= ((O < 10) & known).sum(axis=1) < cfg["min_sub10_owned_per_lu"]
+    flags |= np.where(bad_own, OWNERSHIP, 0)
+
+    T = table.team[X]
+    if "QB" in table.pos_code:
+        is_qb = P == table.pos_code["QB"]
+        qb = X[rows, _first(is_qb)]
+        has_qb = is_qb.any(axis=1)
+        qb_team, qb_opp = table.team[qb], table.opp[qb]
+        mates = ((T == qb_team[:, None]) & np.isin(P, table.codes(PASS_CATCHERS))).sum(axis=1)
+        backs = ((T == qb_opp[:, None]) & (qb_opp[:, None] >= 0) & np.isin(P, table.codes(SKILL))).sum(axis=1)
+        flags |= np.where(~has_qb | (mates < stack_min), STACK, 0)
+        flags |= np.where(~has_qb | (backs < bringback_min), BRINGBACK, 0)
+    if "DST" in table.pos_code:
+        is_dst = P == table.pos_code["DST"]
+        dst_opp = table.opp[X[rows, _first(is_dst)]]
+        facing = ((T == dst_opp[:, None]) & (dst_opp[:, None] >= 0) & np.isin(P, table.codes(OFFENSE))).sum(axis=1)
+        flags |= np.where(is_dst.any(axis=1) & (facing > cfg.get("max_same_dst_opp", 0)), DST_VS_OFFENSE, 0)
+
+    # uniqueness: identical player sets, then (optionally) too many shared players with an earlier lineup
+    if N:
+        _, first, inv = np.unique(S, axis=0, return_index=True, return_inverse=True)
+        flags |= np.where(first[inv.ravel()] != rows, DUPLICATE_LINEUP, 0)
+    if max_overlap is not None and N > 1:
+        inc_m = np.zeros((N, table.sentinel + 1), dtype=np.float32)
+        inc_m[np.repeat(rows, M.shape[1]), X.ravel()] = 1.0
+        inc_m[:, table.sentinel] = 0.0
+        for b in range(0, N, block):
+            ov = inc_m[b:b + block] @ inc_m[:b + block].T
+            ov[np.triu_indices(ov.shape[0], k=b, m=ov.shape[1])] = 0  # only earlier lineups count
+            flags[b:b + block] |= np.where((ov > max_overlap).any(axis=1), OVERLAP, 0)
+    return flags
+
+def describe(flags):
+    """'positions|salary'-style strings ('' for valid lineups)"""
+    return ["|".join(name for bit, name in FLAG_NAMES.items() if f & bit) for f in np.asarray(flags).tolist()]
+
+def summarize(flags):
+    """Lineup count per violation (plus valid)"""
+    flags = np.asarray(flags)
+    out = {"lineups": len(flags), "valid": int((flags == 0).sum())}
+    out.update({name: int((flags & bit != 0).sum()) for bit, name in FLAG_NAMES.items()})
+    return out
+
+def slate_table(dk_path, ownership=None, roster=None):
+    """PlayerTable from DKSalaries (team/opp/pos/salary) and optional ownership (name, own)"""
+    from input_cache import read_dk_salaries
+    dk = read_dk_salaries(dk_path)
+    for c in ("team", "pos", "opp"):
+        if c in dk.columns:
+            dk[c] = dk[c].astype(object)
+    if ownership:
+        dk = dk.merge(load_optional(ownership)[["name", "own"]].drop_duplicates("name"), on="name", how="left")
+    return PlayerTable(dk, roster=roster)
+
+if __name__ == "__main__":
+    from dk_export import iter_lineup_file
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lineups", required=True, help="Lineups CSV (p1_name.. columns or Lineup/Name rows)")
+    ap.add_argument("--dk", required=True)
+    ap.add_argument("--ownership", default=None)
+    ap.add_argument("--weights", default="config/weights.yaml")
+    ap.add_argument("--stack_min", type=int, default=2, help="QB-team WR/TE required")
+    ap.add_argument("--bringback_min", type=int, default=1, help="Opponent RB/WR/TE required")
+    ap.add_argument("--max_overlap", type=int, default=None, help="Flag lineups sharing more players with an earlier one")
+    ap.add_argument("--out", default="out/validate.csv")
+    args = ap.parse_args()
+    table = slate_table(args.dk, args.ownership)
+    lineups = list(iter_lineup_file(args.lineups, {}))
+    flags = validate(table.matrix(lineups), table, read_weights(args.weights), args.stack_min, args.bringback_min,
+                     args.max_overlap)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    pd.DataFrame({"lineup": np.arange(1, len(flags) + 1), "flags": flags, "violations": describe(flags)}).to_csv(args.out, index=False)
+    s = summarize(flags)
+    print(f"{s['valid']}/{s['lineups']} lineups valid")
+    for name in FLAG_NAMES.values():
+        if s[name]:
+            print(f"  {name:<18} {s[name]:>6}")
+    print(f"Wrote per-lineup flags to {args.out}")